@@ -0,0 +1,72 @@
+# Integer HSB -> RGB conversion and a precomputed hue wheel.
+#
+# Shared by the LED scripts (ws2812, rc522, hub75). Copy this file to the
+# Pico next to the script that imports it.
+#
+# All values are integers: hue in degrees (any int, taken modulo 360),
+# saturation and brightness 0..255. Results match the float formula
+# int(brightness * 255 * ...) within +-1 per channel, without float
+# arithmetic or the six-tuple list of the old per-script hsb_to_rgb().
+#
+#   from color import hsb_to_rgb, hue_to_rgb
+#   r, g, b = hsb_to_rgb(hue, 255, 204)    # 80% brightness
+#   r, g, b = hue_to_rgb(hue)              # fully saturated, table lookup
+#
+# HUE_WHEEL holds the fully saturated, full-brightness colour of every
+# degree packed as 0xRRGGBB (360 x 4 bytes). hue_to_rgb() and hue_packed()
+# read it and scale by the brightness.
+
+import micropython
+from array import array
+
+HUE_STEPS = 360
+SECTOR = 60     # Degrees per sector of the colour wheel
+
+
+@micropython.native
+def hsb_to_rgb(hue, saturation=255, brightness=255):
+    hue %= HUE_STEPS
+    sector = hue // SECTOR
+    f = hue - sector * SECTOR
+    v = brightness
+    # 255 * 60: saturation and the position inside the sector as one fraction
+    p = v * (255 - saturation) // 255
+    q = v * (15300 - saturation * f) // 15300
+    t = v * (15300 - saturation * (SECTOR - f)) // 15300
+    if sector == 0:
+        return v, t, p
+    elif sector == 1:
+        return q, v, p
+    elif sector == 2:
+        return p, v, t
+    elif sector == 3:
+        return p, q, v
+    elif sector == 4:
+        return t, p, v
+    return v, p, q
+
+
+HUE_WHEEL = array('I', range(HUE_STEPS))
+for _hue in range(HUE_STEPS):
+    _r, _g, _b = hsb_to_rgb(_hue)
+    HUE_WHEEL[_hue] = (_r << 16) | (_g << 8) | _b
+del _hue, _r, _g, _b
+
+
+@micropython.native
+def hue_to_rgb(hue, brightness=255):
+    c = HUE_WHEEL[hue % HUE_STEPS]
+    if brightness == 255:
+        return c >> 16, (c >> 8) & 0xFF, c & 0xFF
+    return (((c >> 16) * brightness) // 255, (((c >> 8) & 0xFF) * brightness) // 255,
+            ((c & 0xFF) * brightness) // 255)
+
+
+# Same as hue_to_rgb() packed as 0xRRGGBB, no tuple is allocated
+@micropython.native
+def hue_packed(hue, brightness=255):
+    c = HUE_WHEEL[hue % HUE_STEPS]
+    if brightness == 255:
+        return c
+    return ((((c >> 16) * brightness) // 255) << 16 | ((((c >> 8) & 0xFF) * brightness) // 255) << 8
+            | ((c & 0xFF) * brightness) // 255)
@@ -0,0 +1,129 @@
+# Langton's ants as a structure of arrays.
+#
+# The ants used to be dicts with a 'pos' list that was rebuilt every step,
+# and update_ants() returned two new lists of tuples per frame. AntColony
+# keeps every attribute in its own preallocated array instead:
+#
+#   cells   array('H')  position as cell number y * width + x
+#   dirs    bytearray   0 north, 1 east, 2 south, 3 west
+#   colors  array('I')  ant colour 0xRRGGBB
+#   trail   array('I')  colour of the cells it switches on (half as bright)
+#
+# step() moves every ant once (torus) and fills a single dirty list of
+# (cell, colour) pairs: first the cell each ant left, in its new state,
+# then the ant heads on top. Drawing the list in order gives the same
+# picture as before; nothing is allocated per step.
+#
+# Rule on a dead cell: turn left and switch it on, with random_turns (the
+# demo's variant) one time in four face a random direction instead. On a
+# live cell: turn right and switch it off.
+#
+#   colony = AntColony(grid, 128, 128, 256)
+#   colony.set_color(0, 255, 0, 0)
+#   colony.draw_all(set_pixel_mapped, 155, 155, 155)
+#   while True:
+#       colony.step()
+#       colony.draw(set_pixel_mapped)
+
+import micropython
+import random
+from array import array
+
+
+class AntColony:
+    def __init__(self, grid, width, height, count, random_turns=True):
+        self.grid = grid
+        self.width = width
+        self.height = height
+        self.count = count
+        self.random_turns = random_turns
+        self.cells = array('H', [0] * count)
+        self.dirs = bytearray(count)
+        self.colors = array('I', [0] * count)
+        self.trail = array('I', [0] * count)
+        size = width * height
+        for i in range(count):
+            self.cells[i] = random.randint(0, size - 1)
+            self.dirs[i] = random.randint(0, 3)
+            self.set_color(i, 255, 255, 255)
+        # Left cells first, then the heads
+        self.dirty_cells = array('H', [0] * (2 * count))
+        self.dirty_colors = array('I', [0] * (2 * count))
+        self.dirty = 0
+
+    def set_color(self, ant, r, g, b):
+        self.colors[ant] = (r << 16) | (g << 8) | b
+        self.trail[ant] = ((r >> 1) << 16) | ((g >> 1) << 8) | (b >> 1)
+
+    @micropython.native
+    def step(self):
+        grid = self.grid
+        cells = self.cells
+        dirs = self.dirs
+        trail = self.trail
+        colors = self.colors
+        dirty_cells = self.dirty_cells
+        dirty_colors = self.dirty_colors
+        width = self.width
+        size = width * self.height
+        random_turns = self.random_turns
+        getrandbits = random.getrandbits
+        count = self.count
+        n = 0
+        for i in range(count):
+            cell = cells[i]
+            d = dirs[i]
+            if grid[cell]:
+                d = (d + 1) & 3
+                grid[cell] = 0
+                dirty_colors[n] = 0
+            else:
+                if random_turns and getrandbits(2) == 0:
+                    d = getrandbits(2)
+                else:
+                    d = (d - 1) & 3
+                grid[cell] = 1
+                dirty_colors[n] = trail[i]
+            dirty_cells[n] = cell
+            n += 1
+            # One step, wrapping around the edges
+            if d == 0:
+                cell = cell - width if cell >= width else cell + size - width
+            elif d == 2:
+                cell = cell + width if cell < size - width else cell - size + width
+            elif d == 1:
+                cell = cell + 1 if cell % width < width - 1 else cell - width + 1
+            else:
+                cell = cell - 1 if cell % width > 0 else cell + width - 1
+            cells[i] = cell
+            dirs[i] = d
+        for i in range(count):
+            dirty_cells[n] = cells[i]
+            dirty_colors[n] = colors[i]
+            n += 1
+        self.dirty = n
+
+    # Draw the dirty list of the last step
+    @micropython.native
+    def draw(self, set_pixel):
+        dirty_cells = self.dirty_cells
+        dirty_colors = self.dirty_colors
+        width = self.width
+        for k in range(self.dirty):
+            cell = dirty_cells[k]
+            color = dirty_colors[k]
+            set_pixel(cell % width, cell // width, color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+
+    # The whole grid (live cells in the given colour) and the ants
+    def draw_all(self, set_pixel, r, g, b):
+        width = self.width
+        grid = self.grid
+        for cell in range(width * self.height):
+            if grid[cell]:
+                set_pixel(cell % width, cell // width, r, g, b)
+            else:
+                set_pixel(cell % width, cell // width, 0, 0, 0)
+        for i in range(self.count):
+            cell = self.cells[i]
+            color = self.colors[i]
+            set_pixel(cell % width, cell // width, color >> 16, (color >> 8) & 0xFF, color & 0xFF)
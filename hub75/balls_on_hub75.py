@@ -1,5 +1,6 @@
 import time
 import random
+from color import hsb_to_rgb
 from interstate75 import Interstate75, DISPLAY_INTERSTATE75_64X64
 
 i75 = Interstate75(display=DISPLAY_INTERSTATE75_64X64)
@@ -25,32 +26,12 @@ class Ball:
         r, g, b = hsb_to_rgb(self.hue, self.saturation, self.brightness)
         self.pen = graphics.create_pen(r, g, b)
 
-def hsb_to_rgb(hue, saturation, brightness):
-    hue_normalized = (hue % 360) / 60
-    hue_index = int(hue_normalized)
-    hue_fraction = hue_normalized - hue_index
-
-    value1 = brightness * (1 - saturation)
-    value2 = brightness * (1 - saturation * hue_fraction)
-    value3 = brightness * (1 - saturation * (1 - hue_fraction))
-
-    red, green, blue = [
-        (brightness, value3, value1),
-        (value2, brightness, value1),
-        (value1, brightness, value3),
-        (value1, value2, brightness),
-        (value3, value1, brightness),
-        (brightness, value1, value2)
-    ][hue_index]
-
-    return int(red * 255), int(green * 255), int(blue * 255)
-
 balls = []
 for i in range(0, 10):
     r = random.randint(0, 3) + 3
     hue = random.randint(0, 359)
-    saturation = 1.0
-    brightness = 1.0
+    saturation = 255
+    brightness = 255
     balls.append(
         Ball(
             random.randint(r, r + (width - 2 * r)),
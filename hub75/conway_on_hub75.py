@@ -1,6 +1,9 @@
 import hub75
 import micropython
 import random
+from micropython import const
+from life_pingpong import PingPongLife
+from profiler import Profiler
 
 # Konstanten
 HEIGHT = 64
@@ -10,37 +13,21 @@ BORDER = 16
 # Anzeige initialisieren
 display = hub75.Hub75(WIDTH, HEIGHT)
 
+# Zwei Puffer im Wechsel, keine Allokation pro Generation (siehe life_pingpong.py)
+life = PingPongLife(WIDTH, HEIGHT)
+
+# Profiling: 1 = alle 300 Generationen ausgeben, wo die Zeit bleibt (siehe
+# profiler.py); mit 0 wird die Messung gar nicht erst kompiliert
+PROFILE = const(0)
+STEP = const(0)
+DRAW = const(1)
+profiler = Profiler(("step", "draw"))
+
 @micropython.native
-def initialize_grid():
-    grid = bytearray(WIDTH * HEIGHT)
+def initialize_grid(grid):
     for y in range(BORDER, HEIGHT - BORDER):
         for x in range(BORDER, WIDTH - BORDER):
             grid[y * WIDTH + x] = random.getrandbits(1)
-    return grid
-
-@micropython.native
-def count_neighbors(grid, x, y):
-    count = 0
-    for i in range(-1, 2):
-        for j in range(-1, 2):
-            if not (i == 0 and j == 0):
-                nx, ny = (x + i) % WIDTH, (y + j) % HEIGHT
-                if grid[ny * WIDTH + nx] == 1:
-                    count += 1
-    return count
-
-@micropython.native
-def update_grid(grid):
-    new_grid = bytearray(WIDTH * HEIGHT)
-    for y in range(0, HEIGHT):
-        for x in range(0, WIDTH):
-            neighbors = count_neighbors(grid, x, y)
-            idx = y * WIDTH + x
-            if grid[idx] == 1 and neighbors in (2, 3):
-                new_grid[idx] = 1
-            elif grid[idx] == 0 and neighbors == 3:
-                new_grid[idx] = 1
-    return new_grid
 
 @micropython.native
 def draw_grid(grid):
@@ -50,10 +37,29 @@ def draw_grid(grid):
             if grid[y * WIDTH + x] == 1:
                 display.set_pixel(x, y, 255, 255, 255)
 
-grid = initialize_grid()
+@micropython.native
+def draw_changes(grid, changed, count):
+    # Nur Zellen neu zeichnen, die sich geändert haben
+    for k in range(count):
+        i = changed[k]
+        if grid[i]:
+            display.set_pixel(i % WIDTH, i // WIDTH, 255, 255, 255)
+        else:
+            display.set_pixel(i % WIDTH, i // WIDTH, 0, 0, 0)
+
+initialize_grid(life.cells)
 display.start()
+draw_grid(life.cells)
 
 while True:
-    draw_grid(grid)
-    grid = update_grid(grid)
-
+    if PROFILE:
+        profiler.frame_start()
+        profiler.start(STEP)
+    count = life.step()
+    if PROFILE:
+        profiler.stop(STEP)
+        profiler.start(DRAW)
+    draw_changes(life.cells, life.changed, count)
+    if PROFILE:
+        profiler.stop(DRAW)
+        profiler.frame_end()
@@ -0,0 +1,76 @@
+import hub75
+import machine
+import random
+from framebuffer import FrameBuffer
+from life_tiles import TiledLife
+from panel_map import PanelMap
+
+# Constants for the physical display
+HEIGHT = 128
+WIDTH = 128
+
+xHEIGHT = 32    # 32 rows per module
+xWIDTH = 512    # 8 modules in a row with 64 columns each = 512 columns
+
+# Virtual board, the panel shows a 128x128 window of it
+BOARD = 512
+SOUPS = 12          # Number of random patches seeded on the board
+SOUP_SIZE = 24
+SCROLL_EVERY = 8    # Generations between two scroll steps
+
+# Initialize the display with the actual hardware resolution
+display = hub75.Hub75(xWIDTH, xHEIGHT)
+
+# overclocking if necessary
+if machine.freq() != 240000000:
+    machine.freq(240000000)
+
+# Pixel remapping via precomputed lookup table (see panel_map.py), pixels are
+# collected in a framebuffer and pushed to the display once per frame
+framebuffer = FrameBuffer(PanelMap(display))
+set_pixel_mapped = framebuffer.set_pixel
+
+# Only tiles with activity are simulated (see life_tiles.py)
+life = TiledLife(BOARD, BOARD)
+
+# The first soup lands inside the current view, so the panel never starts
+# out black while the others wait somewhere else on the board
+def seed_soups(view_x, view_y):
+    for i in range(SOUPS):
+        if i == 0:
+            x0 = view_x + random.randint(0, WIDTH - SOUP_SIZE)
+            y0 = view_y + random.randint(0, HEIGHT - SOUP_SIZE)
+        else:
+            x0 = random.randint(0, BOARD - 1)
+            y0 = random.randint(0, BOARD - 1)
+        for y in range(SOUP_SIZE):
+            for x in range(SOUP_SIZE):
+                if random.getrandbits(2) == 0:
+                    life.set(x0 + x, y0 + y, 1)
+
+def main():
+    display.start()
+    view_x = 0
+    view_y = 0
+    seed_soups(view_x, view_y)
+    life.draw_viewport(set_pixel_mapped, view_x, view_y, WIDTH, HEIGHT)
+    framebuffer.flush()
+
+    while True:
+        life.step()
+        if life.generation % SCROLL_EVERY == 0:
+            # Pan diagonally across the board, the framebuffer only sends
+            # the pixels that differ after the shift
+            view_x = (view_x + 1) % BOARD
+            view_y = (view_y + 1) % BOARD
+            life.draw_viewport(set_pixel_mapped, view_x, view_y, WIDTH, HEIGHT)
+        else:
+            life.draw_changes(set_pixel_mapped, view_x, view_y, WIDTH, HEIGHT)
+        framebuffer.flush()
+
+        # Reseed once everything has settled
+        if life.active_count == 0:
+            seed_soups(view_x, view_y)
+
+if __name__ == "__main__":
+    main()
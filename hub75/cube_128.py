@@ -1,9 +1,15 @@
 import hub75
-import math
 import time
 import machine
 from machine import Pin
 import micropython
+from array import array
+from micropython import const
+import fixed3d
+from frame_pacer import FramePacer
+from line_renderer import LineRenderer
+from panel_map import PanelMap
+from profiler import Profiler
 
 # Constants for the physical display
 HEIGHT = 128
@@ -15,80 +21,65 @@ xWIDTH = 512    # 8 modules in a row of 64 columns each = 512 columns
 # Initialize the display with real hardware resolution
 display = hub75.Hub75(xWIDTH, xHEIGHT)
 
-# Pixel Remapping
-@micropython.native
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y  # Identity transformation for values >= 128
-
-# Wrapper for set_pixel with remapping
-def set_pixel_mapped(x, y, r, g, b):
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
+# Pixel remapping via precomputed lookup table (see panel_map.py)
+panel = PanelMap(display)
+set_pixel_mapped = panel.set_pixel_mapped
+
+# Profiling: 1 = print where the frame time goes every 300 frames (see
+# profiler.py); with 0 the instrumentation is not compiled at all
+PROFILE = const(0)
+CLEAR = const(0)
+PROJECT = const(1)
+DRAW = const(2)
+profiler = Profiler(("clear", "project", "draw"))
 
 # 3D Cube Rotation Parameters
-cube_size = 30
+# Angles in 1/65536 of a turn, the transform is fixed point (see fixed3d.py)
+MESH = "cube"           # "cube", "icosphere" or "torus"
+cube_size = 30          # Pixels per unit
 angle_x = 0
 angle_y = 0
 angle_z = 0
-rotation_speed = 0.05
-
-# Define cube vertices
-vertices = [
-    (-1, -1, -1),
-    (1, -1, -1),
-    (1, 1, -1),
-    (-1, 1, -1),
-    (-1, -1, 1),
-    (1, -1, 1),
-    (1, 1, 1),
-    (-1, 1, 1)
-]
-
-# Define cube edges
-edges = [
-    (0,1), (1,2), (2,3), (3,0),
-    (4,5), (5,6), (6,7), (7,4),
-    (0,4), (1,5), (2,6), (3,7)
-]
-
-def rotate_vertex(x, y, z, angle_x, angle_y, angle_z):
-    # Rotation around X-axis
-    cos_x = math.cos(angle_x)
-    sin_x = math.sin(angle_x)
-    y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
-
-    # Rotation around Y-axis
-    cos_y = math.cos(angle_y)
-    sin_y = math.sin(angle_y)
-    x, z = x * cos_y + z * sin_y, -x * sin_y + z * cos_y
-
-    # Rotation around Z-axis
-    cos_z = math.cos(angle_z)
-    sin_z = math.sin(angle_z)
-    x, y = x * cos_z - y * sin_z, x * sin_z + y * cos_z
-
-    return x, y, z
+rotation_speed = fixed3d.radians(0.05)   # Per tick
+
+# Frame pacing (see frame_pacer.py): the rotation ticks TICKS_PER_SECOND
+# times per second however long a frame takes, the cube is drawn at
+# FRAMES_PER_SECOND. PACER_REPORT > 0 prints jitter and dropped frames
+# every that many frames.
+TICKS_PER_SECOND = 30
+FRAMES_PER_SECOND = 30
+PACER_REPORT = 0
+pacer = FramePacer(TICKS_PER_SECOND, FRAMES_PER_SECOND, report_every=PACER_REPORT)
+
+if MESH == "icosphere":
+    mesh = fixed3d.icosphere(2)
+elif MESH == "torus":
+    mesh = fixed3d.torus(16, 8)
+else:
+    mesh = fixed3d.cube()
+
+# Color based on edge index, computed once
+edge_colors = []
+for e in range(mesh.edge_count):
+    a = mesh.edges[2 * e]
+    b = mesh.edges[2 * e + 1]
+    edge_colors.append(((a * 20) % 256, (b * 40) % 256, (a * b * 15) % 256))
+
+# Erase-by-redraw (see line_renderer.py): instead of clearing the panel
+# every frame only the pixels of the last frame's lines that are not lit
+# again are switched off. ANTIALIAS draws Wu lines. The capacity covers the
+# pixels of one frame: the cube needs about 1100 with Wu lines,
+# icosphere(2) about 3600 without and 5700 with.
+ERASE_BY_REDRAW = True
+ANTIALIAS = False
+if ERASE_BY_REDRAW:
+    renderer = LineRenderer(panel, capacity=2048 if MESH == "cube" else 6144, antialias=ANTIALIAS)
+
+# Rotation matrix and projected vertices, reused every frame
+matrix = array('i', [0] * 9)
+screen_x = array('h', [0] * mesh.count)
+screen_y = array('h', [0] * mesh.count)
+depth = array('h', [0] * mesh.count)
 
 def draw_line(x1, y1, x2, y2, r, g, b):
     # Bresenham's Line Algorithm
@@ -109,46 +100,55 @@ def draw_line(x1, y1, x2, y2, r, g, b):
             err += dx
             y1 += sy
 
-def rotate_and_project(vertices, angle_x, angle_y, angle_z):
-    projected = []
-    for v in vertices:
-        rotated = rotate_vertex(v[0], v[1], v[2], angle_x, angle_y, angle_z)
-        # Simple orthographic projection
-        x = int(rotated[0] * cube_size) + WIDTH // 2
-        y = int(rotated[1] * cube_size) + HEIGHT // 2
-        projected.append((x, y))
-    return projected
-
 def rotating_cube():
     global angle_x, angle_y, angle_z
     display.start()
     
     while True:
-        display.clear()
-        projected_vertices = rotate_and_project(vertices, angle_x, angle_y, angle_z)
+        if PROFILE:
+            profiler.frame_start()
+
+        # Rotation advances at a fixed rate, missed ticks are caught up
+        for _ in range(pacer.begin()):
+            angle_x = (angle_x + rotation_speed) & 0xFFFF
+            angle_y = (angle_y + rotation_speed) & 0xFFFF
+            angle_z = (angle_z + rotation_speed) & 0xFFFF
+
+        if PROFILE:
+            profiler.start(CLEAR)
+        if not ERASE_BY_REDRAW:
+            display.clear()
+        if PROFILE:
+            profiler.stop(CLEAR)
+            profiler.start(PROJECT)
+        fixed3d.rotation_matrix(matrix, angle_x, angle_y, angle_z)
+        fixed3d.transform(mesh.vertices, mesh.count, matrix, cube_size,
+                          WIDTH // 2, HEIGHT // 2, screen_x, screen_y, depth)
+        if PROFILE:
+            profiler.stop(PROJECT)
+            profiler.start(DRAW)
         
         # Draw edges
-        for edge in edges:
-
-            start = projected_vertices[edge[0]]
-            end = projected_vertices[edge[1]]
-            # Color based on edge index
-            color = (
-                (edge[0] * 20) % 256,
-                (edge[1] * 40) % 256,
-                (edge[0] * edge[1] * 15) % 256
-            )
-
-            
+        edges = mesh.edges
+        for e in range(mesh.edge_count):
+            a = edges[2 * e]
+            b = edges[2 * e + 1]
+            color = edge_colors[e]
 
             # Draw line between vertices
-            draw_line(start[0], start[1], end[0], end[1], *color)
+            if ERASE_BY_REDRAW:
+                renderer.line(screen_x[a], screen_y[a], screen_x[b], screen_y[b], color[0], color[1], color[2])
+            else:
+                draw_line(screen_x[a], screen_y[a], screen_x[b], screen_y[b], color[0], color[1], color[2])
+        if ERASE_BY_REDRAW:
+            renderer.present()
         
+        if PROFILE:
+            profiler.stop(DRAW)
+            profiler.frame_end()
+
         #display.update()
-        angle_x += rotation_speed
-        angle_y += rotation_speed
-        angle_z += rotation_speed
-        #time.sleep(0.03)
+        pacer.end()  # Sleep out the rest of the frame budget
 
 # Run the rotating cube animation
 if __name__ == "__main__":
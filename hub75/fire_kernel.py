@@ -0,0 +1,96 @@
+# Row-wise fire spread kernel on a bytearray heat map.
+#
+# The original Fire.simulate() builds a list of (y, x) tuples for every
+# pixel, shuffles it with one random.randint() per element and then calls
+# spread_fire() per pixel with another randint(). This kernel produces the
+# same statistics without per-pixel allocations or method calls:
+#
+# - the random visiting order is replaced by a shuffled row order (one
+#   randint per row) and a random scan direction per row. Every pixel still
+#   reads its source before or after the row below has overwritten it with
+#   probability 1/2, and when several sources hit the same destination the
+#   last writer is, on average, uniformly chosen - which is what decides the
+#   mean cooling rate
+# - random numbers are drawn in bulk: one getrandbits(16) call yields the
+#   2-bit spread choice of 8 pixels (MicroPython's getrandbits() is limited
+#   to 32 bits, 16 keeps every value a small int)
+#
+# render() pushes only the pixels whose heat changed since the last call,
+# render_indexed() does the same with the heat as palette index.
+
+import micropython
+import random
+
+
+class FireKernel:
+    def __init__(self, width=128, height=32):
+        self.width = width
+        self.height = height
+        self.heat = bytearray(width * height)
+        self.shown = bytearray(width * height)
+        self.order = bytearray(range(1, height))
+
+    def set_bottom_row(self, value):
+        base = (self.height - 1) * self.width
+        for x in range(self.width):
+            self.heat[base + x] = value
+
+    @micropython.native
+    def step(self):
+        width = self.width
+        heat = self.heat
+        size = len(heat)
+        order = self.order
+        getrandbits = random.getrandbits
+
+        # Shuffle the row order in place
+        for i in range(len(order) - 1, 0, -1):
+            j = random.randint(0, i)
+            order[i], order[j] = order[j], order[i]
+
+        for k in range(len(order)):
+            base = order[k] * width
+            if getrandbits(1):
+                x = 0
+                dx = 1
+            else:
+                x = width - 1
+                dx = -1
+            bits = 0
+            for n in range(width):
+                if not n & 7:
+                    bits = getrandbits(16)
+                rand = bits & 3
+                bits >>= 2
+                src = base + x
+                # Up one row, shifted by -1..+2 columns
+                dst = src - width + rand - 1
+                if 0 <= dst < size:
+                    value = heat[src] - (rand & 1)
+                    heat[dst] = value if value > 0 else 0
+                x += dx
+
+    # Send every pixel whose heat changed to set_pixel(x, y + y_offset, ...)
+    @micropython.native
+    def render(self, set_pixel, colors, y_offset=0):
+        width = self.width
+        heat = self.heat
+        shown = self.shown
+        for i in range(len(heat)):
+            value = heat[i]
+            if shown[i] != value:
+                shown[i] = value
+                r, g, b = colors[value]
+                set_pixel(i % width, i // width + y_offset, r, g, b)
+
+    # Same for an IndexedFrameBuffer: the heat value is the palette index
+    @micropython.native
+    def render_indexed(self, set_pixel, y_offset=0):
+        width = self.width
+        heat = self.heat
+        shown = self.shown
+        for i in range(len(heat)):
+            value = heat[i]
+            if shown[i] != value:
+                shown[i] = value
+                set_pixel(i % width, i // width + y_offset, value)
@@ -1,6 +1,9 @@
 import hub75
 import random
 import time
+from fire_kernel import FireKernel
+from framebuffer import IndexedFrameBuffer
+from panel_map import PanelMap
 
 # Display dimensions
 xHEIGHT = 32
@@ -16,6 +19,7 @@ display = hub75.Hub75(xWIDTH, xHEIGHT)
 # Fire simulation constants
 MAX_ROUNDS = 200
 NR_OF_COLS = 10
+FADE_FRAMES = 16    # Frames of the palette fade-out at the end
 
 # Brighter fire pixel colors
 rgbs = [
@@ -31,29 +35,21 @@ rgbs = [
     (192, 192, 255),
 ]
 
-@micropython.native
 class Fire:
     def __init__(self):
-        # Initialize the fire pixel grid
-        self._fire_pixels = [0] * (GRID_HEIGHT * GRID_WIDTH)
+        # Heat map of the fire grid, updated row by row (see fire_kernel.py)
+        self._kernel = FireKernel(GRID_WIDTH, GRID_HEIGHT)
         self._rounds = 0
         self.set_bottom_row(NR_OF_COLS - 1)
     
     def set_bottom_row(self, col):
         # Set the bottom row of the grid to the maximum color intensity
-        for i in range(GRID_WIDTH):
-            index = (GRID_HEIGHT - 1) * GRID_WIDTH + i
-            self._fire_pixels[index] = col
+        self._kernel.set_bottom_row(col)
     
     def simulate(self):
-        # Create a list of all indices in the grid except the bottom row
-        indices = [(y, x) for y in range(1, GRID_HEIGHT) for x in range(GRID_WIDTH)]
-        # Shuffle the indices using a custom shuffle function
-        self.custom_shuffle(indices)
-        
-        # Process each pixel in random order
-        for y, x in indices:
-            self.spread_fire(y * GRID_WIDTH + x)
+        # Spread the fire one row upwards and draw the pixels that changed
+        self._kernel.step()
+        self._kernel.render_indexed(set_pixel_mapped, GRID_WIDTH - GRID_HEIGHT)
         
         # Increment the round counter
         self._rounds += 1
@@ -61,66 +57,22 @@ class Fire:
         # If the fire is going out, set the bottom row to black
         if self.is_going_out():
             self.set_bottom_row(0)
-    
-    def spread_fire(self, src):
-        # Randomly determine the direction of the fire spread (left, right, or center)
-        rand = random.randint(0, 3)
-        dst = src - GRID_WIDTH + rand - 1
-        
-        # Ensure the destination is within bounds
-        if 0 <= dst < len(self._fire_pixels):
-            # Calculate the new fire intensity value
-            new_value = max(0, self._fire_pixels[src] - (rand & 1))
-            
-            # Only update if the new value is different
-            if self._fire_pixels[dst] != new_value:
-                self._fire_pixels[dst] = new_value
-                # Map the grid coordinates to display coordinates
-                x, y = dst % GRID_WIDTH, dst // GRID_WIDTH
-                r, g, b = rgbs[new_value]
-                set_pixel_mapped(x, y + (GRID_WIDTH - GRID_HEIGHT), r, g, b)
 
     def is_going_out(self):
         # Check if the fire is close to ending
         return self._rounds >= MAX_ROUNDS - 45
 
-    def custom_shuffle(self, lst):
-        # Custom shuffle function for the list
-        n = len(lst)
-        for i in range(n - 1, 0, -1):
-            j = random.randint(0, i)
-            lst[i], lst[j] = lst[j], lst[i]
+# Pixel remapping via precomputed lookup table (see panel_map.py), the heat
+# values are stored as palette indices and expanded to RGB once per frame
+framebuffer = IndexedFrameBuffer(PanelMap(display), rgbs)
+set_pixel_mapped = framebuffer.set_pixel
 
-@micropython.native
-def set_pixel_mapped(x, y, r, g, b):
-    # Convert the grid coordinates to physical display coordinates
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
-
-@micropython.native
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y
+def fade_palette(level):
+    # Scale every palette entry, the pixels themselves stay untouched
+    for index in range(NR_OF_COLS):
+        r, g, b = rgbs[index]
+        framebuffer.set_color(index, r * level // FADE_FRAMES,
+                              g * level // FADE_FRAMES, b * level // FADE_FRAMES)
 
 def main():
     fire = Fire()
@@ -128,7 +80,13 @@ def main():
     i = 100
     while i > 1:
         fire.simulate()
+        framebuffer.flush()
         i -= 1
+    # Fade the fire out by dimming the palette
+    for level in range(FADE_FRAMES - 1, -1, -1):
+        fade_palette(level)
+        fire.simulate()
+        framebuffer.flush()
     display.stop()
 
 if __name__ == "__main__":
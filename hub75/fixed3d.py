@@ -0,0 +1,185 @@
+# Fixed-point 3D transforms for wireframe meshes.
+#
+# The float path computed six sines/cosines per vertex and frame. Here
+# angles are integers in 1/65536 of a turn (0.05 rad ~ 521), sine and
+# cosine come from a 1024-entry table in Q14 (16384 = 1.0), and the three
+# rotations are multiplied into one 3x3 matrix once per frame. A vertex
+# then costs nine integer multiplications and a few shifts, no floats.
+#
+# Vertices are stored flat (x, y, z, x, y, z, ...) in an array('h') in Q12
+# (4096 = 1.0), edges as vertex index pairs in an array('H'). All
+# intermediate values stay below 2**30, so MicroPython never leaves small
+# ints and transforming a mesh allocates nothing.
+#
+#   mesh = icosphere(2)                           # 162 vertices, 480 edges
+#   matrix = array('i', [0] * 9)
+#   xs = array('h', [0] * mesh.count)
+#   ys = array('h', [0] * mesh.count)
+#   zs = array('h', [0] * mesh.count)
+#   rotation_matrix(matrix, angle_x, angle_y, angle_z)
+#   transform(mesh.vertices, mesh.count, matrix, 30, 64, 64, xs, ys, zs)
+#   # xs/ys: screen coordinates, zs: depth in Q12 (positive = far)
+#
+# The mesh builders use floats, but only once at startup.
+
+import math
+import micropython
+from array import array
+
+ONE = 4096              # Q12, vertex coordinates
+TABLE_SIZE = 1024       # Sine table entries per turn
+TABLE_SHIFT = 6         # 65536 angle units per turn >> 6 = table index
+QUARTER = TABLE_SIZE // 4
+
+# sin() in Q14 for TABLE_SIZE angles, 2 KB
+SINE = array('h', [int(round(math.sin(2 * math.pi * i / TABLE_SIZE) * 16384))
+                   for i in range(TABLE_SIZE)])
+
+
+def radians(angle):
+    # Float radians to angle units, e.g. for speeds: radians(0.05) == 521
+    return int(angle * 65536 / (2 * math.pi))
+
+
+def sin(angle):
+    return SINE[(angle >> TABLE_SHIFT) & (TABLE_SIZE - 1)]
+
+
+def cos(angle):
+    return SINE[((angle >> TABLE_SHIFT) + QUARTER) & (TABLE_SIZE - 1)]
+
+
+# Combined rotation, x first, then y, then z (the order of the old
+# rotate_vertex()), as a row-major Q14 matrix
+@micropython.native
+def rotation_matrix(matrix, angle_x, angle_y, angle_z):
+    mask = TABLE_SIZE - 1
+    ix = angle_x >> TABLE_SHIFT
+    iy = angle_y >> TABLE_SHIFT
+    iz = angle_z >> TABLE_SHIFT
+    sx = SINE[ix & mask]
+    cx = SINE[(ix + QUARTER) & mask]
+    sy = SINE[iy & mask]
+    cy = SINE[(iy + QUARTER) & mask]
+    sz = SINE[iz & mask]
+    cz = SINE[(iz + QUARTER) & mask]
+    sysx = (sy * sx) >> 14
+    sycx = (sy * cx) >> 14
+    matrix[0] = (cz * cy) >> 14
+    matrix[1] = (cz * sysx - sz * cx) >> 14
+    matrix[2] = (cz * sycx + sz * sx) >> 14
+    matrix[3] = (sz * cy) >> 14
+    matrix[4] = (sz * sysx + cz * cx) >> 14
+    matrix[5] = (sz * sycx - cz * sx) >> 14
+    matrix[6] = -sy
+    matrix[7] = (cy * sx) >> 14
+    matrix[8] = (cy * cx) >> 14
+
+
+# Rotate count vertices and project them orthographically: scale is in
+# pixels per 1.0, (center_x, center_y) the screen position of the origin.
+# Screen coordinates are rounded to the nearest pixel.
+@micropython.native
+def transform(vertices, count, matrix, scale, center_x, center_y, xs, ys, zs):
+    m0 = matrix[0]
+    m1 = matrix[1]
+    m2 = matrix[2]
+    m3 = matrix[3]
+    m4 = matrix[4]
+    m5 = matrix[5]
+    m6 = matrix[6]
+    m7 = matrix[7]
+    m8 = matrix[8]
+    i = 0
+    for n in range(count):
+        x = vertices[i]
+        y = vertices[i + 1]
+        z = vertices[i + 2]
+        i += 3
+        xs[n] = ((((m0 * x + m1 * y + m2 * z) >> 14) * scale + 2048) >> 12) + center_x
+        ys[n] = ((((m3 * x + m4 * y + m5 * z) >> 14) * scale + 2048) >> 12) + center_y
+        zs[n] = (m6 * x + m7 * y + m8 * z) >> 14
+
+
+class Mesh:
+    def __init__(self, points, edges):
+        # points: (x, y, z) floats around the origin, edges: index pairs
+        self.count = len(points)
+        self.vertices = array('h', [0] * (3 * self.count))
+        for n, point in enumerate(points):
+            for axis in range(3):
+                self.vertices[3 * n + axis] = int(round(point[axis] * ONE))
+        self.edge_count = len(edges)
+        self.edges = array('H', [0] * (2 * self.edge_count))
+        for n, (a, b) in enumerate(edges):
+            self.edges[2 * n] = a
+            self.edges[2 * n + 1] = b
+
+
+def cube():
+    points = [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+              (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0),
+             (4, 5), (5, 6), (6, 7), (7, 4),
+             (0, 4), (1, 5), (2, 6), (3, 7)]
+    return Mesh(points, edges)
+
+
+# Unit sphere from a subdivided icosahedron: 12, 42, 162, 642 vertices for
+# 0 to 3 subdivisions
+def icosphere(subdivisions=1):
+    t = (1 + math.sqrt(5)) / 2
+    points = [(-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+              (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+              (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1)]
+    faces = [(0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+             (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+             (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+             (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)]
+
+    def unit(p):
+        length = math.sqrt(p[0] * p[0] + p[1] * p[1] + p[2] * p[2])
+        return (p[0] / length, p[1] / length, p[2] / length)
+
+    points = [unit(p) for p in points]
+    for _ in range(subdivisions):
+        middles = {}
+
+        def middle(a, b):
+            key = (a, b) if a < b else (b, a)
+            if key not in middles:
+                pa = points[a]
+                pb = points[b]
+                points.append(unit(((pa[0] + pb[0]) / 2, (pa[1] + pb[1]) / 2, (pa[2] + pb[2]) / 2)))
+                middles[key] = len(points) - 1
+            return middles[key]
+
+        refined = []
+        for a, b, c in faces:
+            ab = middle(a, b)
+            bc = middle(b, c)
+            ca = middle(c, a)
+            refined += [(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)]
+        faces = refined
+    edges = set()
+    for a, b, c in faces:
+        for u, v in ((a, b), (b, c), (c, a)):
+            edges.add((u, v) if u < v else (v, u))
+    return Mesh(points, sorted(edges))
+
+
+# Torus around the z axis: rings segments around the big circle, sides
+# segments around the tube; radii relative to 1.0
+def torus(rings=16, sides=8, major=0.7, minor=0.3):
+    points = []
+    edges = []
+    for i in range(rings):
+        u = 2 * math.pi * i / rings
+        for j in range(sides):
+            v = 2 * math.pi * j / sides
+            r = major + minor * math.cos(v)
+            points.append((r * math.cos(u), r * math.sin(u), minor * math.sin(v)))
+            n = i * sides + j
+            edges.append((n, i * sides + (j + 1) % sides))
+            edges.append((n, ((i + 1) % rings) * sides + j))
+    return Mesh(points, edges)
@@ -0,0 +1,229 @@
+# Scanline flood fill on a bytearray grid.
+#
+# The old floodfill() pushed a tuple for every neighbour of every pixel,
+# filled or not, and took them from the front of a list (pop(0) moves the
+# whole list). The queue grew to thousands of entries, so the fill was
+# capped at max_steps and big areas stayed unfilled.
+#
+# FloodFill fills whole horizontal spans: take a seed, extend it left and
+# right as far as the cells are fillable, mark the span and queue one seed
+# per fillable run in the rows above and below. Seeds are packed cell
+# numbers (y * width + x) in a preallocated array('H') ring, so the queue
+# never grows and nothing is allocated while filling.
+#
+# If the ring is ever full, seeds are dropped and counted, and their row is
+# marked. Once the queue has run dry, the marked rows are scanned for
+# fillable cells next to a cell of this fill and the fill continues from
+# there. The result is still complete, only slower, so capacity limits
+# memory, not correctness. A rescan costs one pass over each marked row,
+# but a queue much too small for the grid (a comb of dead ends with a
+# capacity of a few seeds) can need a rescan per handful of spans, up to
+# O(width * height) per rescan in the worst case, so quadratic overall.
+# The fill value should not appear in the grid before the fill.
+#
+#   fill = FloodFill(grid, WIDTH, HEIGHT, fillable=(0, 3))
+#   pixels = fill.fill(x, y, 2, draw_span)    # draw_span(x, y, length, n)
+#
+# draw_span is called once per span; n is the number of pixels filled
+# before it, e.g. for a colour gradient. Statistics of the last fill:
+# pixels, spans, peak (queue depth), dropped (seeds), rescans.
+#
+# A fill can also be spread over many frames. All its state lives in the
+# object, so start() sets it up and step(budget) fills about budget pixels
+# and returns whether there is work left:
+#
+#   fill.start(x, y, 2, draw_span)
+#   while fill.step(200):                     # 200 pixels per frame
+#       ...                                   # draw the rest of the frame
+#
+# Several fills can run on the same grid at the same time, each with its
+# own FloodFill (queue) and its own fill value. A fill stops where another
+# one has already been: filled cells are no longer fillable.
+
+import micropython
+from array import array
+
+
+class FloodFill:
+    def __init__(self, grid, width, height, fillable=(0,), capacity=512):
+        self.grid = grid
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.queue = array('H', [0] * capacity)
+        # Grid value -> 1 if the fill may enter the cell
+        self.fillable = bytearray(256)
+        for value in fillable:
+            self.fillable[value] = 1
+        self.head = 0
+        self.count = 0
+        self.pixels = 0
+        self.spans = 0
+        self.peak = 0
+        self.dropped = 0
+        self.rescans = 0
+        self.lost = False
+        # Row -> 1 if a seed in it was dropped since its last rescan
+        self.lost_rows = bytearray(height)
+        self.value = 0
+        self.draw_span = None
+        self.active = False
+
+    @micropython.native
+    def _push(self, cell):
+        count = self.count
+        if count < self.capacity:
+            index = self.head + count
+            if index >= self.capacity:
+                index -= self.capacity
+            self.queue[index] = cell
+            count += 1
+            self.count = count
+            if count > self.peak:
+                self.peak = count
+        else:
+            self.dropped += 1
+            self.lost = True
+            self.lost_rows[cell // self.width] = 1
+
+    # Seeds after dropped ones: every fillable cell next to the fill in the
+    # rows that lost seeds
+    @micropython.native
+    def _rescan(self, value):
+        grid = self.grid
+        fillable = self.fillable
+        lost_rows = self.lost_rows
+        width = self.width
+        size = width * self.height
+        self.rescans += 1
+        for y in range(self.height):
+            if not lost_rows[y]:
+                continue
+            lost_rows[y] = 0
+            row = y * width
+            for cell in range(row, row + width):
+                if fillable[grid[cell]]:
+                    x = cell - row
+                    if ((x > 0 and grid[cell - 1] == value) or
+                            (x < width - 1 and grid[cell + 1] == value) or
+                            (cell >= width and grid[cell - width] == value) or
+                            (cell + width < size and grid[cell + width] == value)):
+                        self._push(cell)
+
+    # Begin a fill at (x, y); step() does the work
+    def start(self, x, y, value, draw_span=None):
+        self.value = value
+        self.draw_span = draw_span
+        self.head = 0
+        self.count = 0
+        self.pixels = 0
+        self.spans = 0
+        self.peak = 0
+        self.dropped = 0
+        self.rescans = 0
+        self.lost = False
+        for row in range(self.height):
+            self.lost_rows[row] = 0
+        self.active = 0 <= x < self.width and 0 <= y < self.height
+        if self.active:
+            self._push(y * self.width + x)
+
+    # Fill spans until budget pixels are done (a span is never split, so
+    # the last one may overshoot), returns True while there is work left
+    @micropython.native
+    def step(self, budget):
+        if not self.active:
+            return False
+        grid = self.grid
+        fillable = self.fillable
+        queue = self.queue
+        width = self.width
+        height = self.height
+        capacity = self.capacity
+        size = width * height
+        value = self.value
+        draw_span = self.draw_span
+        lost_rows = self.lost_rows
+        head = self.head
+        count = self.count
+        peak = self.peak
+        pixels = self.pixels
+        spans = self.spans
+        limit = pixels + budget
+        while pixels < limit:
+            if count == 0:
+                if not self.lost:
+                    self.active = False
+                    break
+                self.lost = False
+                self.head = head
+                self.count = 0
+                self.peak = peak
+                self._rescan(value)
+                head = self.head
+                count = self.count
+                peak = self.peak
+                if count == 0:
+                    self.active = False
+                    break
+            cell = queue[head]
+            head += 1
+            if head == capacity:
+                head = 0
+            count -= 1
+            if not fillable[grid[cell]]:
+                continue
+            sx = cell % width
+            row = cell - sx
+            left = sx
+            while left > 0 and fillable[grid[row + left - 1]]:
+                left -= 1
+            right = sx
+            while right < width - 1 and fillable[grid[row + right + 1]]:
+                right += 1
+            for i in range(row + left, row + right + 1):
+                grid[i] = value
+            length = right - left + 1
+            sy = row // width
+            if draw_span is not None:
+                draw_span(left, sy, length, pixels)
+            pixels += length
+            spans += 1
+            # One seed per fillable run in the rows above and below
+            for k in range(2):
+                other = row - width if k == 0 else row + width
+                if other < 0 or other >= size:
+                    continue
+                inside = False
+                for i in range(other + left, other + right + 1):
+                    if fillable[grid[i]]:
+                        if not inside:
+                            inside = True
+                            if count < capacity:
+                                tail = head + count
+                                if tail >= capacity:
+                                    tail -= capacity
+                                queue[tail] = i
+                                count += 1
+                                if count > peak:
+                                    peak = count
+                            else:
+                                self.dropped += 1
+                                self.lost = True
+                                lost_rows[other // width] = 1
+                    else:
+                        inside = False
+        if count == 0 and not self.lost:
+            self.active = False
+        self.head = head
+        self.count = count
+        self.peak = peak
+        self.pixels = pixels
+        self.spans = spans
+        return self.active
+
+    # The whole fill in one call, returns the number of pixels filled
+    def fill(self, x, y, value, draw_span=None):
+        self.start(x, y, value, draw_span)
+        self.step(self.width * self.height)
+        return self.pixels
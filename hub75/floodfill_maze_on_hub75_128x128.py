@@ -3,6 +3,11 @@ import micropython
 import random
 import time
 import gc
+from color import hue_to_rgb
+from flood_fill import FloodFill
+from frame_pacer import FramePacer
+from maze import MazeGenerator
+from panel_map import PanelMap
 
 # Konstanten
 HEIGHT = 128
@@ -17,38 +22,9 @@ xHEIGHT = HEIGHT // 4    # 32 Zeilen pro Modul
 xWIDTH = WIDTH * 4       # 512 Spalten (4x128)
 display = hub75.Hub75(xWIDTH, xHEIGHT)
 
-# Funktion für das X/Y-Remapping
-@micropython.native
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y  # Identity transformation for values >= 128
-
-
-# Funktion zum Setzen eines Pixels mit Remapping
-@micropython.native
-def set_pixel_mapped(x, y, r, g, b):
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
+# Pixel-Remapping über vorberechnete Tabelle (siehe panel_map.py)
+panel = PanelMap(display)
+set_pixel_mapped = panel.set_pixel_mapped
 
 # Global variable for the grid
 grid = bytearray(WIDTH * HEIGHT)
@@ -58,10 +34,26 @@ grid = bytearray(WIDTH * HEIGHT)
 # 1 = line
 # 2 = floodfill
 # 3 = enemy
+# 6, 7 = floodfill of the second and third enemy
+
+# Scanline-Füllung mit Seed-Queue fester Größe (siehe flood_fill.py).
+# Jeder Gegner füllt mit eigenem Wert und eigener Queue, alle gleichzeitig,
+# PIXELS_PER_TICK Pixel pro Gegner und Tick bei TICKS_PER_SECOND Ticks pro
+# Sekunde (siehe frame_pacer.py)
+ENEMIES = 3
+FILL_VALUES = (2, 6, 7)
+PIXELS_PER_TICK = 60
+TICKS_PER_SECOND = 30
+fills = [FloodFill(grid, WIDTH, HEIGHT, fillable=(0, 3), capacity=256) for _ in range(ENEMIES)]
+pacer = FramePacer(TICKS_PER_SECOND)
+
+# Pixel, über die der Farbverlauf einmal den Farbkreis durchläuft
+GRADIENT_PIXELS = 16000
 
 def initialize_grid():
-    global grid
-    grid = bytearray(WIDTH * HEIGHT)
+    # In place leeren, die Füllung hält eine Referenz auf das Grid
+    for i in range(WIDTH * HEIGHT):
+        grid[i] = 0
 
 def get_grid_value(x, y):
     return grid[y * WIDTH + x]
@@ -69,77 +61,60 @@ def get_grid_value(x, y):
 def set_grid_value(x, y, value):
     grid[y * WIDTH + x] = value
     
-def hsb_to_rgb(hue, saturation, brightness):
-    hue_normalized = (hue % 360) / 60
-    hue_index = int(hue_normalized)
-    hue_fraction = hue_normalized - hue_index
-
-    value1 = brightness * (1 - saturation)
-    value2 = brightness * (1 - saturation * hue_fraction)
-    value3 = brightness * (1 - saturation * (1 - hue_fraction))
-
-    red, green, blue = [
-        (brightness, value3, value1),
-        (value2, brightness, value1),
-        (value1, brightness, value3),
-        (value1, value2, brightness),
-        (value3, value1, brightness),
-        (brightness, value1, value2)
-    ][hue_index]
-
-    return int(red * 255), int(green * 255), int(blue * 255)
-    
 MazeWaySize = 8
-    
-def draw_maze_on_grid():
-    # Labyrinth-Generierungsfunktion mit Depth-First Search (Recursive Backtracker)
-    stack = []
-    visited = set()
-
-    # Startpunkt in der Mitte
-    start_x = random.randint(BORDER // 2, WIDTH - BORDER // 2)
-    start_y = random.randint(BORDER // 2, HEIGHT - BORDER // 2)
-
-    stack.append((start_x, start_y))
-    visited.add((start_x, start_y))
-
-    # Bewegungen (rechts, links, oben, unten) um 4 Zellen für breite Korridore
-    directions = [(0, MazeWaySize), (0, -MazeWaySize), (MazeWaySize, 0), (-MazeWaySize, 0)]
 
-    while stack:
-        x, y = stack[-1]
+# Labyrinth-Algorithmus (siehe maze.py): "dfs" (Recursive Backtracker, lange
+# Gänge), "wilson" (gleichverteilt) oder "eller" (zeilenweise)
+MAZE_ALGORITHM = "dfs"
 
-        # Mischen der Richtungen
-        mixed_directions = directions[:]  # Kopie der Richtungen
-        for i in range(len(mixed_directions) - 1, 0, -1):
-            j = random.randint(0, i)
-            mixed_directions[i], mixed_directions[j] = mixed_directions[j], mixed_directions[i]
+# Größtes Gitter: eine Zelle alle MazeWaySize Pixel
+maze_generator = MazeGenerator((WIDTH - 2) // MazeWaySize + 1, (HEIGHT - 2) // MazeWaySize + 1)
 
-        found_unvisited_neighbor = False
 
-        for dx, dy in mixed_directions:
-            nx, ny = x + dx, y + dy
-            if 0 < nx < WIDTH and 0 < ny < HEIGHT and (nx, ny) not in visited:
-                # Füge Verbindung zwischen den Zellen (Mauer entfernen) und breite den Weg aus
-                for i in range(1, MazeWaySize):  # Zellen dazwischen freiräumen, um 3-Zellen breite Gänge zu schaffen
-                    set_grid_value(x + (dx // MazeWaySize) * i, y + (dy // MazeWaySize) * i, 1)
-                    set_pixel_mapped(x + (dx // MazeWaySize) * i, y + (dy // MazeWaySize) * i, 255, 255, 255)
+def carve_span(x, y, length, horizontal):
+    # Gang als ein Span: Zwischenzellen 1, Zellen des Gitters 5
+    if horizontal:
+        for i in range(length):
+            set_grid_value(x + i, y, 1)
+        set_grid_value(x, y, 5)
+        set_grid_value(x + length - 1, y, 5)
+        panel.fill_hspan(x, y, length, 255, 255, 255)
+    else:
+        for i in range(length):
+            set_grid_value(x, y + i, 1)
+        set_grid_value(x, y, 5)
+        set_grid_value(x, y + length - 1, 5)
+        panel.fill_vspan(x, y, length, 255, 255, 255)
 
-                # Füge die neue Zelle zum Stack hinzu und markiere sie als besucht
-                stack.append((nx, ny))
-                visited.add((nx, ny))
 
-                # Zeichne den aktuellen Pfad (Endpunkt des Sprungs)
-                set_grid_value(nx, ny, 5)
-                set_pixel_mapped(nx, ny, 255, 255, 255)
+def draw_maze_on_grid():
+    # Startpunkt in der Mitte, das Gitter liegt im Raster MazeWaySize um ihn
+    start_x = random.randint(BORDER // 2, WIDTH - BORDER // 2)
+    start_y = random.randint(BORDER // 2, HEIGHT - BORDER // 2)
+    origin_x = start_x % MazeWaySize or MazeWaySize
+    origin_y = start_y % MazeWaySize or MazeWaySize
+    columns = (WIDTH - 1 - origin_x) // MazeWaySize + 1
+    rows = (HEIGHT - 1 - origin_y) // MazeWaySize + 1
+
+    def passage(cell, other):
+        if other < cell:
+            cell, other = other, cell
+        x = origin_x + (cell % columns) * MazeWaySize
+        y = origin_y + (cell // columns) * MazeWaySize
+        carve_span(x, y, MazeWaySize + 1, other == cell + 1)
+
+    start = ((start_y - origin_y) // MazeWaySize) * columns + (start_x - origin_x) // MazeWaySize
+    if MAZE_ALGORITHM == "wilson":
+        maze_generator.wilson(columns, rows, start, passage)
+    elif MAZE_ALGORITHM == "eller":
+        maze_generator.eller(columns, rows, passage)
+    else:
+        maze_generator.dfs(columns, rows, start, passage)
 
-                found_unvisited_neighbor = True
-                break
+    return place_enemy()
 
-        if not found_unvisited_neighbor:
-            # Rückwärts, wenn keine unbesuchten Nachbarn vorhanden sind
-            stack.pop()
 
+def place_enemy():
     # Wähle zufällig einen Gegner in einer leeren Zelle
     while True:
         enemy_x = random.randint(BORDER, WIDTH - BORDER - 1)
@@ -147,46 +122,40 @@ def draw_maze_on_grid():
         if get_grid_value(enemy_x, enemy_y) == 0:
             break
 
+    set_grid_value(enemy_x, enemy_y, 3)
     return enemy_x, enemy_y
 
 
-@micropython.native
-def floodfill(x, y, r, g, b, max_steps=16000):
-    stack = [(x, y)]
-    steps = 0
-    hue_start = 0  # Startwert für den Farbverlauf
-    hue_end = 360  # Endwert für den Farbverlauf
-
-    while stack and steps < max_steps:
-        x, y = stack.pop(0)
-        grid_value = get_grid_value(x, y)
-
-        if x < 0 or x >= WIDTH or y < 0 or y >= HEIGHT:
-            continue
-        if grid_value != 0 and grid_value != 3:
-            continue
+def make_draw_span(hue_offset):
+    def draw_fill_span(x, y, length, filled):
+        # Farbverlauf nach Anzahl der bisher gefüllten Pixel, eine Farbe pro Span
+        hue = (hue_offset + filled * 360 // GRADIENT_PIXELS) % 360
+        r, g, b = hue_to_rgb(hue)
+        panel.fill_hspan(x, y, length, r, g, b)
 
-        set_grid_value(x, y, 2)
+    return draw_fill_span
 
-        if grid_value != 3:
-            # Berechne den Farbverlauf basierend auf der Anzahl der Schritte
-            hue = hue_start + (hue_end - hue_start) * (steps / max_steps)
-            rgb_color = hsb_to_rgb(hue, 1.0, 1.0)  # Volle Sättigung und Helligkeit
-            set_pixel_mapped(x, y, *rgb_color)
 
-        steps += 1
+# Jeder Gegner beginnt an einer anderen Stelle des Farbkreises
+draw_spans = [make_draw_span(360 * k // ENEMIES) for k in range(ENEMIES)]
 
-        # Nachbarpixel zur Liste hinzufügen
-        if x + 1 < WIDTH:
-            stack.append((x + 1, y))
-        if x - 1 >= 0:
-            stack.append((x - 1, y))
-        if y + 1 < HEIGHT:
-            stack.append((x, y + 1))
-        if y - 1 >= 0:
-            stack.append((x, y - 1))
 
-    return len(stack) > 0  # Gibt zurück, ob noch Arbeit übrig ist
+def floodfill(enemies):
+    # Alle Füllungen starten und abwechselnd weiterlaufen lassen, bis keine
+    # mehr Arbeit hat
+    for k in range(ENEMIES):
+        fills[k].start(enemies[k][0], enemies[k][1], FILL_VALUES[k], draw_spans[k])
+    # Pause und Labyrinthbau seit der letzten Runde nicht nachholen
+    pacer.reset()
+    active = True
+    while active:
+        for _ in range(pacer.begin()):
+            active = False
+            for fill in fills:
+                if fill.step(PIXELS_PER_TICK):
+                    active = True
+        pacer.end()
+    return sum(fill.pixels for fill in fills)
 
 
 display.start()
@@ -195,18 +164,22 @@ while True:
     display.clear()
     initialize_grid()
     
-    enemy_x, enemy_y = draw_maze_on_grid()
-    
-    set_grid_value(enemy_x, enemy_y, 3)
+    enemies = [draw_maze_on_grid()]
+    while len(enemies) < ENEMIES:
+        enemies.append(place_enemy())
 
     # Speicherbereinigung und Stats ausgeben
     gc.collect()
     print("Memory before floodfill:", gc.mem_free())
     
-    floodfill(enemy_x, enemy_y, 140, 100, 5)
+    start = time.ticks_us()
+    pixels = floodfill(enemies)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
 
     gc.collect()
     print("Memory after floodfill:", gc.mem_free())
+    print("Filled {} pixels in {} ms ({} px/s), peak queue {}".format(
+        pixels, elapsed // 1000, pixels * 1000000 // max(elapsed, 1), max(fill.peak for fill in fills)))
 
     time.sleep(1)
     display.clear()
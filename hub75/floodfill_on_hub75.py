@@ -3,6 +3,7 @@ import micropython
 import random
 import time
 import gc
+from flood_fill import FloodFill
 
 # Constants
 HEIGHT = 64
@@ -22,9 +23,13 @@ grid = bytearray(WIDTH * HEIGHT)
 # 3 = enemy
 
 
+# Scanline fill with a fixed-size seed queue (see flood_fill.py)
+flood = FloodFill(grid, WIDTH, HEIGHT, fillable=(0, 3), capacity=128)
+
 def initialize_grid():
-    global grid
-    grid = bytearray(WIDTH * HEIGHT)
+    # Cleared in place, the fill keeps a reference to the grid
+    for i in range(WIDTH * HEIGHT):
+        grid[i] = 0
 
 def get_grid_value(x, y):
     return grid[y * WIDTH + x]
@@ -64,38 +69,12 @@ def draw_line_on_grid():
     display.set_pixel(enemy_x, enemy_y, 255, 0, 0)
     return enemy_x, enemy_y
 
-@micropython.native
-def floodfill(x, y, r, g, b, max_steps=8000):
-    stack = [(x, y)]
-    steps = 0
-
-    while stack and steps < max_steps:
-        x, y = stack.pop(0)
-        grid_value = get_grid_value(x, y)
-        
-        if x < 0 or x >= WIDTH or y < 0 or y >= HEIGHT:
-            continue
-        if grid_value != 0 and grid_value != 3:
-            continue
-
-        set_grid_value(x, y, 2)
+def floodfill(x, y, r, g, b):
+    def draw_span(span_x, span_y, length, filled):
+        for i in range(length):
+            display.set_pixel(span_x + i, span_y, r, g, b)
 
-        if grid_value != 3:
-            display.set_pixel(x, y, r, g, b)
-
-        steps += 1
-
-        # Add neighboring pixels to the stack
-        if x + 1 < WIDTH:
-            stack.append((x + 1, y))
-        if x - 1 >= 0:
-            stack.append((x - 1, y))
-        if y + 1 < HEIGHT:
-            stack.append((x, y + 1))
-        if y - 1 >= 0:
-            stack.append((x, y - 1))
-
-    return len(stack) > 0  # Indicates if there's still work left
+    return flood.fill(x, y, 2, draw_span)
 
 display.start()
 
@@ -109,10 +88,15 @@ while True:
     gc.collect()
     print("Memory before floodfill:", gc.mem_free())
     
-    floodfill(enemy_x, enemy_y, 140, 100, 5)
+    start = time.ticks_us()
+    pixels = floodfill(enemy_x, enemy_y, 140, 100, 5)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    display.set_pixel(enemy_x, enemy_y, 255, 0, 0)
 
     gc.collect()
     print("Memory after floodfill:", gc.mem_free())
+    print("Filled {} pixels in {} ms ({} px/s), peak queue {}".format(
+        pixels, elapsed // 1000, pixels * 1000000 // max(elapsed, 1), flood.peak))
 
     time.sleep(1)
     display.clear()
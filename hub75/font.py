@@ -0,0 +1,130 @@
+# 5x5 bitmap font with a text-run cache.
+#
+# The glyphs are written as '0'/'1' strings for readability and packed into
+# 5 bytes per glyph at import time (one byte per row, bit 4 = leftmost
+# pixel), so drawing a glyph is a single blit() of its row masks.
+#
+# A TextRun remembers the string it shows at a fixed position. Drawing the
+# same string again costs nothing; a changed string only touches the glyphs
+# that differ, and of those only the pixels that flip: old & ~new are
+# cleared, new & ~old are set. "12:34" -> "12:35" repaints a few pixels of
+# the last digit. A string of a different length is drawn in full.
+#
+# Drawing targets need blit(x, y, rows, width, r, g, b) and
+# fill_rect(x, y, width, height, r, g, b): a PanelMap, or PixelTarget for
+# displays that are addressed directly.
+#
+#   clock = TextRun(panel, 97, 1)
+#   clock.draw("{:02}:{:02}".format(hour, minute))    # every frame
+#   clock.invalidate()    # something else was drawn over the text
+
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 5
+ADVANCE = 6     # Glyph width plus one column spacing
+
+_SOURCE = {
+    '0': ["01110", "10001", "10001", "10001", "01110"],
+    '1': ["00100", "01100", "00100", "00100", "01110"],
+    '2': ["11110", "00001", "01110", "10000", "11111"],
+    '3': ["11110", "00001", "00110", "00001", "11110"],
+    '4': ["10000", "10010", "10010", "11111", "00010"],
+    '5': ["11111", "10000", "11110", "00001", "11110"],
+    '6': ["01110", "10000", "11110", "10001", "01110"],
+    '7': ["11111", "00010", "00100", "01000", "10000"],
+    '8': ["01110", "10001", "01110", "10001", "01110"],
+    '9': ["01110", "10001", "01111", "00001", "01110"],
+    ' ': ["00000", "00000", "00000", "00000", "00000"],
+    '.': ["00000", "00000", "00000", "00000", "00001"],
+    ':': ["00000", "00100", "00000", "00100", "00000"]
+}
+
+GLYPHS = {}
+for _char, _rows in _SOURCE.items():
+    GLYPHS[_char] = bytes(int(row, 2) for row in _rows)
+del _SOURCE, _char, _rows
+
+# Characters without a glyph are drawn as a space
+BLANK = GLYPHS[' ']
+
+
+def draw_text(target, x, y, text, r, g, b):
+    for char in text:
+        target.blit(x, y, GLYPHS.get(char, BLANK), GLYPH_WIDTH, r, g, b)
+        x += ADVANCE
+
+
+# blit()/fill_rect() with per-pixel writes, e.g. for display.set_pixel of a
+# panel that needs no remapping
+class PixelTarget:
+    def __init__(self, set_pixel):
+        self.set_pixel = set_pixel
+
+    def blit(self, x, y, rows, width, r, g, b):
+        set_pixel = self.set_pixel
+        for bits in rows:
+            px = x + width - 1
+            while bits:
+                if bits & 1:
+                    set_pixel(px, y, r, g, b)
+                bits >>= 1
+                px -= 1
+            y += 1
+
+    def fill_rect(self, x, y, width, height, r, g, b):
+        set_pixel = self.set_pixel
+        for py in range(y, y + height):
+            for px in range(x, x + width):
+                set_pixel(px, py, r, g, b)
+
+
+class TextRun:
+    def __init__(self, target, x, y, r=255, g=255, b=255):
+        self.target = target
+        self.x = x
+        self.y = y
+        self.color = (r, g, b)
+        self.text = None
+        self._rows = bytearray(GLYPH_HEIGHT)
+
+    # Forget what is on screen, the next draw() clears the text box and
+    # renders the whole string
+    def invalidate(self):
+        self.text = None
+
+    # Returns the number of glyphs that had to be touched
+    def draw(self, text):
+        old = self.text
+        if text == old:
+            return 0
+        target = self.target
+        r, g, b = self.color
+        if old is None or len(old) != len(text):
+            # Clear the box (the old one if it was longer) and draw everything
+            length = len(text) if old is None else max(len(old), len(text))
+            target.fill_rect(self.x, self.y, length * ADVANCE, GLYPH_HEIGHT, 0, 0, 0)
+            draw_text(target, self.x, self.y, text, r, g, b)
+            self.text = text
+            return len(text)
+
+        rows = self._rows
+        touched = 0
+        x = self.x
+        for i in range(len(text)):
+            before = GLYPHS.get(old[i], BLANK)
+            after = GLYPHS.get(text[i], BLANK)
+            if before != after:
+                for row in range(GLYPH_HEIGHT):
+                    rows[row] = before[row] & ~after[row]
+                target.blit(x, self.y, rows, GLYPH_WIDTH, 0, 0, 0)
+                for row in range(GLYPH_HEIGHT):
+                    rows[row] = after[row] & ~before[row]
+                target.blit(x, self.y, rows, GLYPH_WIDTH, r, g, b)
+                touched += 1
+            x += ADVANCE
+        self.text = text
+        return touched
+
+    # True if (x, y) lies in the box of the current text
+    def covers(self, x, y):
+        return (self.text is not None and self.x <= x < self.x + len(self.text) * ADVANCE
+                and self.y <= y < self.y + GLYPH_HEIGHT)
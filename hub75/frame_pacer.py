@@ -0,0 +1,141 @@
+# Frame pacing: fixed-timestep simulation with a separate render rate.
+#
+# The loops either ran flat out (speed depends on the snake length and on
+# whatever else the CPU does) or slept a fixed time after a frame of
+# unknown length. FramePacer keeps two clocks:
+#
+# - simulation: a tick every 1/tick_hz s. begin() returns how many ticks
+#   are due since the last frame, so a slow frame is caught up by running
+#   more ticks in the next one. At most max_catch_up ticks are run per
+#   frame; anything beyond that is dropped (counted in dropped_ticks)
+#   instead of letting the game spiral into running ticks only.
+# - rendering: a frame every 1/fps s. end() sleeps out what is left of the
+#   frame budget. A frame that overruns its deadline counts the deadlines
+#   it missed in dropped_frames; if it is more than a frame behind, the
+#   schedule restarts from now instead of rushing frames to catch up.
+#
+# reset() starts over as if the pacer were new, e.g. after a pause between
+# two rounds, so the pause is neither caught up in ticks nor counted as
+# dropped.
+#
+# Statistics since the last reset_stats(): frames, ticks, dropped frames
+# and ticks, jitter (how far the interval between two frame starts is off
+# 1/fps, average and max in us) and the busy share (time between begin()
+# and end() relative to the frame budget). report() prints them;
+# report_every > 0 does that automatically every that many frames. All of
+# it is plain integer arithmetic, a frame allocates nothing.
+#
+#   pacer = FramePacer(tick_hz=30, fps=30)
+#   while True:
+#       for _ in range(pacer.begin()):
+#           simulate()                 # fixed step, 1 / tick_hz
+#       render()
+#       pacer.end()                    # sleeps until the next frame is due
+
+try:
+    from time import sleep_us, ticks_add, ticks_us, ticks_diff
+except ImportError:
+    # CPython, for the host benchmarks
+    from time import perf_counter, sleep
+
+    def ticks_us():
+        return int(perf_counter() * 1000000) & 0x3FFFFFFF
+
+    def ticks_add(a, delta):
+        return (a + delta) & 0x3FFFFFFF
+
+    def ticks_diff(a, b):
+        return ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+
+    def sleep_us(us):
+        sleep(us / 1000000)
+
+
+class FramePacer:
+    def __init__(self, tick_hz, fps=None, max_catch_up=4, report_every=0, output=print):
+        self.tick_us = 1000000 // tick_hz
+        self.frame_us = 1000000 // (fps or tick_hz)
+        self.max_catch_up = max_catch_up
+        self.report_every = report_every
+        self.output = output
+        self.accumulated = 0
+        self.last = 0
+        self.deadline = 0
+        self.frame_started = 0
+        self.started = False
+        self.reset_stats()
+
+    def reset(self):
+        self.started = False
+        self.accumulated = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.ticks = 0
+        self.dropped_frames = 0
+        self.dropped_ticks = 0
+        self.intervals = 0
+        self.jitter_total = 0
+        self.jitter_max = 0
+        self.busy_total = 0
+
+    # Start of a frame, returns the number of simulation ticks to run
+    def begin(self):
+        now = ticks_us()
+        if not self.started:
+            # First frame: one tick, deadlines from here on
+            self.started = True
+            self.last = now
+            self.deadline = now
+            self.frame_started = now
+            self.accumulated = self.tick_us
+        else:
+            interval = ticks_diff(now, self.frame_started)
+            jitter = interval - self.frame_us
+            if jitter < 0:
+                jitter = -jitter
+            self.intervals += 1
+            self.jitter_total += jitter
+            if jitter > self.jitter_max:
+                self.jitter_max = jitter
+            self.frame_started = now
+            self.accumulated += ticks_diff(now, self.last)
+            self.last = now
+        due = self.accumulated // self.tick_us
+        if due > self.max_catch_up:
+            self.dropped_ticks += due - self.max_catch_up
+            due = self.max_catch_up
+            self.accumulated = due * self.tick_us
+        self.accumulated -= due * self.tick_us
+        self.ticks += due
+        return due
+
+    # End of a frame: sleep until the next one is due
+    def end(self):
+        now = ticks_us()
+        self.busy_total += ticks_diff(now, self.frame_started)
+        self.frames += 1
+        self.deadline = ticks_add(self.deadline, self.frame_us)
+        remaining = ticks_diff(self.deadline, now)
+        if remaining >= 0:
+            sleep_us(remaining)
+        else:
+            missed = (-remaining - 1) // self.frame_us + 1
+            self.dropped_frames += missed
+            if missed > 1:
+                # Too far behind: restart the schedule instead of rushing
+                self.deadline = now
+        if self.report_every and self.frames >= self.report_every:
+            self.report()
+            self.reset_stats()
+
+    def report(self):
+        if not self.frames:
+            return
+        frames = self.frames
+        intervals = self.intervals or 1
+        self.output("frames {}  ticks {}  dropped {} frames / {} ticks  jitter avg {} max {} us  busy {}%".format(
+            frames, self.ticks, self.dropped_frames, self.dropped_ticks,
+            self.jitter_total // intervals, self.jitter_max,
+            100 * self.busy_total // (frames * self.frame_us)))
@@ -0,0 +1,251 @@
+# Logical framebuffers with dirty-span tracking: FrameBuffer stores RGB,
+# IndexedFrameBuffer palette indices.
+#
+# Simulations write into a bytearray (3 bytes per logical pixel) instead of
+# calling the driver directly. Writes that do not change a pixel are dropped,
+# changed pixels are marked in a dirty bitmap (1 bit per pixel) and every row
+# remembers the leftmost and rightmost changed column. flush() walks only
+# those spans and pushes every changed pixel once per frame through the
+# PanelMap lookup table, no matter how often it was written in between.
+#
+# Usage in a script:
+#
+#   panel = PanelMap(display)
+#   framebuffer = FrameBuffer(panel)
+#   set_pixel_mapped = framebuffer.set_pixel
+#   ...
+#   framebuffer.flush()   # once per frame
+
+import micropython
+from array import array
+
+
+class FrameBuffer:
+    def __init__(self, panel):
+        self.panel = panel
+        self.width = panel.width
+        self.height = panel.height
+        self.pixels = bytearray(self.width * self.height * 3)
+        self.changed = bytearray((self.width * self.height + 7) // 8)
+        # Changed columns per row; an empty span has start > end
+        self.span_start = array('H', [self.width] * self.height)
+        self.span_end = array('H', [0] * self.height)
+        self.dirty = False
+
+    @micropython.native
+    def set_pixel(self, x, y, r, g, b):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            pixels = self.pixels
+            i = (y * self.width + x) * 3
+            if pixels[i] != r or pixels[i + 1] != g or pixels[i + 2] != b:
+                pixels[i] = r
+                pixels[i + 1] = g
+                pixels[i + 2] = b
+                index = y * self.width + x
+                self.changed[index >> 3] |= 1 << (index & 7)
+                if x < self.span_start[y]:
+                    self.span_start[y] = x
+                if x > self.span_end[y]:
+                    self.span_end[y] = x
+                self.dirty = True
+
+    def get_pixel(self, x, y):
+        i = (y * self.width + x) * 3
+        return self.pixels[i], self.pixels[i + 1], self.pixels[i + 2]
+
+    # Fill the whole buffer; only pixels that actually change are flushed
+    def fill(self, r, g, b):
+        for y in range(self.height):
+            for x in range(self.width):
+                self.set_pixel(x, y, r, g, b)
+
+    # Push all changed pixels to the display, returns the number of pixels sent
+    @micropython.native
+    def flush(self):
+        if not self.dirty:
+            return 0
+        set_pixel = self.panel.display.set_pixel
+        table = self.panel.table
+        y_bits = self.panel.y_bits
+        y_mask = self.panel.y_mask
+        pixels = self.pixels
+        changed = self.changed
+        width = self.width
+        span_start = self.span_start
+        span_end = self.span_end
+        sent = 0
+        for y in range(self.height):
+            start = span_start[y]
+            end = span_end[y]
+            if start > end:
+                continue
+            span_start[y] = width
+            span_end[y] = 0
+            # Whole bitmap bytes covering the span; bits that belong to a
+            # neighbouring row are flushed early, which is harmless
+            row = y * width
+            for k in range((row + start) >> 3, ((row + end) >> 3) + 1):
+                bits = changed[k]
+                if bits:
+                    changed[k] = 0
+                    index = k << 3
+                    while bits:
+                        if bits & 1:
+                            p = table[index]
+                            i = index * 3
+                            set_pixel(p >> y_bits, p & y_mask, pixels[i], pixels[i + 1], pixels[i + 2])
+                            sent += 1
+                        bits >>= 1
+                        index += 1
+        self.dirty = False
+        return sent
+
+
+# Palette-indexed framebuffer: 1 byte per pixel plus a palette of up to 256
+# RGB entries, for effects that only ever show a few fixed colours (fire).
+# flush() expands the indices to RGB once per frame. Changing a palette entry
+# with set_color() does not touch the pixels; the next flush() resends every
+# pixel that uses the entry, so fading the whole screen costs O(palette) in
+# the script instead of a set_pixel() per pixel.
+#
+#   framebuffer = IndexedFrameBuffer(panel, rgbs)
+#   framebuffer.set_pixel(x, y, index)
+#   framebuffer.set_color(index, r, g, b)   # palette animation
+#   framebuffer.flush()                     # once per frame
+class IndexedFrameBuffer:
+    def __init__(self, panel, colors):
+        if not 0 < len(colors) <= 256:
+            raise ValueError("palette must have 1 to 256 colours")
+        self.panel = panel
+        self.width = panel.width
+        self.height = panel.height
+        self.pixels = bytearray(self.width * self.height)
+        self.changed = bytearray((self.width * self.height + 7) // 8)
+        self.span_start = array('H', [self.width] * self.height)
+        self.span_end = array('H', [0] * self.height)
+        self.dirty = False
+        # Packed RGB triplets, plus a flag per entry changed since last flush
+        self.colors = len(colors)
+        self.palette = bytearray(len(colors) * 3)
+        self.stale = bytearray(len(colors))
+        self.palette_dirty = False
+        for index in range(len(colors)):
+            r, g, b = colors[index]
+            self.palette[index * 3] = r
+            self.palette[index * 3 + 1] = g
+            self.palette[index * 3 + 2] = b
+        # Pixels start at index 0; the display starts out off, so unless
+        # entry 0 is black the first flush() has to send every pixel
+        if self.palette[0] or self.palette[1] or self.palette[2]:
+            self.stale[0] = 1
+            self.palette_dirty = True
+
+    def set_color(self, index, r, g, b):
+        palette = self.palette
+        i = index * 3
+        if palette[i] != r or palette[i + 1] != g or palette[i + 2] != b:
+            palette[i] = r
+            palette[i + 1] = g
+            palette[i + 2] = b
+            self.stale[index] = 1
+            self.palette_dirty = True
+
+    def get_color(self, index):
+        i = index * 3
+        return self.palette[i], self.palette[i + 1], self.palette[i + 2]
+
+    @micropython.native
+    def set_pixel(self, x, y, index):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            if self.pixels[i] != index:
+                if not 0 <= index < self.colors:
+                    raise ValueError("palette index out of range")
+                self.pixels[i] = index
+                self.changed[i >> 3] |= 1 << (i & 7)
+                if x < self.span_start[y]:
+                    self.span_start[y] = x
+                if x > self.span_end[y]:
+                    self.span_end[y] = x
+                self.dirty = True
+
+    def get_pixel(self, x, y):
+        return self.pixels[y * self.width + x]
+
+    def fill(self, index):
+        for y in range(self.height):
+            for x in range(self.width):
+                self.set_pixel(x, y, index)
+
+    # Push all changed pixels to the display, returns the number of pixels sent
+    @micropython.native
+    def flush(self):
+        if self.palette_dirty:
+            return self._flush_all()
+        if not self.dirty:
+            return 0
+        set_pixel = self.panel.display.set_pixel
+        table = self.panel.table
+        y_bits = self.panel.y_bits
+        y_mask = self.panel.y_mask
+        pixels = self.pixels
+        palette = self.palette
+        changed = self.changed
+        width = self.width
+        span_start = self.span_start
+        span_end = self.span_end
+        sent = 0
+        for y in range(self.height):
+            start = span_start[y]
+            end = span_end[y]
+            if start > end:
+                continue
+            span_start[y] = width
+            span_end[y] = 0
+            row = y * width
+            for k in range((row + start) >> 3, ((row + end) >> 3) + 1):
+                bits = changed[k]
+                if bits:
+                    changed[k] = 0
+                    index = k << 3
+                    while bits:
+                        if bits & 1:
+                            p = table[index]
+                            c = pixels[index] * 3
+                            set_pixel(p >> y_bits, p & y_mask, palette[c], palette[c + 1], palette[c + 2])
+                            sent += 1
+                        bits >>= 1
+                        index += 1
+        self.dirty = False
+        return sent
+
+    # After a palette change: one pass over all pixels, sending those that
+    # changed or use a changed palette entry
+    @micropython.native
+    def _flush_all(self):
+        set_pixel = self.panel.display.set_pixel
+        table = self.panel.table
+        y_bits = self.panel.y_bits
+        y_mask = self.panel.y_mask
+        pixels = self.pixels
+        palette = self.palette
+        changed = self.changed
+        stale = self.stale
+        sent = 0
+        for index in range(len(pixels)):
+            c = pixels[index]
+            if stale[c] or changed[index >> 3] & (1 << (index & 7)):
+                p = table[index]
+                c *= 3
+                set_pixel(p >> y_bits, p & y_mask, palette[c], palette[c + 1], palette[c + 2])
+                sent += 1
+        for k in range(len(changed)):
+            changed[k] = 0
+        for y in range(self.height):
+            self.span_start[y] = self.width
+            self.span_end[y] = 0
+        for c in range(len(stale)):
+            stale[c] = 0
+        self.dirty = False
+        self.palette_dirty = False
+        return sent
@@ -3,6 +3,12 @@ import random
 import time
 import machine
 from machine import Pin
+from micropython import const
+from ant_colony import AntColony
+from color import hue_to_rgb
+from panel_map import PanelMap
+from profiler import Profiler
+from turmite import Turmites
 
 # Constants for the physical display
 HEIGHT = 128
@@ -17,171 +23,63 @@ display = hub75.Hub75(xWIDTH, xHEIGHT)
 # Grid size
 grid_size = 128
 
-def hsb_to_rgb(hue, saturation, brightness):
-    hue_normalized = (hue % 360) / 60
-    hue_index = int(hue_normalized)
-    hue_fraction = hue_normalized - hue_index
+# Pixel remapping via precomputed lookup table (see panel_map.py)
+set_pixel_mapped = PanelMap(display).set_pixel_mapped
 
-    value1 = brightness * (1 - saturation)
-    value2 = brightness * (1 - saturation * hue_fraction)
-    value3 = brightness * (1 - saturation * (1 - hue_fraction))
-
-    red, green, blue = [
-        (brightness, value3, value1),
-        (value2, brightness, value1),
-        (value1, brightness, value3),
-        (value1, value2, brightness),
-        (value3, value1, brightness),
-        (brightness, value1, value2)
-    ][hue_index]
-
-    return int(red * 255), int(green * 255), int(blue * 255)
-
-# Funktion für das X/Y-Remapping
-@micropython.native
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y  # Identity transformation for values >= 128
-
-# Wrapper for set_pixel with optimized calculation
-def set_pixel_mapped(x, y, r, g, b):
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
+# Profiling: 1 = print where the frame time goes every 300 frames (see
+# profiler.py); with 0 the instrumentation is not compiled at all
+PROFILE = const(0)
+SIMULATE = const(0)
+DRAW = const(1)
+profiler = Profiler(("simulate", "draw"))
 
 # Initialize grid as a bytearray (128x128 cells)
 grid = bytearray(random.choice([0]*7 + [1]) for _ in range(grid_size * grid_size))
 
-# Access functions for the grid
-def get_grid_value(grid, x, y):
-    return grid[y * grid_size + x]
-
-def set_grid_value(grid, x, y, value):
-    grid[y * grid_size + x] = value
-
-# Directions (0: North, 1: East, 2: South, 3: West)
-DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-
-# Initialize ants with unique colors
-def initialize_ants(num_ants):
-    ants = []
-    for _ in range(num_ants):
-        ant = {
-            'pos': [random.randint(0, grid_size - 1), random.randint(0, grid_size - 1)],
-            'dir': random.randint(0, 3),
-            'color': hsb_to_rgb(random.randint(0, 360), 1, 1)  # Bright random color
-        }
-        ants.append(ant)
-    return ants
+# Turmite rule (see turmite.py), e.g. "RLR", "LLRR", "RRLLLRLLLRRR" or a
+# state table; None keeps Langton's ant with random turns on the grid above
+TURMITE_RULE = None
 
+# Ants as a structure of arrays with a dirty list (see ant_colony.py)
 num_ants = 8
-ants = initialize_ants(num_ants)
-
-# Update ants and their surroundings in the grid
-def update_ants(grid, ants):
-    changed_cells = []
-    ant_previous_positions = []
-
-    for ant in ants:
-        x, y = ant['pos']
-        current_dir = ant['dir']
-
-        # Record the previous position to erase the ant later
-        ant_previous_positions.append((x, y))
-
-        # Langton's Ant rules
-        current_state = get_grid_value(grid, x, y)
-        if current_state == 0:
-            if random.randint(0, 3) == 0:
-                ant['dir'] = random.randint(0, 3)
-            else:
-                # Turn left and set cell to alive
-                ant['dir'] = (current_dir - 1) % 4
-            
-            set_grid_value(grid, x, y, 1)
-            changed_cells.append((x, y, 1, ant['color']))
-        else:
-            # Turn right and set cell to dead
-            ant['dir'] = (current_dir + 1) % 4
-            set_grid_value(grid, x, y, 0)
-            changed_cells.append((x, y, 0, (0, 0, 0)))
-        
-        # Move the ant
-        dx, dy = DIRECTIONS[ant['dir']]
-        new_x = (x + dx) % grid_size
-        new_y = (y + dy) % grid_size
-
-        # Update the ant's position
-        ant['pos'] = [new_x, new_y]
-
-    return changed_cells, ant_previous_positions
+if TURMITE_RULE:
+    colony = Turmites(grid_size, grid_size, num_ants, TURMITE_RULE)
+    # Colour 0 stays black, the others spread over the color wheel, dimmed
+    for c in range(1, colony.colors):
+        r, g, b = hue_to_rgb(360 * (c - 1) // (colony.colors - 1))
+        colony.set_palette(c, r >> 1, g >> 1, b >> 1)
+else:
+    colony = AntColony(grid, grid_size, grid_size, num_ants)
+for i in range(num_ants):
+    r, g, b = hue_to_rgb(random.randint(0, 360))  # Bright random color
+    colony.set_color(i, r, g, b)
 
 # Main loop
 def main():
     display.start()
 
-    # Initial drawing of the grid
-    for index in range(grid_size * grid_size):
-        x = index % grid_size
-        y = index // grid_size
-        if grid[index]:
-            set_pixel_mapped(x, y, 155, 155, 155)  # Alive = White
-        else:
-            set_pixel_mapped(x, y, 0, 0, 0)        # Dead = Black
-
-    # Draw the initial positions of the ants
-    for ant in ants:
-        x, y = ant['pos']
-        r, g, b = ant['color']
-        set_pixel_mapped(x, y, r, g, b)
+    # Initial drawing of the grid (alive = white) and the ants
+    if TURMITE_RULE:
+        colony.draw_all(set_pixel_mapped)
+    else:
+        colony.draw_all(set_pixel_mapped, 155, 155, 155)
 
     while True:
-        # Update ants and get the list of changed cells
-        changed_cells, ant_prev_positions = update_ants(grid, ants)
-
-        # Erase ants from their previous positions
-        for x, y in ant_prev_positions:
-            cell_state = get_grid_value(grid, x, y)
-            if cell_state:
-                set_pixel_mapped(x, y, 155, 155, 155)  # Alive = White
-            else:
-                set_pixel_mapped(x, y, 0, 0, 0)        # Dead = Black
-
-        # Update only the changed cells on the display
-        for x, y, state, color in changed_cells:
-            if state:
-                # Slightly dimmer color for cells the ant has passed over
-                r, g, b = [int(c * 0.5) for c in color]
-                set_pixel_mapped(x, y, r, g, b)
-            else:
-                set_pixel_mapped(x, y, 0, 0, 0)        # Dead = Black
-
-        # Draw the ants in their new positions
-        for ant in ants:
-            x, y = ant['pos']
-            r, g, b = ant['color']
-            set_pixel_mapped(x, y, r, g, b)
+        if PROFILE:
+            profiler.frame_start()
+            profiler.start(SIMULATE)
+        # Move all ants once
+        colony.step()
+        if PROFILE:
+            profiler.stop(SIMULATE)
+            profiler.start(DRAW)
+
+        # Cells the ants left (dimmer ant color or black), then the ants
+        colony.draw(set_pixel_mapped)
+        if PROFILE:
+            profiler.stop(DRAW)
+            profiler.frame_end()
 
 # Start the program
 if __name__ == "__main__":
     main()
-
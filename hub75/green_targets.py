@@ -0,0 +1,243 @@
+# Green targets of the snake demos without per-step lists.
+#
+# The scripts kept the green targets as a list of (x, y, lifespan) tuples:
+# every step built a new list of new tuples just to count the lifespans
+# down, and the collision test and the nearest-target search walked the
+# whole list. Here every target lives in a slot of a few preallocated
+# arrays and is reachable three ways:
+#
+# - expiry ring: one entry per step of the lifespan, a target is chained
+#   into the entry of the step it runs out. tick() advances the step and
+#   removes exactly the targets of that entry.
+# - board: a bytearray with the slot (+1) of the target on every cell, so
+#   take(x, y) after each step is a single lookup. Row and column counts
+#   answer "does a target share the head's row or column?".
+# - buckets: the board divided into bucket x bucket cells, each with a
+#   linked list of its targets. nearest() searches rings of buckets around
+#   the head and stops as soon as no further ring can hold a closer target.
+#   With only a few targets alive (the usual case) it is quicker to look at
+#   each of them, so up to LINEAR targets nearest() just walks the dense
+#   list of live slots that is kept for that.
+#
+# Only one target per cell; adding one on an occupied cell (or with all
+# slots in use) does nothing and returns False. Cells are returned as
+# numbers y * width + x, so no call allocates.
+#
+#   greens = GreenTargets(128, 128, lifespan=256)
+#   if greens.add(x, y): draw it
+#   greens.tick(erase)                 # once per step, erase(x, y) per expired
+#   if greens.take(head_x, head_y): eaten
+#   cell = greens.nearest(head_x, head_y)   # -1 if none, greens.distance
+
+import micropython
+from array import array
+
+LINEAR = 16      # Up to this many targets nearest() skips the buckets
+
+
+class GreenTargets:
+    def __init__(self, width, height, lifespan=256, capacity=32, bucket=16):
+        if capacity > 255:
+            raise ValueError("at most 255 targets")
+        self.width = width
+        self.height = height
+        self.lifespan = lifespan
+        self.capacity = capacity
+        self.bucket = bucket
+        self.bucket_columns = (width + bucket - 1) // bucket
+        self.bucket_rows = (height + bucket - 1) // bucket
+        # Links are slot + 1, 0 ends a chain
+        self.board = bytearray(width * height)
+        self.rows = bytearray(height)
+        self.columns = bytearray(width)
+        self.ring = bytearray(lifespan)
+        self.buckets = bytearray(self.bucket_columns * self.bucket_rows)
+        self.cells = array('H' if width * height <= 0x10000 else 'I', range(capacity))
+        self.expiry_next = bytearray(capacity)
+        self.expires = array('H', range(capacity))     # Ring index per slot
+        self.bucket_next = bytearray(capacity)
+        self.bucket_prev = bytearray(capacity)
+        self.live = bytearray(capacity)             # Dense list of used slots
+        self.live_index = bytearray(capacity)       # Position of a slot in it
+        self.step = 0
+        self.count = 0
+        self.distance = 0   # Manhattan distance of the last nearest() hit
+        self.free = 0
+        self.clear()
+
+    def clear(self):
+        for i in range(len(self.board)):
+            self.board[i] = 0
+        for i in range(self.height):
+            self.rows[i] = 0
+        for i in range(self.width):
+            self.columns[i] = 0
+        for i in range(self.lifespan):
+            self.ring[i] = 0
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+        # Free slots are chained through expiry_next
+        for slot in range(self.capacity):
+            self.expiry_next[slot] = slot + 2 if slot + 1 < self.capacity else 0
+        self.free = 1
+        self.count = 0
+
+    def _bucket(self, cell):
+        x = cell % self.width
+        return (cell // self.width // self.bucket) * self.bucket_columns + x // self.bucket
+
+    # New target, expires after lifespan calls of tick()
+    def add(self, x, y):
+        cell = y * self.width + x
+        if self.board[cell] or not self.free:
+            return False
+        slot = self.free - 1
+        self.free = self.expiry_next[slot]
+        self.cells[slot] = cell
+        self.board[cell] = slot + 1
+        self.rows[y] += 1
+        self.columns[x] += 1
+        # Into the expiry ring
+        index = self.step % self.lifespan
+        self.expires[slot] = index
+        self.expiry_next[slot] = self.ring[index]
+        self.ring[index] = slot + 1
+        # Into the bucket list
+        b = self._bucket(cell)
+        first = self.buckets[b]
+        self.bucket_next[slot] = first
+        self.bucket_prev[slot] = 0
+        if first:
+            self.bucket_prev[first - 1] = slot + 1
+        self.buckets[b] = slot + 1
+        self.live[self.count] = slot
+        self.live_index[slot] = self.count
+        self.count += 1
+        return True
+
+    def _unlink(self, slot):
+        cell = self.cells[slot]
+        x = cell % self.width
+        self.board[cell] = 0
+        self.rows[cell // self.width] -= 1
+        self.columns[x] -= 1
+        following = self.bucket_next[slot]
+        previous = self.bucket_prev[slot]
+        if previous:
+            self.bucket_next[previous - 1] = following
+        else:
+            self.buckets[self._bucket(cell)] = following
+        if following:
+            self.bucket_prev[following - 1] = previous
+        # Last live slot moves into the gap
+        self.count -= 1
+        moved = self.live[self.count]
+        index = self.live_index[slot]
+        self.live[index] = moved
+        self.live_index[moved] = index
+
+    # Advance one step, expired targets are removed and passed to expire(x, y)
+    def tick(self, expire=None):
+        self.step += 1
+        index = self.step % self.lifespan
+        link = self.ring[index]
+        self.ring[index] = 0
+        while link:
+            slot = link - 1
+            link = self.expiry_next[slot]
+            self._unlink(slot)
+            self.expiry_next[slot] = self.free
+            self.free = slot + 1
+            if expire is not None:
+                cell = self.cells[slot]
+                expire(cell % self.width, cell // self.width)
+
+    # Remove the target on (x, y), True if there was one
+    def take(self, x, y):
+        link = self.board[y * self.width + x]
+        if not link:
+            return False
+        slot = link - 1
+        self._unlink(slot)
+        # Out of its expiry chain (one per step, so usually just this target)
+        index = self.expires[slot]
+        if self.ring[index] == link:
+            self.ring[index] = self.expiry_next[slot]
+        else:
+            previous = self.ring[index]
+            while self.expiry_next[previous - 1] != link:
+                previous = self.expiry_next[previous - 1]
+            self.expiry_next[previous - 1] = self.expiry_next[slot]
+        self.expiry_next[slot] = self.free
+        self.free = link
+        return True
+
+    def is_target(self, x, y):
+        return self.board[y * self.width + x] != 0
+
+    # True if a target lies in row y or column x
+    def aligned(self, x, y):
+        return self.rows[y] != 0 or self.columns[x] != 0
+
+    # Cell of the target closest to (x, y) by Manhattan distance, -1 if none
+    @micropython.native
+    def nearest(self, x, y):
+        count = self.count
+        if count == 0:
+            return -1
+        width = self.width
+        cells = self.cells
+        best = -1
+        best_distance = 0
+        if count <= LINEAR:
+            live = self.live
+            for i in range(count):
+                cell = cells[live[i]]
+                cx = cell % width
+                cy = cell // width
+                d = (cx - x if cx > x else x - cx) + (cy - y if cy > y else y - cy)
+                if best < 0 or d < best_distance:
+                    best = cell
+                    best_distance = d
+            self.distance = best_distance
+            return best
+        size = self.bucket
+        columns = self.bucket_columns
+        rows = self.bucket_rows
+        buckets = self.buckets
+        bucket_next = self.bucket_next
+        bx = x // size
+        by = y // size
+        radius = 0
+        last = columns if columns > rows else rows
+        while radius < last:
+            ty = by - radius
+            while ty <= by + radius:
+                if 0 <= ty < rows:
+                    # Full row of buckets at the top and bottom of the ring,
+                    # only the two side buckets in between
+                    tx = bx - radius
+                    if ty == by - radius or ty == by + radius:
+                        step = 1
+                    else:
+                        step = 2 * radius
+                    while tx <= bx + radius:
+                        if 0 <= tx < columns:
+                            link = buckets[ty * columns + tx]
+                            while link:
+                                cell = cells[link - 1]
+                                cx = cell % width
+                                cy = cell // width
+                                d = (cx - x if cx > x else x - cx) + (cy - y if cy > y else y - cy)
+                                if best < 0 or d < best_distance:
+                                    best = cell
+                                    best_distance = d
+                                link = bucket_next[link - 1]
+                        tx += step
+                ty += 1
+            # Targets in the next ring are at least radius * size + 1 away
+            if best >= 0 and best_distance <= radius * size:
+                break
+            radius += 1
+        self.distance = best_distance
+        return best
@@ -0,0 +1,165 @@
+# Host-side benchmark: dict ants vs. AntColony.
+#
+#   python hub75/host/bench_ant_colony.py
+#
+# The old update_ants() and the drawing loops of main() are copied here,
+# drawing into a counting stub. Both run 8, 256 and 4096 ants on the
+# 128x128 grid. Reported: ant steps per second for simulation plus drawing,
+# pixels drawn per frame (all ants one step) and tracemalloc's peak of
+# bytes allocated per frame. The old version builds lists and tuples for
+# every ant; AntColony's constant few hundred bytes are CPython boxing
+# ints, MicroPython keeps them as small ints.
+#
+# First AntColony without random turns is checked against a plain
+# reference implementation of Langton's ant, grid and positions, and the
+# dirty list is checked to leave the screen equal to the grid.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from ant_colony import AntColony
+
+SIZE = 128
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def set_pixel(self, x, y, r, g, b):
+        self.calls += 1
+
+
+# The old implementation
+def update_ants(grid, ants):
+    changed_cells = []
+    ant_previous_positions = []
+    for ant in ants:
+        x, y = ant['pos']
+        current_dir = ant['dir']
+        ant_previous_positions.append((x, y))
+        current_state = grid[y * SIZE + x]
+        if current_state == 0:
+            if random.randint(0, 3) == 0:
+                ant['dir'] = random.randint(0, 3)
+            else:
+                ant['dir'] = (current_dir - 1) % 4
+            grid[y * SIZE + x] = 1
+            changed_cells.append((x, y, 1, ant['color']))
+        else:
+            ant['dir'] = (current_dir + 1) % 4
+            grid[y * SIZE + x] = 0
+            changed_cells.append((x, y, 0, (0, 0, 0)))
+        dx, dy = DIRECTIONS[ant['dir']]
+        ant['pos'] = [(x + dx) % SIZE, (y + dy) % SIZE]
+    return changed_cells, ant_previous_positions
+
+
+def old_frame(grid, ants, set_pixel):
+    changed_cells, previous = update_ants(grid, ants)
+    for x, y in previous:
+        if grid[y * SIZE + x]:
+            set_pixel(x, y, 155, 155, 155)
+        else:
+            set_pixel(x, y, 0, 0, 0)
+    for x, y, state, color in changed_cells:
+        if state:
+            r, g, b = [int(c * 0.5) for c in color]
+            set_pixel(x, y, r, g, b)
+        else:
+            set_pixel(x, y, 0, 0, 0)
+    for ant in ants:
+        x, y = ant['pos']
+        r, g, b = ant['color']
+        set_pixel(x, y, r, g, b)
+
+
+def new_frame(colony, set_pixel):
+    colony.step()
+    colony.draw(set_pixel)
+
+
+def make_grid(rng):
+    return bytearray(rng.choice([0] * 7 + [1]) for _ in range(SIZE * SIZE))
+
+
+def check():
+    rng = random.Random(5)
+    grid = make_grid(rng)
+    reference_grid = bytearray(grid)
+    colony = AntColony(grid, SIZE, SIZE, 64, random_turns=False)
+    ants = [[colony.cells[i] % SIZE, colony.cells[i] // SIZE, colony.dirs[i]] for i in range(64)]
+    screen = {}
+    for _ in range(500):
+        colony.step()
+        for k in range(colony.dirty):
+            screen[colony.dirty_cells[k]] = colony.dirty_colors[k]
+        for ant in ants:
+            x, y, d = ant
+            if reference_grid[y * SIZE + x]:
+                d = (d + 1) % 4
+                reference_grid[y * SIZE + x] = 0
+            else:
+                d = (d - 1) % 4
+                reference_grid[y * SIZE + x] = 1
+            dx, dy = DIRECTIONS[d]
+            ant[0] = (x + dx) % SIZE
+            ant[1] = (y + dy) % SIZE
+            ant[2] = d
+    assert grid == reference_grid
+    assert [c for c in colony.cells] == [y * SIZE + x for x, y, d in ants]
+    heads = set(colony.cells)
+    for cell, color in screen.items():
+        if cell not in heads:
+            assert (color != 0) == (grid[cell] == 1)
+
+
+def run(count, frames):
+    rng = random.Random(1)
+    random.seed(1)
+    grid = make_grid(rng)
+    old_grid = bytearray(grid)
+    ants = [{'pos': [rng.randint(0, SIZE - 1), rng.randint(0, SIZE - 1)],
+             'dir': rng.randint(0, 3),
+             'color': (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))}
+            for _ in range(count)]
+    colony = AntColony(grid, SIZE, SIZE, count)
+    results = []
+    for frame in (lambda pixel: old_frame(old_grid, ants, pixel),
+                  lambda pixel: new_frame(colony, pixel)):
+        counter = Counter()
+        frame(counter.set_pixel)
+        counter.calls = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame(counter.set_pixel)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        frame(counter.set_pixel)
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+        results.append((count * frames / elapsed, counter.calls / frames, peak))
+    return results
+
+
+def main():
+    check()
+    print("AntColony == reference Langton's ant, screen == grid: ok")
+    print()
+    print("{:>6} {:<11} {:>14} {:>12} {:>12}".format("ants", "engine", "ant steps/s", "pixels/frame", "bytes/frame"))
+    for count, frames in ((8, 2000), (256, 200), (4096, 20)):
+        for name, (rate, pixels, peak) in zip(("dicts", "AntColony"), run(count, frames)):
+            print("{:>6} {:<11} {:>14.0f} {:>12.0f} {:>12}".format(count, name, rate, pixels, peak))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Host-side check and benchmark for color.py (in the repository root).
+#
+#   python hub75/host/bench_color.py
+#
+# Checks hsb_to_rgb(), hue_to_rgb() and hue_packed() against the float
+# hsb_to_rgb() the scripts used before, for every hue and a grid of
+# saturation/brightness values: every channel must be within +-1. Then
+# times conversions per second, including draw_snake()'s pattern of one
+# fully saturated colour per segment.
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+sys.path.insert(2, os.path.dirname(os.path.dirname(HERE)))
+
+from color import hsb_to_rgb, hue_packed, hue_to_rgb
+
+LEVELS = (0, 1, 37, 64, 128, 200, 204, 254, 255)
+CALLS = 36000
+
+
+# The float version as copied into the hub75 scripts
+def float_hsb_to_rgb(hue, saturation, brightness):
+    hue_normalized = (hue % 360) / 60
+    hue_index = int(hue_normalized)
+    hue_fraction = hue_normalized - hue_index
+
+    value1 = brightness * (1 - saturation)
+    value2 = brightness * (1 - saturation * hue_fraction)
+    value3 = brightness * (1 - saturation * (1 - hue_fraction))
+
+    red, green, blue = [
+        (brightness, value3, value1),
+        (value2, brightness, value1),
+        (value1, brightness, value3),
+        (value1, value2, brightness),
+        (value3, value1, brightness),
+        (brightness, value1, value2)
+    ][hue_index]
+
+    return int(red * 255), int(green * 255), int(blue * 255)
+
+
+def close(a, b):
+    return all(abs(x - y) <= 1 for x, y in zip(a, b))
+
+
+def check():
+    worst = 0
+    for hue in range(-360, 720):
+        for saturation in LEVELS:
+            for brightness in LEVELS:
+                expected = float_hsb_to_rgb(hue, saturation / 255, brightness / 255)
+                got = hsb_to_rgb(hue, saturation, brightness)
+                assert close(got, expected), (hue, saturation, brightness, got, expected)
+                worst = max(worst, max(abs(x - y) for x, y in zip(got, expected)))
+        for brightness in LEVELS:
+            expected = float_hsb_to_rgb(hue, 1, brightness / 255)
+            got = hue_to_rgb(hue, brightness)
+            assert close(got, expected), (hue, brightness, got, expected)
+            packed = hue_packed(hue, brightness)
+            assert (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF) == got
+    return worst
+
+
+def rate(function):
+    start = time.perf_counter()
+    function()
+    return CALLS / (time.perf_counter() - start) / 1000
+
+
+def main():
+    worst = check()
+    print("all channels within +-1 of the float version (largest difference {})".format(worst))
+    print()
+    rows = (
+        ("float hsb_to_rgb(h, 1, 1)", lambda: [float_hsb_to_rgb(h, 1, 1) for h in range(CALLS)]),
+        ("hsb_to_rgb(h)", lambda: [hsb_to_rgb(h) for h in range(CALLS)]),
+        ("hue_to_rgb(h)", lambda: [hue_to_rgb(h) for h in range(CALLS)]),
+        ("float hsb_to_rgb(h, 1, 0.8)", lambda: [float_hsb_to_rgb(h, 1, 0.8) for h in range(CALLS)]),
+        ("hue_to_rgb(h, 204)", lambda: [hue_to_rgb(h, 204) for h in range(CALLS)]),
+        ("hue_packed(h, 204)", lambda: [hue_packed(h, 204) for h in range(CALLS)]),
+    )
+    base = None
+    print("{:30} {:>14} {:>8}".format("", "k calls/s", ""))
+    for name, function in rows:
+        value = rate(function)
+        if name.startswith("float"):
+            base = value
+        print("{:30} {:>14.0f} {:>7.1f}x".format(name, value, value / base))
+
+
+if __name__ == "__main__":
+    main()
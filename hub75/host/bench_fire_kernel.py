@@ -0,0 +1,140 @@
+# Host-side benchmark: Fire.simulate() as it was vs. the row-wise kernel.
+#
+#   python hub75/host/bench_fire_kernel.py
+#
+# Reports frames per second and tracemalloc's peak of memory allocated
+# during a frame. The old frame allocates one list plus 3968 (y, x) tuples
+# for the shuffled visiting order; the kernel allocates nothing (CPython
+# still boxes a few ints above 256). Afterwards the mean heat of every row
+# is compared over several seeded runs to show that both produce the same
+# fire profile.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from fire_kernel import FireKernel
+
+GRID_HEIGHT = 32
+GRID_WIDTH = 128
+NR_OF_COLS = 10
+FRAMES = 60
+WARMUP = 20
+SEEDS = (1, 2, 3, 4)
+TOLERANCE = 0.25
+
+
+def no_pixel(x, y, r, g, b):
+    pass
+
+
+# Copy of the original Fire class from fire_on_hub75_128x128.py
+class LegacyFire:
+    def __init__(self):
+        self._fire_pixels = [0] * (GRID_HEIGHT * GRID_WIDTH)
+        for i in range(GRID_WIDTH):
+            self._fire_pixels[(GRID_HEIGHT - 1) * GRID_WIDTH + i] = NR_OF_COLS - 1
+
+    def simulate(self):
+        indices = [(y, x) for y in range(1, GRID_HEIGHT) for x in range(GRID_WIDTH)]
+        self.custom_shuffle(indices)
+        for y, x in indices:
+            self.spread_fire(y * GRID_WIDTH + x)
+
+    def spread_fire(self, src):
+        rand = random.randint(0, 3)
+        dst = src - GRID_WIDTH + rand - 1
+        if 0 <= dst < len(self._fire_pixels):
+            new_value = max(0, self._fire_pixels[src] - (rand & 1))
+            if self._fire_pixels[dst] != new_value:
+                self._fire_pixels[dst] = new_value
+                no_pixel(dst % GRID_WIDTH, dst // GRID_WIDTH, 0, 0, 0)
+
+    def custom_shuffle(self, lst):
+        n = len(lst)
+        for i in range(n - 1, 0, -1):
+            j = random.randint(0, i)
+            lst[i], lst[j] = lst[j], lst[i]
+
+    def heat(self):
+        return self._fire_pixels
+
+
+class KernelFire:
+    colors = [(0, 0, 0)] * NR_OF_COLS
+
+    def __init__(self):
+        self.kernel = FireKernel(GRID_WIDTH, GRID_HEIGHT)
+        self.kernel.set_bottom_row(NR_OF_COLS - 1)
+
+    def simulate(self):
+        self.kernel.step()
+        self.kernel.render(no_pixel, self.colors)
+
+    def heat(self):
+        return self.kernel.heat
+
+
+def speed(fire_class):
+    random.seed(0)
+    fire = fire_class()
+    fire.simulate()
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(FRAMES):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fire.simulate()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    # tracemalloc slows the frames down, time them again without it
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        fire.simulate()
+    return FRAMES / (time.perf_counter() - start), allocated / FRAMES
+
+
+# Mean heat per row after the warm-up frames, averaged over all seeds
+def profile(fire_class):
+    sums = [0.0] * GRID_HEIGHT
+    samples = 0
+    for seed in SEEDS:
+        random.seed(seed)
+        fire = fire_class()
+        for frame in range(FRAMES):
+            fire.simulate()
+            if frame >= WARMUP:
+                heat = fire.heat()
+                for y in range(GRID_HEIGHT):
+                    sums[y] += sum(heat[y * GRID_WIDTH:(y + 1) * GRID_WIDTH]) / GRID_WIDTH
+                samples += 1
+    return [total / samples for total in sums]
+
+
+def main():
+    old_fps, old_bytes = speed(LegacyFire)
+    new_fps, new_bytes = speed(KernelFire)
+    print("{:16} {:>10} {:>18}".format("", "frames/s", "bytes alloc/frame"))
+    print("{:16} {:>10.1f} {:>18.0f}".format("Fire.simulate()", old_fps, old_bytes))
+    print("{:16} {:>10.1f} {:>18.0f}".format("FireKernel", new_fps, new_bytes))
+    print("speedup {:.1f}x".format(new_fps / old_fps))
+    print()
+
+    old = profile(LegacyFire)
+    new = profile(KernelFire)
+    print("{:>4} {:>12} {:>12}".format("row", "old heat", "kernel heat"))
+    for y in range(GRID_HEIGHT):
+        print("{:>4} {:>12.2f} {:>12.2f}".format(y, old[y], new[y]))
+    worst = max(abs(a - b) for a, b in zip(old, new))
+    print("largest difference of the row means: {:.3f}".format(worst))
+    assert worst < TOLERANCE, "fire profile differs"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# Host-side benchmark: float rotation vs. the fixed-point pipeline.
+#
+#   python hub75/host/bench_fixed3d.py
+#
+# The float path is the one cube_128.py used before: rotate_vertex() with
+# six math.sin/cos calls per vertex and a tuple per projected point. The
+# fixed path builds one rotation matrix per frame and transforms the mesh
+# into preallocated arrays. Reported: vertices per second for the cube, an
+# icosphere and a torus, and the largest distance in pixels between a
+# fixed-point vertex and its exact position over a full turn (rounding
+# alone accounts for 0.5; table angles are quantised to 1/1024 turn).
+#
+# CPython has cheap floats and C-speed math.sin, so the gap here is small.
+# On the RP2040 (no FPU, every float result is a heap object) the float
+# path also allocates three tuples and about 40 floats per vertex, which
+# the fixed path does not at all.
+
+import math
+import os
+import sys
+import time
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import fixed3d
+
+SCALE = 30
+CENTER = 64
+FRAMES = 200
+SPEED = 0.05
+
+
+def rotate_vertex(x, y, z, angle_x, angle_y, angle_z):
+    cos_x = math.cos(angle_x)
+    sin_x = math.sin(angle_x)
+    y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
+    cos_y = math.cos(angle_y)
+    sin_y = math.sin(angle_y)
+    x, z = x * cos_y + z * sin_y, -x * sin_y + z * cos_y
+    cos_z = math.cos(angle_z)
+    sin_z = math.sin(angle_z)
+    x, y = x * cos_z - y * sin_z, x * sin_z + y * cos_z
+    return x, y, z
+
+
+def rotate_and_project(points, angle_x, angle_y, angle_z):
+    projected = []
+    for v in points:
+        rotated = rotate_vertex(v[0], v[1], v[2], angle_x, angle_y, angle_z)
+        x = int(rotated[0] * SCALE) + CENTER
+        y = int(rotated[1] * SCALE) + CENTER
+        projected.append((x, y))
+    return projected
+
+
+def float_points(mesh):
+    v = mesh.vertices
+    return [(v[3 * n] / fixed3d.ONE, v[3 * n + 1] / fixed3d.ONE, v[3 * n + 2] / fixed3d.ONE)
+            for n in range(mesh.count)]
+
+
+def bench_float(points):
+    start = time.perf_counter()
+    angle = 0.0
+    for _ in range(FRAMES):
+        rotate_and_project(points, angle, angle, angle)
+        angle += SPEED
+    return len(points) * FRAMES / (time.perf_counter() - start)
+
+
+def bench_fixed(mesh, matrix, xs, ys, zs):
+    speed = fixed3d.radians(SPEED)
+    start = time.perf_counter()
+    angle = 0
+    for _ in range(FRAMES):
+        fixed3d.rotation_matrix(matrix, angle, angle, angle)
+        fixed3d.transform(mesh.vertices, mesh.count, matrix, SCALE, CENTER, CENTER, xs, ys, zs)
+        angle = (angle + speed) & 0xFFFF
+    return mesh.count * FRAMES / (time.perf_counter() - start)
+
+
+# Largest distance of a fixed-point pixel from the exact float position
+# over a full turn, at the angles the table actually represents
+def deviation(mesh, points, matrix, xs, ys, zs):
+    worst = 0
+    for step in range(0, 65536, 331):
+        angle = step & ~((1 << fixed3d.TABLE_SHIFT) - 1)
+        radians = angle * 2 * math.pi / 65536
+        fixed3d.rotation_matrix(matrix, angle, angle, angle)
+        fixed3d.transform(mesh.vertices, mesh.count, matrix, SCALE, CENTER, CENTER, xs, ys, zs)
+        for n, v in enumerate(points):
+            x, y, z = rotate_vertex(v[0], v[1], v[2], radians, radians, radians)
+            worst = max(worst, abs(xs[n] - (x * SCALE + CENTER)), abs(ys[n] - (y * SCALE + CENTER)))
+    return worst
+
+
+def main():
+    meshes = (("cube", fixed3d.cube()), ("icosphere(2)", fixed3d.icosphere(2)),
+              ("torus(16, 8)", fixed3d.torus(16, 8)), ("icosphere(3)", fixed3d.icosphere(3)))
+    matrix = array('i', [0] * 9)
+    print("{:<14} {:>8} {:>6} {:>12} {:>12} {:>8} {:>9}".format(
+        "mesh", "vertices", "edges", "float v/s", "fixed v/s", "speedup", "max dev"))
+    for name, mesh in meshes:
+        xs = array('h', [0] * mesh.count)
+        ys = array('h', [0] * mesh.count)
+        zs = array('h', [0] * mesh.count)
+        points = float_points(mesh)
+        slow = bench_float(points)
+        fast = bench_fixed(mesh, matrix, xs, ys, zs)
+        worst = deviation(mesh, points, matrix, xs, ys, zs)
+        assert worst < 1, worst
+        print("{:<14} {:>8} {:>6} {:>12.0f} {:>12.0f} {:>7.2f}x {:>6.2f} px".format(
+            name, mesh.count, mesh.edge_count, slow, fast, fast / slow, worst))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# Host-side benchmark: list-queue flood fill vs. FloodFill.
+#
+#   python hub75/host/bench_flood_fill.py
+#
+# Scenes: the line of floodfill_on_hub75.py on 64x64 and the maze of
+# floodfill_maze_on_hub75_128x128.py on 128x128, generated the same way
+# (without drawing). The old floodfill() runs with its max_steps caps; it
+# is copied here without the display calls. Reported per scene: pixels
+# filled, pixels per second, peak queue depth and tracemalloc's peak of
+# bytes allocated during the fill (the host's counterpart of the drop in
+# gc.mem_free() on the Pico).
+#
+# Before that, FloodFill is checked against a plain BFS reference on random
+# grids, once with a tiny queue so that dropped seeds and the rescan are
+# exercised, in one call and in steps of 7 pixels, and with two fills
+# running at the same time.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from flood_fill import FloodFill
+
+RUNS = 20
+MAZE_WAY = 8
+
+
+def line_scene(rng, width=64, height=64):
+    grid = bytearray(width * height)
+    x = rng.randint(1, width - 1)
+    down = rng.randint(1, height - 15)
+    for i in range(down):
+        grid[i * width + x] = 1
+    left = rng.randint(1, x)
+    for i in range(left):
+        grid[down * width + x - i] = 1
+    for y in range(down, height):
+        grid[y * width + x - left] = 1
+    while True:
+        ex = rng.randint(0, width - 1)
+        ey = rng.randint(0, height - 1)
+        if grid[ey * width + ex] != 1:
+            break
+    grid[ey * width + ex] = 3
+    return grid, width, height, ex, ey, 8000
+
+
+def maze_scene(rng, width=128, height=128, border=48):
+    grid = bytearray(width * height)
+    x = rng.randint(border // 2, width - border // 2)
+    y = rng.randint(border // 2, height - border // 2)
+    stack = [(x, y)]
+    visited = {(x, y)}
+    directions = [(0, MAZE_WAY), (0, -MAZE_WAY), (MAZE_WAY, 0), (-MAZE_WAY, 0)]
+    while stack:
+        x, y = stack[-1]
+        mixed = directions[:]
+        rng.shuffle(mixed)
+        for dx, dy in mixed:
+            nx, ny = x + dx, y + dy
+            if 0 < nx < width and 0 < ny < height and (nx, ny) not in visited:
+                for i in range(1, MAZE_WAY):
+                    cx = x + (dx // MAZE_WAY) * i
+                    cy = y + (dy // MAZE_WAY) * i
+                    if 0 <= cx < width and 0 <= cy < height:
+                        grid[cy * width + cx] = 1
+                stack.append((nx, ny))
+                visited.add((nx, ny))
+                if nx < width and ny < height:
+                    grid[ny * width + nx] = 5
+                break
+        else:
+            stack.pop()
+    while True:
+        ex = rng.randint(border, width - border - 1)
+        ey = rng.randint(border, height - border - 1)
+        if grid[ey * width + ex] == 0:
+            break
+    grid[ey * width + ex] = 3
+    return grid, width, height, ex, ey, 16000
+
+
+# The old implementation, display calls removed
+def old_floodfill(grid, width, height, x, y, max_steps):
+    stack = [(x, y)]
+    steps = 0
+    peak = 1
+    while stack and steps < max_steps:
+        x, y = stack.pop(0)
+        grid_value = grid[y * width + x]
+        if x < 0 or x >= width or y < 0 or y >= height:
+            continue
+        if grid_value != 0 and grid_value != 3:
+            continue
+        grid[y * width + x] = 2
+        steps += 1
+        if x + 1 < width:
+            stack.append((x + 1, y))
+        if x - 1 >= 0:
+            stack.append((x - 1, y))
+        if y + 1 < height:
+            stack.append((x, y + 1))
+        if y - 1 >= 0:
+            stack.append((x, y - 1))
+        if len(stack) > peak:
+            peak = len(stack)
+    return steps, peak
+
+
+def reference(grid, width, height, x, y, value):
+    queue = deque([(x, y)])
+    while queue:
+        x, y = queue.popleft()
+        if 0 <= x < width and 0 <= y < height and grid[y * width + x] in (0, 3):
+            grid[y * width + x] = value
+            queue.extend(((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)))
+
+
+def check():
+    rng = random.Random(7)
+    for trial in range(60):
+        width = rng.randint(1, 40)
+        height = rng.randint(1, 40)
+        density = rng.random() * 0.6
+        grid = bytearray(1 if rng.random() < density else 0 for _ in range(width * height))
+        x = rng.randrange(width)
+        y = rng.randrange(height)
+        expected = bytearray(grid)
+        reference(expected, width, height, x, y, 2)
+        for capacity in (4, 512):
+            filled = bytearray(grid)
+            fill = FloodFill(filled, width, height, fillable=(0, 3), capacity=capacity)
+            pixels = fill.fill(x, y, 2)
+            assert filled == expected, (trial, capacity)
+            assert pixels == expected.count(2)
+            if capacity == 4 and fill.dropped:
+                assert fill.rescans > 0
+                assert fill.peak == capacity
+            # The same fill in small steps
+            stepped = bytearray(grid)
+            fill = FloodFill(stepped, width, height, fillable=(0, 3), capacity=capacity)
+            fill.start(x, y, 2)
+            steps = 0
+            while fill.step(7):
+                steps += 1
+            assert stepped == expected, (trial, capacity, "stepped")
+            assert steps <= expected.count(2) // 7 + 1
+        # Two fills at once cover what both would reach
+        x2 = rng.randrange(width)
+        y2 = rng.randrange(height)
+        reference(expected, width, height, x2, y2, 2)
+        both = bytearray(grid)
+        first = FloodFill(both, width, height, fillable=(0, 3), capacity=8)
+        second = FloodFill(both, width, height, fillable=(0, 3), capacity=8)
+        first.start(x, y, 2)
+        second.start(x2, y2, 6)
+        while first.step(5) | second.step(5):
+            pass
+        assert bytearray(2 if v == 6 else v for v in both) == expected, (trial, "concurrent")
+
+
+# Time without tracemalloc (it slows down every allocation), then the
+# allocation peak in a second run on a copy of the grid
+def measure(function, grid):
+    copy = bytearray(grid)
+    start = time.perf_counter()
+    result = function(grid)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(copy)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak_bytes
+
+
+def main():
+    check()
+    print("scanline fill == BFS reference (4-entry queue, stepped, concurrent): ok")
+    print()
+    print("{:<10} {:<12} {:>8} {:>11} {:>11} {:>12}".format(
+        "scene", "fill", "pixels", "px/s", "peak queue", "peak bytes"))
+    for name, make in (("line 64", line_scene), ("maze 128", maze_scene)):
+        totals = {"old": [0, 0.0, 0, 0], "FloodFill": [0, 0.0, 0, 0]}
+        rng = random.Random(1)
+        for _ in range(RUNS):
+            grid, width, height, x, y, max_steps = make(rng)
+            (pixels, peak), elapsed, peak_bytes = measure(
+                lambda g: old_floodfill(g, width, height, x, y, max_steps), bytearray(grid))
+            row = totals["old"]
+            row[0] += pixels
+            row[1] += elapsed
+            row[2] = max(row[2], peak)
+            row[3] = max(row[3], peak_bytes)
+            fill = FloodFill(grid, width, height, fillable=(0, 3), capacity=512)
+
+            def run(g):
+                fill.grid = g
+                return fill.fill(x, y, 2)
+
+            pixels, elapsed, peak_bytes = measure(run, grid)
+            row = totals["FloodFill"]
+            row[0] += pixels
+            row[1] += elapsed
+            row[2] = max(row[2], fill.peak)
+            row[3] = max(row[3], peak_bytes)
+        for label, (pixels, elapsed, peak, peak_bytes) in totals.items():
+            print("{:<10} {:<12} {:>8} {:>11.0f} {:>11} {:>12}".format(
+                name, label, pixels // RUNS, pixels / elapsed, peak, peak_bytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Host-side benchmark: score and clock of the 128x128 snake demo, redrawn
+# every frame as before vs. through font.TextRun.
+#
+#   python hub75/host/bench_font.py
+#
+# A simulated game of FRAMES steps: the clock changes once a minute (every
+# 600 frames here) and the score every 150 frames. The old code clears both
+# boxes and draws every glyph from the '0'/'1' strings each frame; the text
+# runs only touch glyphs that changed. Afterwards the physical pixels of
+# both must be identical.
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from font import ADVANCE, TextRun
+from panel_map import PanelMap, xWIDTH, xHEIGHT
+
+WIDTH = 128
+FRAMES = 3000
+CLOCK_EVERY = 600
+SCORE_EVERY = 150
+
+char_dict = {
+    '0': ["01110", "10001", "10001", "10001", "01110"],
+    '1': ["00100", "01100", "00100", "00100", "01110"],
+    '2': ["11110", "00001", "01110", "10000", "11111"],
+    '3': ["11110", "00001", "00110", "00001", "11110"],
+    '4': ["10000", "10010", "10010", "11111", "00010"],
+    '5': ["11111", "10000", "11110", "00001", "11110"],
+    '6': ["01110", "10000", "11110", "10001", "01110"],
+    '7': ["11111", "00010", "00100", "01000", "10000"],
+    '8': ["01110", "10001", "01110", "10001", "01110"],
+    '9': ["01110", "10001", "01111", "00001", "01110"],
+    ' ': ["00000", "00000", "00000", "00000", "00000"],
+    '.': ["00000", "00000", "00000", "00000", "00001"],
+    ':': ["00000", "00100", "00000", "00100", "00000"]
+}
+
+
+def strings(frame):
+    minutes = 12 * 60 + 34 + frame // CLOCK_EVERY
+    return str(frame // SCORE_EVERY * 7), "{:02}:{:02}".format(minutes // 60 % 24, minutes % 60)
+
+
+# display_score_and_time() as it was originally, per-pixel rect() and
+# draw_text()
+def legacy(set_pixel_mapped):
+    def rect(x1, y1, x2, y2, r, g, b):
+        for x in range(min(x1, x2), max(x1, x2) + 1):
+            for y in range(min(y1, y2), max(y1, y2) + 1):
+                set_pixel_mapped(x, y, r, g, b)
+
+    def draw_text(x, y, text, r, g, b):
+        for char in text:
+            if char in char_dict:
+                matrix = char_dict[char]
+                for row in range(5):
+                    for col in range(5):
+                        if matrix[row][col] == '1':
+                            set_pixel_mapped(x + col, y + row, r, g, b)
+            x += 6
+
+    def frame(score_str, time_str):
+        time_x = WIDTH - (len(time_str) * 6) - 1
+        rect(1, 1, 1 + len(score_str) * 6, 6, 0, 0, 0)
+        rect(time_x, 1, time_x + len(time_str) * 6, 6, 0, 0, 0)
+        draw_text(1, 1, score_str, 255, 255, 255)
+        draw_text(time_x, 1, time_str, 255, 255, 255)
+    return frame
+
+
+def cached(panel):
+    score_run = TextRun(panel, 1, 1)
+    time_run = TextRun(panel, WIDTH - 5 * ADVANCE - 1, 1)
+
+    def frame(score_str, time_str):
+        score_run.draw(score_str)
+        time_run.draw(time_str)
+    return frame
+
+
+def run(make):
+    display = hub75.Hub75(xWIDTH, xHEIGHT)
+    panel = PanelMap(display)
+    frame = make(panel.set_pixel_mapped) if make is legacy else make(panel)
+    texts = [strings(i) for i in range(FRAMES)]
+    start = time.perf_counter()
+    for score_str, time_str in texts:
+        frame(score_str, time_str)
+    elapsed = time.perf_counter() - start
+    return display, elapsed * 1e6 / FRAMES
+
+
+def main():
+    old, old_us = run(legacy)
+    new, new_us = run(cached)
+    assert old.pixels == new.pixels, "text differs"
+    print("{:18} {:>12} {:>16}".format("", "us/frame", "set_pixel/frame"))
+    print("{:18} {:>12.1f} {:>16.1f}".format("per-pixel redraw", old_us, old.set_pixel_calls / FRAMES))
+    print("{:18} {:>12.1f} {:>16.2f}".format("TextRun", new_us, new.set_pixel_calls / FRAMES))
+    print("speedup {:.0f}x".format(old_us / new_us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Host-side check: does FramePacer hold the tick rate under changing load?
+#
+#   python hub75/host/bench_frame_pacer.py
+#
+# The pacer's clock is replaced by a virtual one (sleep_us advances it), so
+# the runs are exact and take no real time. Each scenario runs 10 simulated
+# seconds of a 30 Hz game at 30 fps with frames of the given render cost:
+#
+#   light     5 ms every frame
+#   heavy    45 ms every frame (slower than the frame budget)
+#   spikes    5 ms, every 50th frame 150 ms (a gc.collect(), a long line)
+#   ramp      2 ms growing to 40 ms (the snake getting longer)
+#
+# Reported: frames drawn, simulation ticks run against the ticks that were
+# due (10 s * 30 Hz = 300), dropped frames and ticks, jitter and busy share.
+# The ticks must stay at 300 as long as no catch-up limit is hit; the old
+# fixed sleep after each frame is shown for comparison.
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import frame_pacer
+from frame_pacer import FramePacer
+
+TICK_HZ = 30
+FPS = 30
+SECONDS = 10
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def ticks_us(self):
+        return self.now & 0x3FFFFFFF
+
+    def sleep_us(self, us):
+        self.now += us
+
+
+clock = Clock()
+frame_pacer.ticks_us = clock.ticks_us
+frame_pacer.sleep_us = clock.sleep_us
+
+
+def light(frame):
+    return 5000
+
+
+def heavy(frame):
+    return 45000
+
+
+def spikes(frame):
+    return 150000 if frame % 50 == 49 else 5000
+
+
+def ramp(frame):
+    return 2000 + frame * 38000 // (SECONDS * FPS)
+
+
+SCENARIOS = (("light", light), ("heavy", heavy), ("spikes", spikes), ("ramp", ramp))
+
+
+def paced(cost):
+    clock.now = 0
+    pacer = FramePacer(TICK_HZ, FPS)
+    frame = 0
+    while clock.now < SECONDS * 1000000:
+        pacer.begin()
+        clock.now += cost(frame)
+        pacer.end()
+        frame += 1
+    return pacer
+
+
+# The loops before: one tick per frame, then a fixed sleep
+def fixed_sleep(cost):
+    clock.now = 0
+    frame = 0
+    while clock.now < SECONDS * 1000000:
+        clock.now += cost(frame)
+        clock.sleep_us(1000000 // FPS)
+        frame += 1
+    return frame
+
+
+def check():
+    # Catch-up: a 200 ms frame makes the next frame run 2 ticks, a 1 s
+    # frame is cut to max_catch_up and the rest counted as dropped
+    clock.now = 0
+    pacer = FramePacer(10, 10, max_catch_up=4)
+    assert pacer.begin() == 1
+    pacer.end()
+    assert clock.now == 100000
+    assert pacer.begin() == 1
+    clock.now += 200000
+    pacer.end()
+    assert pacer.dropped_frames == 1
+    assert pacer.begin() == 2
+    clock.now += 1000000
+    pacer.end()
+    assert pacer.begin() == 4
+    assert pacer.dropped_ticks == 6
+    pacer.end()
+    # After reset() a long pause is neither caught up nor dropped
+    clock.now += 5000000
+    pacer.reset()
+    assert pacer.begin() == 1
+    pacer.end()
+    assert pacer.begin() == 1
+    assert pacer.dropped_ticks == 0 and pacer.dropped_frames == 0
+
+
+def main():
+    check()
+    print("catch-up, tick limit and reset: ok")
+    print()
+    due = SECONDS * TICK_HZ
+    print("{:<8} {:>7} {:>9} {:>8} {:>8} {:>10} {:>10} {:>6}   {:>12}".format(
+        "load", "frames", "ticks", "drop f", "drop t", "jitter avg", "jitter max", "busy",
+        "fixed sleep"))
+    for name, cost in SCENARIOS:
+        pacer = paced(cost)
+        print("{:<8} {:>7} {:>5}/{:<3} {:>8} {:>8} {:>10} {:>10} {:>5}%   {:>6} ticks".format(
+            name, pacer.frames, pacer.ticks, due, pacer.dropped_frames, pacer.dropped_ticks,
+            pacer.jitter_total // (pacer.intervals or 1), pacer.jitter_max,
+            100 * pacer.busy_total // (pacer.frames * pacer.frame_us), fixed_sleep(cost)))
+
+
+if __name__ == "__main__":
+    main()
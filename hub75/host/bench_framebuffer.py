@@ -0,0 +1,109 @@
+# Host-side benchmark: driver calls per frame with and without FrameBuffer.
+#
+#   python hub75/host/bench_framebuffer.py
+#
+# Both workloads mirror the drawing pattern of a demo script: the fire
+# spread of fire_on_hub75_128x128.py (random overdraw of the bottom 32 rows)
+# and draw_changes() of conway_on_hub75_128x128.py (current state redrawn,
+# then the changes). Each runs once with set_pixel_mapped() writing to the
+# driver directly and once through a FrameBuffer flushed per frame. The
+# physical pixels must end up identical.
+
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from framebuffer import FrameBuffer
+from panel_map import PanelMap, xWIDTH, xHEIGHT
+
+FRAMES = 20
+SEED = 1234
+
+FIRE_ROWS = 32
+FIRE_COLORS = [
+    (0, 0, 0), (32, 0, 0), (64, 0, 0), (128, 32, 0), (192, 64, 32),
+    (255, 64, 0), (255, 160, 0), (255, 255, 0), (255, 255, 128), (192, 192, 255),
+]
+
+
+def fire_frames(set_pixel, end_frame):
+    heat = [0] * (FIRE_ROWS * 128)
+    for x in range(128):
+        heat[(FIRE_ROWS - 1) * 128 + x] = len(FIRE_COLORS) - 1
+    for _ in range(FRAMES):
+        indices = [(y, x) for y in range(1, FIRE_ROWS) for x in range(128)]
+        random.shuffle(indices)
+        for y, x in indices:
+            src = y * 128 + x
+            rand = random.randint(0, 3)
+            dst = src - 128 + rand - 1
+            if 0 <= dst < len(heat):
+                value = max(0, heat[src] - (rand & 1))
+                if heat[dst] != value:
+                    heat[dst] = value
+                    r, g, b = FIRE_COLORS[value]
+                    set_pixel(dst % 128, dst // 128 + 128 - FIRE_ROWS, r, g, b)
+        end_frame()
+
+
+def life_step(live):
+    counts = {}
+    for x, y in live:
+        for j in (-1, 0, 1):
+            for i in (-1, 0, 1):
+                if i or j:
+                    cell = ((x + i) % 128, (y + j) % 128)
+                    counts[cell] = counts.get(cell, 0) + 1
+    return set(cell for cell, n in counts.items() if n == 3 or (n == 2 and cell in live))
+
+
+def conway_frames(set_pixel, end_frame):
+    live = set()
+    while len(live) < 3200:
+        live.add((random.randint(24, 103), random.randint(24, 103)))
+
+    def draw_changes(old_live, new_live):
+        for x, y in old_live | new_live:
+            if (x, y) in new_live:
+                set_pixel(x, y, 255, 255, 255)
+            else:
+                set_pixel(x, y, 0, 0, 0)
+
+    for _ in range(FRAMES):
+        draw_changes(live, live)
+        new_live = life_step(live)
+        draw_changes(live, new_live)
+        live = new_live
+        end_frame()
+
+
+def run(workload, buffered):
+    random.seed(SEED)
+    display = hub75.Hub75(xWIDTH, xHEIGHT)
+    panel = PanelMap(display)
+    if buffered:
+        framebuffer = FrameBuffer(panel)
+        workload(framebuffer.set_pixel, framebuffer.flush)
+    else:
+        workload(panel.set_pixel_mapped, lambda: None)
+    return display
+
+
+def main():
+    for name, workload in (("fire", fire_frames), ("conway", conway_frames)):
+        direct = run(workload, False)
+        buffered = run(workload, True)
+        assert direct.pixels == buffered.pixels, "framebuffer output differs"
+        before = direct.set_pixel_calls / FRAMES
+        after = buffered.set_pixel_calls / FRAMES
+        print("{:7} direct: {:8.0f} set_pixel/frame   framebuffer: {:8.0f} set_pixel/frame   ({:.1f}x fewer)".format(
+            name, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
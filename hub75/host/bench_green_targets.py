@@ -0,0 +1,162 @@
+# Host-side benchmark: green targets as a list of tuples vs. GreenTargets.
+#
+#   python hub75/host/bench_green_targets.py
+#
+# One step = count the lifespans down (update_green_targets()), look for
+# the nearest target from the head (find_nearest_target()) and test the
+# head for a hit (check_green_target_collision()), as the 128x128 script
+# does. A seeded random run with targets coming and going first checks that
+# both versions expire and take the same targets at the same steps and find
+# the same nearest distance. Then steps per second and tracemalloc's peak
+# of bytes allocated per step are compared for 1 to 200 live targets (the
+# scripts place one every 1024 steps, so usually 0 or 1 are alive). The
+# list version's bytes grow with the number of targets; what remains for
+# the manager is CPython boxing the cell numbers above 256, which
+# MicroPython keeps as small ints.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from green_targets import GreenTargets
+
+SIZE = 128
+LIFESPAN = 256
+COUNTS = (1, 16, 64, 200)
+STEPS = 2000
+SEED = 5
+
+
+# The list version as it was in the script
+class ListTargets:
+    def __init__(self):
+        self.targets = []
+
+    def add(self, x, y):
+        self.targets.append((x, y, LIFESPAN))
+
+    def tick(self, expire):
+        kept = []
+        for x, y, lifespan in self.targets:
+            if lifespan > 1:
+                kept.append((x, y, lifespan - 1))
+            else:
+                expire(x, y)
+        self.targets = kept
+
+    def take(self, head_x, head_y):
+        for target in self.targets:
+            x, y, lifespan = target
+            if (head_x, head_y) == (x, y):
+                self.targets.remove(target)
+                return True
+        return False
+
+    def nearest(self, head_x, head_y):
+        best = float('inf')
+        for x, y, _ in self.targets:
+            distance = abs(head_x - x) + abs(head_y - y)
+            if distance < best:
+                best = distance
+        return best
+
+
+def check():
+    rng = random.Random(SEED)
+    old = ListTargets()
+    new = GreenTargets(SIZE, SIZE, LIFESPAN, capacity=200)
+    old_expired = []
+    new_expired = []
+    for step in range(20000):
+        if rng.randrange(4) == 0:
+            x, y = rng.randrange(SIZE), rng.randrange(SIZE)
+            if not new.is_target(x, y) and new.count < new.capacity:
+                old.add(x, y)
+                assert new.add(x, y)
+        old.tick(lambda x, y: old_expired.append((x, y)))
+        new.tick(lambda x, y: new_expired.append((x, y)))
+        assert sorted(old_expired) == sorted(new_expired)
+        head_x, head_y = rng.randrange(SIZE), rng.randrange(SIZE)
+        if old.targets and rng.randrange(3) == 0:
+            # Aim at a live target now and then so hits happen
+            head_x, head_y, _ = rng.choice(old.targets)
+        cell = new.nearest(head_x, head_y)
+        if old.targets:
+            assert new.distance == old.nearest(head_x, head_y)
+            assert abs(cell % SIZE - head_x) + abs(cell // SIZE - head_y) == new.distance
+        else:
+            assert cell == -1
+        assert old.take(head_x, head_y) == new.take(head_x, head_y)
+        assert new.count == len(old.targets)
+        assert new.aligned(head_x, head_y) == any(
+            x == head_x or y == head_y for x, y, _ in old.targets)
+
+
+def fill(targets, count, rng):
+    while True:
+        x, y = rng.randrange(SIZE), rng.randrange(SIZE)
+        if isinstance(targets, GreenTargets):
+            if targets.count == count:
+                return
+            targets.add(x, y)
+        else:
+            if len(targets.targets) == count:
+                return
+            targets.add(x, y)
+
+
+def run(targets, rng, steps):
+    # Replace what expires so the count stays level
+    def replace(x, y):
+        targets.add(rng.randrange(SIZE), rng.randrange(SIZE))
+
+    for _ in range(steps):
+        targets.tick(replace)
+        head_x, head_y = rng.randrange(SIZE), rng.randrange(SIZE)
+        targets.nearest(head_x, head_y)
+        targets.take(head_x, head_y)
+
+
+def measure(make, count):
+    rng = random.Random(count)
+    targets = make()
+    fill(targets, count, rng)
+    tracemalloc.start()
+    allocated = 0
+    ignore = lambda x, y: None
+    for _ in range(200):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        head_x, head_y = rng.randrange(SIZE), rng.randrange(SIZE)
+        targets.tick(ignore)
+        targets.nearest(head_x, head_y)
+        targets.take(head_x, head_y)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    fill(targets, count, rng)
+    start = time.perf_counter()
+    run(targets, rng, STEPS)
+    return STEPS / (time.perf_counter() - start), allocated / 200
+
+
+def main():
+    check()
+    print("random run: expiry, hits and nearest distance agree with the list version")
+    print()
+    print("{:>8} {:>14} {:>12} {:>16} {:>12} {:>9}".format(
+        "targets", "list steps/s", "list B/step", "manager steps/s", "mgr B/step", "speedup"))
+    for count in COUNTS:
+        old_rate, old_bytes = measure(ListTargets, count)
+        new_rate, new_bytes = measure(lambda: GreenTargets(SIZE, SIZE, LIFESPAN, capacity=255), count)
+        print("{:>8} {:>14.0f} {:>12.0f} {:>16.0f} {:>12.0f} {:>8.1f}x".format(
+            count, old_rate, old_bytes, new_rate, new_bytes, new_rate / old_rate))
+
+
+if __name__ == "__main__":
+    main()
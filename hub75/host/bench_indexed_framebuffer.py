@@ -0,0 +1,141 @@
+# Host-side benchmark: the fire demo through the RGB FrameBuffer vs. the
+# palette-indexed IndexedFrameBuffer.
+#
+#   python hub75/host/bench_indexed_framebuffer.py
+#
+# Both run the same seeded fire kernel. Burning: ms per frame, buffer size
+# and driver calls. Fade-out: with the RGB buffer every fire pixel has to be
+# redrawn in the dimmed colour, the indexed buffer only rewrites the 10
+# palette entries. The physical pixels must be identical after every frame.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from fire_kernel import FireKernel
+from framebuffer import FrameBuffer, IndexedFrameBuffer
+from panel_map import PanelMap, xWIDTH, xHEIGHT
+
+GRID_HEIGHT = 32
+GRID_WIDTH = 128
+Y_OFFSET = GRID_WIDTH - GRID_HEIGHT
+FRAMES = 60
+FADE_FRAMES = 16
+SEED = 5
+
+rgbs = [
+    (0, 0, 0), (32, 0, 0), (64, 0, 0), (128, 32, 0), (192, 64, 32),
+    (255, 64, 0), (255, 160, 0), (255, 255, 0), (255, 255, 128), (192, 192, 255),
+]
+
+
+def faded(level):
+    return [(r * level // FADE_FRAMES, g * level // FADE_FRAMES, b * level // FADE_FRAMES)
+            for r, g, b in rgbs]
+
+
+class RgbFire:
+    def __init__(self):
+        self.display = hub75.Hub75(xWIDTH, xHEIGHT)
+        self.framebuffer = FrameBuffer(PanelMap(self.display))
+        self.kernel = FireKernel(GRID_WIDTH, GRID_HEIGHT)
+        self.kernel.set_bottom_row(len(rgbs) - 1)
+        self.buffer_bytes = len(self.framebuffer.pixels)
+        self.writes = 0
+
+    def frame(self):
+        self.kernel.step()
+        self.kernel.render(self.framebuffer.set_pixel, rgbs, Y_OFFSET)
+        self.framebuffer.flush()
+
+    # Without a palette every pixel is redrawn in the dimmed colour
+    def fade_frame(self, level):
+        colors = faded(level)
+        self.kernel.step()
+        self.kernel.render(self.framebuffer.set_pixel, colors, Y_OFFSET)
+        set_pixel = self.framebuffer.set_pixel
+        heat = self.kernel.heat
+        self.writes += len(heat)
+        for i in range(len(heat)):
+            r, g, b = colors[heat[i]]
+            set_pixel(i % GRID_WIDTH, i // GRID_WIDTH + Y_OFFSET, r, g, b)
+        self.framebuffer.flush()
+
+
+class IndexedFire:
+    def __init__(self):
+        self.display = hub75.Hub75(xWIDTH, xHEIGHT)
+        self.framebuffer = IndexedFrameBuffer(PanelMap(self.display), rgbs)
+        self.kernel = FireKernel(GRID_WIDTH, GRID_HEIGHT)
+        self.kernel.set_bottom_row(len(rgbs) - 1)
+        self.buffer_bytes = len(self.framebuffer.pixels) + len(self.framebuffer.palette)
+        self.writes = 0
+
+    def frame(self):
+        self.kernel.step()
+        self.kernel.render_indexed(self.framebuffer.set_pixel, Y_OFFSET)
+        self.framebuffer.flush()
+
+    def fade_frame(self, level):
+        for index, (r, g, b) in enumerate(faded(level)):
+            self.framebuffer.set_color(index, r, g, b)
+            self.writes += 1
+        self.kernel.step()
+        self.kernel.render_indexed(self.framebuffer.set_pixel, Y_OFFSET)
+        self.framebuffer.flush()
+
+
+def run(fire_class):
+    random.seed(SEED)
+    fire = fire_class()
+    frames = []
+    burn = 0.0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        fire.frame()
+        burn += time.perf_counter() - start
+        frames.append(bytes(fire.display.pixels))
+    burn_calls = fire.display.set_pixel_calls
+    fire.display.reset_counters()
+    fade = 0.0
+    for level in range(FADE_FRAMES - 1, -1, -1):
+        start = time.perf_counter()
+        fire.fade_frame(level)
+        fade += time.perf_counter() - start
+        frames.append(bytes(fire.display.pixels))
+    fade_calls = fire.display.set_pixel_calls
+    return {
+        "frames": frames,
+        "bytes": fire.buffer_bytes,
+        "burn_ms": burn * 1000 / FRAMES,
+        "burn_calls": burn_calls / FRAMES,
+        "fade_ms": fade * 1000 / FADE_FRAMES,
+        "fade_calls": fade_calls / FADE_FRAMES,
+        "fade_writes": fire.writes / FADE_FRAMES,
+    }
+
+
+def main():
+    rgb = run(RgbFire)
+    indexed = run(IndexedFire)
+    assert rgb["frames"] == indexed["frames"], "indexed output differs"
+    assert not any(indexed["frames"][-1]), "fire did not fade to black"
+
+    print("{:20} {:>10} {:>10} {:>12} {:>10} {:>12} {:>12}".format(
+        "", "buffer B", "burn ms", "burn calls", "fade ms", "fade calls", "fade writes"))
+    for name, result in (("FrameBuffer", rgb), ("IndexedFrameBuffer", indexed)):
+        print("{:20} {:>10} {:>10.2f} {:>12.0f} {:>10.2f} {:>12.0f} {:>12.0f}".format(
+            name, result["bytes"], result["burn_ms"], result["burn_calls"],
+            result["fade_ms"], result["fade_calls"], result["fade_writes"]))
+    print("calls = driver set_pixel() calls per frame, fade writes = extra")
+    print("set_pixel() / set_color() calls per frame the script makes to fade")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Host-side benchmark: list-of-tuples Game of Life vs. the bit-packed engine.
+#
+#   python hub75/host/bench_life_bits.py
+#
+# The list version is a copy of update_live_cells() from
+# conway_on_hub75_128x128.py. Its cost grows with the square of the
+# population, so it is only measured on the seeded centre square the script
+# uses (BORDER = 48, i.e. 32x32). The bit-packed engine is measured there
+# and on the whole 128x128 board. Both engines must agree generation by
+# generation.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from life_bits import LifeBoard, update_live_cells
+
+HEIGHT = 128
+WIDTH = 128
+BORDER = 48
+DENSITIES = (10, 30, 50)
+GENERATIONS = 10
+MIN_SECONDS = 1.0
+SEED = 42
+
+
+def legacy_count_neighbors(live_cells, x, y):
+    count = 0
+    for j in range(-1, 2):
+        ny = (y + j) % HEIGHT
+        for i in range(-1, 2):
+            if i == 0 and j == 0:
+                continue
+            nx = (x + i) % WIDTH
+            if (nx, ny) in live_cells:
+                count += 1
+    return count
+
+
+def legacy_update_live_cells(live_cells):
+    new_live_cells = []
+    cells_to_check = set()
+    for (x, y) in live_cells:
+        cells_to_check.add((x, y))
+        for j in range(-1, 2):
+            for i in range(-1, 2):
+                nx = (x + i) % WIDTH
+                ny = (y + j) % HEIGHT
+                cells_to_check.add((nx, ny))
+    for (x, y) in cells_to_check:
+        neighbors = legacy_count_neighbors(live_cells, x, y)
+        if (x, y) in live_cells:
+            if neighbors in (2, 3):
+                new_live_cells.append((x, y))
+        else:
+            if neighbors == 3:
+                new_live_cells.append((x, y))
+    return new_live_cells
+
+
+def seed(density, border):
+    random.seed(SEED)
+    cells = []
+    for y in range(border, HEIGHT - border):
+        for x in range(border, WIDTH - border):
+            if random.randrange(100) < density:
+                cells.append((x, y))
+    return cells
+
+
+# Generations per second over the first GENERATIONS generations after
+# seeding (the population collapses later), repeated for MIN_SECONDS
+def rate(step, make_state):
+    generations = 0
+    elapsed = 0
+    while elapsed < MIN_SECONDS:
+        state = make_state()
+        start = time.perf_counter()
+        for _ in range(GENERATIONS):
+            state = step(state)
+        elapsed += time.perf_counter() - start
+        generations += GENERATIONS
+    return generations / elapsed
+
+
+def bit_step(board):
+    board.step()
+    return board
+
+
+def check_agreement():
+    cells = seed(30, BORDER)
+    board = LifeBoard.from_cells(cells)
+    for _ in range(10):
+        cells = legacy_update_live_cells(cells)
+        board.step()
+        assert sorted(cells) == sorted(board.cells())
+    assert sorted(update_live_cells(cells)) == sorted(legacy_update_live_cells(cells))
+
+
+def main():
+    check_agreement()
+    print("{:>8} {:>8} {:>7} {:>14} {:>14} {:>9}".format(
+        "board", "density", "cells", "list gen/s", "bits gen/s", "speedup"))
+    for density in DENSITIES:
+        cells = seed(density, BORDER)
+        legacy = rate(legacy_update_live_cells, lambda: cells)
+        bits = rate(bit_step, lambda: LifeBoard.from_cells(cells))
+        print("{:>8} {:>7}% {:>7} {:>14.2f} {:>14.1f} {:>8.0f}x".format(
+            "32x32", density, len(cells), legacy, bits, bits / legacy))
+    for density in DENSITIES:
+        cells = seed(density, 0)
+        bits = rate(bit_step, lambda: LifeBoard.from_cells(cells))
+        print("{:>8} {:>7}% {:>7} {:>14} {:>14.1f}".format(
+            "128x128", density, len(cells), "-", bits))
+
+
+if __name__ == "__main__":
+    main()
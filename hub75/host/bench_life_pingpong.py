@@ -0,0 +1,143 @@
+# Host-side benchmark: conway_on_hub75.py (64x64) before and after the
+# double-buffered engine.
+#
+#   python hub75/host/bench_life_pingpong.py
+#
+# A frame is one generation plus drawing it on the stand-in Hub75 driver.
+# The old frame allocates a new grid and repaints every live cell after a
+# display.clear(); the new one reuses both buffers and repaints only the
+# cells that changed. Allocation is measured with tracemalloc as the peak of
+# memory allocated during the frame. CPython boxes every integer above 256,
+# so the new engine shows a few bytes of int churn here that MicroPython
+# (small ints are not heap objects) does not have.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from life_pingpong import PingPongLife
+
+HEIGHT = 64
+WIDTH = 64
+BORDER = 16
+FRAMES = 30
+SEED = 7
+
+
+def initialize_grid():
+    random.seed(SEED)
+    grid = bytearray(WIDTH * HEIGHT)
+    for y in range(BORDER, HEIGHT - BORDER):
+        for x in range(BORDER, WIDTH - BORDER):
+            grid[y * WIDTH + x] = random.getrandbits(1)
+    return grid
+
+
+# Copies of the functions in conway_on_hub75.py
+def count_neighbors(grid, x, y):
+    count = 0
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            if not (i == 0 and j == 0):
+                nx, ny = (x + i) % WIDTH, (y + j) % HEIGHT
+                if grid[ny * WIDTH + nx] == 1:
+                    count += 1
+    return count
+
+
+def update_grid(grid):
+    new_grid = bytearray(WIDTH * HEIGHT)
+    for y in range(0, HEIGHT):
+        for x in range(0, WIDTH):
+            neighbors = count_neighbors(grid, x, y)
+            idx = y * WIDTH + x
+            if grid[idx] == 1 and neighbors in (2, 3):
+                new_grid[idx] = 1
+            elif grid[idx] == 0 and neighbors == 3:
+                new_grid[idx] = 1
+    return new_grid
+
+
+def draw_grid(display, grid):
+    display.clear()
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            if grid[y * WIDTH + x] == 1:
+                display.set_pixel(x, y, 255, 255, 255)
+
+
+def draw_changes(display, life, count):
+    cells = life.cells
+    changed = life.changed
+    for k in range(count):
+        i = changed[k]
+        if cells[i]:
+            display.set_pixel(i % WIDTH, i // WIDTH, 255, 255, 255)
+        else:
+            display.set_pixel(i % WIDTH, i // WIDTH, 0, 0, 0)
+
+
+def measure(frame):
+    frame()  # warm up, first frame of the new engine draws every live cell
+    tracemalloc.start()
+    frame_time = 0
+    allocated = 0
+    for _ in range(FRAMES):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        frame()
+        frame_time += time.perf_counter() - start
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return frame_time / FRAMES * 1000, allocated / FRAMES
+
+
+def main():
+    old_display = hub75.Hub75(WIDTH, HEIGHT)
+    state = {"grid": initialize_grid()}
+
+    def old_frame():
+        draw_grid(old_display, state["grid"])
+        state["grid"] = update_grid(state["grid"])
+
+    new_display = hub75.Hub75(WIDTH, HEIGHT)
+    life = PingPongLife(WIDTH, HEIGHT)
+    life.cells[:] = initialize_grid()
+    counts = [0]
+
+    def new_frame():
+        draw_changes(new_display, life, counts[0])
+        counts[0] = life.step()
+
+    # Prime the new display with the initial generation
+    for i in range(WIDTH * HEIGHT):
+        if life.cells[i]:
+            new_display.set_pixel(i % WIDTH, i // WIDTH, 255, 255, 255)
+
+    old_ms, old_bytes = measure(old_frame)
+    new_ms, new_bytes = measure(new_frame)
+    draw_changes(new_display, life, counts[0])
+    draw_grid(old_display, state["grid"])
+    assert state["grid"] == life.cells, "engines disagree"
+    assert old_display.pixels == new_display.pixels, "displays disagree"
+
+    frames = FRAMES + 1
+    row = "{:18} {:>10} {:>16} {:>16} {:>12}"
+    print(row.format("", "ms/frame", "bytes alloc/gen", "set_pixel/frame", "clear/frame"))
+    for name, ms, allocated, display in (("update_grid()", old_ms, old_bytes, old_display),
+                                         ("PingPongLife", new_ms, new_bytes, new_display)):
+        print(row.format(name, "{:.2f}".format(ms), "{:.0f}".format(allocated),
+                         "{:.0f}".format(display.set_pixel_calls / frames),
+                         "{:.0f}".format(display.clear_calls / frames)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Host-side benchmark: generations per second versus board size at a fixed
+# number of live cells, full-board bit engine vs. the tiled engine.
+#
+#   python hub75/host/bench_life_tiles.py
+#
+# Every board is seeded with the same 32x32 soup (30% density) in its
+# centre, so the live-cell count does not depend on the board size. The
+# full-board engine (life_bits.py) pays for every row of the board, the
+# tiled engine only for the tiles around the soup.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from life_bits import LifeBoard
+from life_tiles import TiledLife
+
+SIZES = (128, 256, 512, 1024)
+SOUP = 32
+DENSITY = 30
+GENERATIONS = 50
+SEED = 99
+
+
+def soup(size):
+    random.seed(SEED)
+    offset = (size - SOUP) // 2
+    cells = []
+    for y in range(SOUP):
+        for x in range(SOUP):
+            if random.randrange(100) < DENSITY:
+                cells.append((offset + x, offset + y))
+    return cells
+
+
+def tiled_board(size, cells):
+    life = TiledLife(size, size)
+    for x, y in cells:
+        life.set(x, y, 1)
+    return life
+
+
+def timed(board):
+    start = time.perf_counter()
+    for _ in range(GENERATIONS):
+        board.step()
+    return GENERATIONS / (time.perf_counter() - start)
+
+
+# Both engines must agree cell by cell, and the incremental viewport
+# drawing must match a full redraw
+def check(size):
+    cells = soup(size)
+    full = LifeBoard.from_cells(cells, size, size)
+    tiled = tiled_board(size, cells)
+    vx = vy = (size - 128) // 2
+    drawn = hub75.Hub75(128, 128)
+    tiled.draw_viewport(drawn.set_pixel, vx, vy)
+    for _ in range(GENERATIONS):
+        full.step()
+        tiled.step()
+        tiled.draw_changes(drawn.set_pixel, vx, vy)
+    assert sorted(full.cells()) == sorted(
+        (x, y) for y in range(size) for x in range(size) if tiled.get(x, y))
+    expected = hub75.Hub75(128, 128)
+    tiled.draw_viewport(expected.set_pixel, vx, vy)
+    assert drawn.pixels == expected.pixels
+
+
+def main():
+    check(128)
+    check(256)
+    print("{:>10} {:>7} {:>16} {:>16} {:>14}".format(
+        "board", "cells", "full gen/s", "tiled gen/s", "active tiles"))
+    for size in SIZES:
+        cells = soup(size)
+        full = timed(LifeBoard.from_cells(cells, size, size))
+        life = tiled_board(size, cells)
+        tiled = timed(life)
+        print("{:>10} {:>7} {:>16.1f} {:>16.1f} {:>8} / {:<5}".format(
+            "{0}x{0}".format(size), len(cells), full, tiled,
+            life.active_count, life.tiles_x * life.tiles_y))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Host-side benchmark: full clear + redraw vs. LineRenderer.
+#
+#   python hub75/host/bench_line_renderer.py
+#
+# A rotating cube, torus and icosphere (through fixed3d) are drawn for a
+# number of frames on a recording panel, once the way cube_128.py did it
+# (display.clear(), then every line pixel) and once through LineRenderer,
+# with Bresenham and with Wu lines. After every frame the renderer's screen
+# must equal a fresh rasterisation of the same frame on a black panel.
+# Reported per frame: pixels touched (a clear counts every panel pixel),
+# pixels rasterised, and the time on the host.
+
+import os
+import sys
+import time
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import fixed3d
+from line_renderer import LineRenderer
+
+WIDTH = 128
+HEIGHT = 128
+FRAMES = 120
+SCALE = 30
+SPEED = fixed3d.radians(0.05)
+
+
+class RecordingPanel:
+    def __init__(self):
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.pixels = [0] * (WIDTH * HEIGHT)
+        self.calls = 0
+
+    def set_pixel_mapped(self, x, y, r, g, b):
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            self.pixels[y * WIDTH + x] = (r << 16) | (g << 8) | b
+        self.calls += 1
+
+    def clear(self):
+        for i in range(WIDTH * HEIGHT):
+            self.pixels[i] = 0
+        self.calls += WIDTH * HEIGHT
+
+
+def draw_line(panel, x1, y1, x2, y2, r, g, b):
+    dx = abs(x2 - x1)
+    dy = -abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx + dy
+    while True:
+        panel.set_pixel_mapped(x1, y1, r, g, b)
+        if x1 == x2 and y1 == y2:
+            break
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x1 += sx
+        if e2 <= dx:
+            err += dx
+            y1 += sy
+
+
+def frames(mesh):
+    matrix = array('i', [0] * 9)
+    xs = array('h', [0] * mesh.count)
+    ys = array('h', [0] * mesh.count)
+    zs = array('h', [0] * mesh.count)
+    colors = []
+    for e in range(mesh.edge_count):
+        a = mesh.edges[2 * e]
+        b = mesh.edges[2 * e + 1]
+        colors.append(((a * 20) % 256, (b * 40) % 256, (a * b * 15) % 256))
+    angle = 0
+    for _ in range(FRAMES):
+        fixed3d.rotation_matrix(matrix, angle, angle, angle)
+        fixed3d.transform(mesh.vertices, mesh.count, matrix, SCALE, WIDTH // 2, HEIGHT // 2, xs, ys, zs)
+        lines = []
+        for e in range(mesh.edge_count):
+            a = mesh.edges[2 * e]
+            b = mesh.edges[2 * e + 1]
+            lines.append((xs[a], ys[a], xs[b], ys[b]) + colors[e])
+        yield lines
+        angle = (angle + SPEED) & 0xFFFF
+
+
+def run_clear(mesh):
+    panel = RecordingPanel()
+    elapsed = 0
+    for lines in frames(mesh):
+        start = time.perf_counter()
+        panel.clear()
+        for line in lines:
+            draw_line(panel, *line)
+        elapsed += time.perf_counter() - start
+    return panel.calls / FRAMES, elapsed * 1e3 / FRAMES
+
+
+def run_renderer(mesh, antialias, capacity):
+    panel = RecordingPanel()
+    renderer = LineRenderer(panel, capacity=capacity, antialias=antialias)
+    reference = RecordingPanel()
+    fresh = LineRenderer(reference, capacity=capacity, antialias=antialias)
+    elapsed = 0
+    pixels = 0
+    peak = 0
+    for lines in frames(mesh):
+        start = time.perf_counter()
+        for line in lines:
+            renderer.line(*line)
+        renderer.present()
+        elapsed += time.perf_counter() - start
+        pixels += renderer.pixels
+        peak = max(peak, renderer.pixels)
+        # Same frame on a black panel
+        reference.pixels = [0] * (WIDTH * HEIGHT)
+        fresh.slot = array('H', [0] * (WIDTH * HEIGHT))
+        fresh.shown = 0
+        for line in lines:
+            fresh.line(*line)
+        fresh.present()
+        assert panel.pixels == reference.pixels
+    assert renderer.dropped == 0
+    return panel.calls / FRAMES, pixels / FRAMES, peak, elapsed * 1e3 / FRAMES
+
+
+def main():
+    meshes = (("cube", fixed3d.cube()), ("torus(16, 8)", fixed3d.torus(16, 8)),
+              ("icosphere(2)", fixed3d.icosphere(2)))
+    print("{:<14} {:<18} {:>9} {:>9} {:>9} {:>9}".format(
+        "mesh", "renderer", "touched", "pixels", "peak", "ms/frame"))
+    for name, mesh in meshes:
+        touched, ms = run_clear(mesh)
+        print("{:<14} {:<18} {:>9.0f} {:>9} {:>9} {:>9.2f}".format(
+            name, "clear + redraw", touched, "", "", ms))
+        for label, antialias in (("erase-by-redraw", False), ("  with Wu lines", True)):
+            touched, pixels, peak, ms = run_renderer(mesh, antialias, 16384)
+            print("{:<14} {:<18} {:>9.0f} {:>9.0f} {:>9} {:>9.2f}".format(
+                "", label, touched, pixels, peak, ms))
+    print()
+    print("every frame matched a fresh rasterisation: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Host-side benchmark: the old maze generator vs. MazeGenerator.
+#
+#   python hub75/host/bench_maze.py [--show dfs|wilson|eller]
+#
+# The old draw_maze_on_grid() (set of tuples, shuffled copy of the
+# directions per step, one pixel per call) is copied here without the
+# display calls. Every generator carves the 128x128 demo lattice into a
+# grid the way the demo does. Reported: time per maze, tracemalloc's peak
+# of bytes allocated while generating and the number of carve calls.
+#
+# Every maze is checked to be perfect: lattice cells - 1 passages and all
+# cells connected, so there is exactly one way between any two cells.
+# EllerRows then streams a 64-column maze of 5000 rows to show that its
+# memory does not grow with the height. --show prints one maze as text.
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from maze import EllerRows, MazeGenerator
+
+WIDTH = 128
+HEIGHT = 128
+BORDER = 48
+WAY = 8
+RUNS = 20
+
+
+def old_maze(rng, grid, calls):
+    stack = []
+    visited = set()
+    start_x = rng.randint(BORDER // 2, WIDTH - BORDER // 2)
+    start_y = rng.randint(BORDER // 2, HEIGHT - BORDER // 2)
+    stack.append((start_x, start_y))
+    visited.add((start_x, start_y))
+    directions = [(0, WAY), (0, -WAY), (WAY, 0), (-WAY, 0)]
+    while stack:
+        x, y = stack[-1]
+        mixed = directions[:]
+        for i in range(len(mixed) - 1, 0, -1):
+            j = rng.randint(0, i)
+            mixed[i], mixed[j] = mixed[j], mixed[i]
+        found = False
+        for dx, dy in mixed:
+            nx, ny = x + dx, y + dy
+            if 0 < nx < WIDTH and 0 < ny < HEIGHT and (nx, ny) not in visited:
+                for i in range(1, WAY):
+                    grid[(y + (dy // WAY) * i) * WIDTH + x + (dx // WAY) * i] = 1
+                    calls[0] += 1
+                stack.append((nx, ny))
+                visited.add((nx, ny))
+                grid[ny * WIDTH + nx] = 5
+                calls[0] += 1
+                found = True
+                break
+        if not found:
+            stack.pop()
+
+
+def new_maze(rng, grid, calls, generator, algorithm, passages=None):
+    start_x = rng.randint(BORDER // 2, WIDTH - BORDER // 2)
+    start_y = rng.randint(BORDER // 2, HEIGHT - BORDER // 2)
+    origin_x = start_x % WAY or WAY
+    origin_y = start_y % WAY or WAY
+    columns = (WIDTH - 1 - origin_x) // WAY + 1
+    rows = (HEIGHT - 1 - origin_y) // WAY + 1
+
+    def passage(cell, other):
+        if passages is not None:
+            passages.append((cell, other))
+        if other < cell:
+            cell, other = other, cell
+        x = origin_x + (cell % columns) * WAY
+        y = origin_y + (cell // columns) * WAY
+        step = 1 if other == cell + 1 else WIDTH
+        for i in range(WAY + 1):
+            grid[y * WIDTH + x + i * step] = 1
+        calls[0] += 1
+
+    start = ((start_y - origin_y) // WAY) * columns + (start_x - origin_x) // WAY
+    if algorithm == "wilson":
+        generator.wilson(columns, rows, start, passage)
+    elif algorithm == "eller":
+        generator.eller(columns, rows, passage)
+    else:
+        generator.dfs(columns, rows, start, passage)
+    return columns, rows, passages
+
+
+def check_perfect(columns, rows, passages):
+    cells = columns * rows
+    assert len(passages) == cells - 1, (len(passages), cells)
+    parent = list(range(cells))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for a, b in passages:
+        assert abs(a - b) in (1, columns)
+        if abs(a - b) == 1:
+            assert a // columns == b // columns
+        ra, rb = find(a), find(b)
+        assert ra != rb, "loop"
+        parent[ra] = rb
+    root = find(0)
+    assert all(find(c) == root for c in range(cells))
+
+
+def show(algorithm):
+    generator = MazeGenerator(16, 16)
+    grid = bytearray(WIDTH * HEIGHT)
+    new_maze(random.Random(3), grid, [0], generator, algorithm)
+    for y in range(HEIGHT):
+        print("".join("#" if grid[y * WIDTH + x] else " " for x in range(WIDTH)))
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--show":
+        show(sys.argv[2])
+        return
+    generator = MazeGenerator(16, 16)
+    print("{:<8} {:>10} {:>12} {:>8}".format("maze", "ms/maze", "peak bytes", "calls"))
+    variants = [("old", None)] + [(name, name) for name in ("dfs", "wilson", "eller")]
+    for name, algorithm in variants:
+        rng = random.Random(1)
+        elapsed = 0
+        peak = 0
+        calls = [0]
+        for _ in range(RUNS):
+            grid = bytearray(WIDTH * HEIGHT)
+            tracemalloc.start()
+            start = time.perf_counter()
+            if algorithm is None:
+                old_maze(rng, grid, calls)
+            else:
+                new_maze(rng, grid, calls, generator, algorithm)
+            elapsed += time.perf_counter() - start
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        print("{:<8} {:>10.2f} {:>12} {:>8}".format(
+            name, elapsed * 1e3 / RUNS, peak, calls[0] // RUNS))
+    print()
+    for algorithm in ("dfs", "wilson", "eller"):
+        rng = random.Random(2)
+        for _ in range(RUNS):
+            passages = []
+            columns, rows, _ = new_maze(rng, bytearray(WIDTH * HEIGHT), [0], generator, algorithm, passages)
+            check_perfect(columns, rows, passages)
+    print("all mazes perfect: ok")
+
+    # Streaming: memory stays the same however many rows are made
+    columns = 64
+    rows = EllerRows(columns)
+    tracemalloc.start()
+    start = time.perf_counter()
+    opened = 0
+    for y in range(5000):
+        right, down = rows.next_row()
+        opened += sum(right) + sum(down)
+        if y == 100:
+            early = tracemalloc.get_traced_memory()[0]
+    right, down = rows.next_row(last=True)
+    opened += sum(right)
+    late = tracemalloc.get_traced_memory()[0]
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    assert opened == columns * 5001 - 1
+    print("eller stream: 5001 rows x {} columns in {:.0f} ms, {} passages, memory growth {} bytes".format(
+        columns, elapsed * 1e3, opened, late - early))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Host-side benchmark: legacy newXY() remapping vs. the PanelMap lookup table.
+#
+# Run with CPython from the repository root:
+#
+#   python hub75/host/bench_panel_map.py
+#
+# Absolute numbers differ from the RP2040, the ratio between both paths is
+# what matters. CPython recycles small tuples cheaply; on MicroPython every
+# tuple returned by newXY() is a heap allocation, so the gap is larger there.
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from panel_map import PanelMap, newXY, WIDTH, HEIGHT, xWIDTH, xHEIGHT, Y_BITS, Y_MASK
+
+REPEATS = 5
+
+
+class NullDisplay:
+    def set_pixel(self, x, y, r, g, b):
+        pass
+
+
+display = NullDisplay()
+
+
+# Copy of the per-script wrapper that every 128x128 demo used before
+def legacy_set_pixel_mapped(x, y, r, g, b):
+    x1, y1 = newXY(x, y)
+    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
+        display.set_pixel(x1, y1, r, g, b)
+
+
+# Best of REPEATS full-panel passes, in pixels per second
+def best_rate(frame):
+    best = 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        frame()
+        best = max(best, WIDTH * HEIGHT / (time.perf_counter() - start))
+    return best
+
+
+def write_frame(set_pixel):
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            set_pixel(x, y, 255, 255, 255)
+
+
+# Remapping alone, without the driver call
+def remap_legacy():
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            x1, y1 = newXY(x, y)
+
+
+def remap_table(table):
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            p = table[y * WIDTH + x]
+            x1, y1 = p >> Y_BITS, p & Y_MASK
+
+
+def main():
+    start = time.perf_counter()
+    panel = PanelMap(display)
+    build_ms = (time.perf_counter() - start) * 1000
+    print("table build:        {:10.1f} ms (once at startup)".format(build_ms))
+
+    legacy = best_rate(remap_legacy)
+    mapped = best_rate(lambda: remap_table(panel.table))
+    print("remap newXY():      {:10.0f} pixels/s".format(legacy))
+    print("remap table:        {:10.0f} pixels/s  ({:.2f}x)".format(mapped, mapped / legacy))
+
+    legacy = best_rate(lambda: write_frame(legacy_set_pixel_mapped))
+    mapped = best_rate(lambda: write_frame(panel.set_pixel_mapped))
+    print("set_pixel newXY():  {:10.0f} pixels/s".format(legacy))
+    print("set_pixel_mapped(): {:10.0f} pixels/s  ({:.2f}x)".format(mapped, mapped / legacy))
+
+
+if __name__ == "__main__":
+    main()
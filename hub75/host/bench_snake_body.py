@@ -0,0 +1,104 @@
+# Host-side benchmark: snake body as a list of tuples vs. SnakeBody.
+#
+#   python hub75/host/bench_snake_body.py
+#
+# One step = new head, drop the tail, self-collision test - what
+# update_snake_position() and check_self_collision() do every frame. The
+# snake crawls through the 128x128 board row by row, so it never hits
+# itself and the list version has to search the whole body. Steps per
+# second should fall with the length for the list and stay flat for
+# SnakeBody. A random walk with growing and shrinking first checks that both
+# agree on every collision and every occupied cell.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from snake_body import SnakeBody
+
+SIZE = 128
+LENGTHS = (10, 500, 5000, 15000)
+STEPS = 2000
+SEED = 11
+
+
+def cell(n):
+    y = n // SIZE % SIZE
+    x = n % SIZE
+    return (x if y % 2 == 0 else SIZE - 1 - x), y
+
+
+def check():
+    random.seed(SEED)
+    body = SnakeBody(SIZE, SIZE)
+    snake = [(64, 64)]
+    body.push(64, 64)
+    length = 3
+    x, y = 64, 64
+    for step in range(20000):
+        dx, dy = random.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+        x = (x + dx) % SIZE
+        y = (y + dy) % SIZE
+        snake.insert(0, (x, y))
+        body.push(x, y)
+        if random.randrange(20) == 0:
+            length += random.randint(1, 40)
+        if random.randrange(200) == 0:
+            length = max(length // 2, 2)
+        while len(snake) > length:
+            tail = snake.pop()
+            c = body.pop_tail()
+            assert (c % SIZE, c // SIZE) == tail
+        assert body.length == len(snake)
+        assert body.hits_self() == ((x, y) in snake[1:])
+        if step % 500 == 0:
+            occupied = set(snake)
+            for cy in range(SIZE):
+                for cx in range(SIZE):
+                    assert body.is_occupied(cx, cy) == ((cx, cy) in occupied)
+            assert list(body.positions()) == snake
+
+
+def list_rate(length):
+    snake = [cell(n) for n in range(length - 1, -1, -1)]
+    start = time.perf_counter()
+    for n in range(length, length + STEPS):
+        snake.insert(0, cell(n))
+        snake.pop()
+        if snake[0] in snake[1:]:
+            raise AssertionError("unexpected collision")
+    return STEPS / (time.perf_counter() - start)
+
+
+def body_rate(length):
+    body = SnakeBody(SIZE, SIZE)
+    for n in range(length):
+        body.push(*cell(n))
+    start = time.perf_counter()
+    for n in range(length, length + STEPS):
+        x, y = cell(n)
+        body.push(x, y)
+        body.pop_tail()
+        if body.hits_self():
+            raise AssertionError("unexpected collision")
+    return STEPS / (time.perf_counter() - start)
+
+
+def main():
+    check()
+    print("random walk: collisions and occupancy agree with the list version")
+    print()
+    print("{:>8} {:>14} {:>18}".format("length", "list steps/s", "SnakeBody steps/s"))
+    for length in LENGTHS:
+        old = list_rate(length)
+        new = body_rate(length)
+        print("{:>8} {:>14.0f} {:>18.0f} {:>8.1f}x".format(length, old, new, new / old))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Host-side benchmark: greedy autopilot vs. SnakePlanner in a headless
+# simulation of the 128x128 zero-player snake.
+#
+#   python hub75/host/bench_snake_planner.py
+#
+# Same rules as the script without the display: the snake wraps around the
+# edges, a red target adds two segments, running into itself ends the game.
+# Green targets are left out, they only shorten the snake. Both autopilots
+# play the same seeded games (same target sequence as long as both are
+# alive) up to MAX_STEPS steps. Reported per autopilot: steps survived,
+# targets eaten, final length and the average time spent choosing the
+# direction per step (for the planner including the greedy preference it
+# falls back on) and the number of BFS rebuilds. Only the planning time
+# varies between runs.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from snake_body import SnakeBody
+from snake_planner import SnakePlanner
+
+SIZE = 128
+SEEDS = (1, 2, 3, 4, 5)
+MAX_STEPS = 40000
+# BFS cells expanded per step instead of the script's 3 ms, so the games
+# do not depend on the speed of the host and repeat exactly
+BUDGET_CELLS = 4096
+
+OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
+
+# update_direction() of the script, reduced to the red target
+def greedy(head_x, head_y, direction, target_x, target_y):
+    new_direction = direction
+    if head_x == target_x:
+        if head_y < target_y and direction != 'UP':
+            new_direction = 'DOWN'
+        elif head_y > target_y and direction != 'DOWN':
+            new_direction = 'UP'
+    elif head_y == target_y:
+        if head_x < target_x and direction != 'LEFT':
+            new_direction = 'RIGHT'
+        elif head_x > target_x and direction != 'RIGHT':
+            new_direction = 'LEFT'
+    else:
+        if abs(head_x - target_x) < abs(head_y - target_y):
+            if head_x < target_x and direction != 'LEFT':
+                new_direction = 'RIGHT'
+            elif head_x > target_x and direction != 'RIGHT':
+                new_direction = 'LEFT'
+        else:
+            if head_y < target_y and direction != 'UP':
+                new_direction = 'DOWN'
+            elif head_y > target_y and direction != 'DOWN':
+                new_direction = 'UP'
+    if new_direction == OPPOSITE[direction]:
+        new_direction = direction
+    return new_direction
+
+
+def play(seed, use_planner):
+    rng = random.Random(seed)
+    snake = SnakeBody(SIZE, SIZE)
+    snake.push(SIZE // 2, SIZE // 2)
+    length = 3
+    direction = 'UP'
+    planner = SnakePlanner(snake, budget_cells=BUDGET_CELLS) if use_planner else None
+    target = (rng.randint(1, SIZE - 2), rng.randint(1, SIZE - 2))
+    eaten = 0
+    plan_time = 0.0
+    step = 0
+    while step < MAX_STEPS:
+        step += 1
+        x, y = snake.head_x, snake.head_y
+        start = time.perf_counter()
+        if planner is not None:
+            preferred = greedy(x, y, direction, *target)
+            planned = planner.direction(target[0], target[1], preferred)
+            direction = planned if planned is not None else preferred
+        elif (step % 6 == 0 or x == target[0] or y == target[1]
+              or x < 4 or x > SIZE - 4 or y < 4 or y > SIZE - 4):
+            direction = greedy(x, y, direction, *target)
+        plan_time += time.perf_counter() - start
+
+        if direction == 'UP':
+            y -= 1
+        elif direction == 'DOWN':
+            y += 1
+        elif direction == 'LEFT':
+            x -= 1
+        else:
+            x += 1
+        snake.push(x % SIZE, y % SIZE)
+        if snake.length > length:
+            snake.pop_tail()
+        if snake.hits_self():
+            break
+        if (snake.head_x, snake.head_y) == target:
+            length += 2
+            eaten += 1
+            target = (rng.randint(1, SIZE - 2), rng.randint(1, SIZE - 2))
+    rebuilds = planner.rebuilds if planner is not None else 0
+    return step, eaten, snake.length, plan_time * 1e6 / step, rebuilds
+
+
+def main():
+    print("{:>5} {:>9} {:>8} {:>8} {:>8} {:>10} {:>9}".format(
+        "seed", "autopilot", "steps", "eaten", "length", "plan us", "rebuilds"))
+    totals = {False: [0, 0, 0.0], True: [0, 0, 0.0]}
+    for seed in SEEDS:
+        for use_planner in (False, True):
+            steps, eaten, length, plan_us, rebuilds = play(seed, use_planner)
+            total = totals[use_planner]
+            total[0] += steps
+            total[1] += eaten
+            total[2] += plan_us * steps
+            print("{:>5} {:>9} {:>8} {:>8} {:>8} {:>10.1f} {:>9}".format(
+                seed, "bfs" if use_planner else "greedy", steps, eaten, length, plan_us, rebuilds))
+    print()
+    for use_planner in (False, True):
+        steps, eaten, plan = totals[use_planner]
+        print("{:>8}: {:.0f} steps and {:.1f} targets per game, {:.1f} us planning per step".format(
+            "bfs" if use_planner else "greedy", steps / len(SEEDS), eaten / len(SEEDS), plan / steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Host-side benchmark: cost of drawing the 128x128 snake per step, full
+# repaint (old draw_snake()) vs. SnakeRenderer, at different lengths.
+#
+#   python hub75/host/bench_snake_render.py
+#
+# The snake crawls through the board row by row (boustrophedon), so even
+# 5000 segments never overlap. Reported: microseconds and driver calls per
+# step. The incremental picture is checked against redraw() of the final
+# body on a clean display - i.e. the gradient is intact after many steps.
+# The remaining growth of the incremental time with the length comes from
+# snake.insert(0, ...) on the body list, not from drawing.
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+sys.path.insert(2, os.path.dirname(os.path.dirname(HERE)))
+
+import hub75
+from panel_map import PanelMap, xWIDTH, xHEIGHT
+from snake_render import SnakeRenderer
+
+LENGTHS = (10, 500, 5000)
+STEPS = 200
+SIZE = 128
+
+
+def cell(n):
+    y = n // SIZE
+    x = n % SIZE
+    return (x if y % 2 == 0 else SIZE - 1 - x), y
+
+
+# The float hsb_to_rgb() and draw_snake() as they were in the script
+def float_hsb_to_rgb(hue, saturation, brightness):
+    hue_normalized = (hue % 360) / 60
+    hue_index = int(hue_normalized)
+    hue_fraction = hue_normalized - hue_index
+    value1 = brightness * (1 - saturation)
+    value2 = brightness * (1 - saturation * hue_fraction)
+    value3 = brightness * (1 - saturation * (1 - hue_fraction))
+    red, green, blue = [
+        (brightness, value3, value1),
+        (value2, brightness, value1),
+        (value1, brightness, value3),
+        (value1, value2, brightness),
+        (value3, value1, brightness),
+        (brightness, value1, value2)
+    ][hue_index]
+    return int(red * 255), int(green * 255), int(blue * 255)
+
+
+def full_repaint(set_pixel_mapped, length):
+    snake = [cell(n) for n in range(length - 1, -1, -1)]
+
+    def step(n):
+        snake.insert(0, cell(n))
+        tail = snake.pop()
+        set_pixel_mapped(tail[0], tail[1], 0, 0, 0)
+        hue = 0
+        for x, y in snake[:length]:
+            hue = (hue + 5) % 360
+            r, g, b = float_hsb_to_rgb(hue, 1, 1)
+            set_pixel_mapped(x, y, r, g, b)
+    return snake, step
+
+
+def incremental(set_pixel_mapped, length, renderer):
+    snake = [cell(n) for n in range(length - 1, -1, -1)]
+    renderer.redraw(snake)
+
+    def step(n):
+        snake.insert(0, cell(n))
+        tail = snake.pop()
+        renderer.erase(tail[0], tail[1])
+        renderer.add_head(*snake[0])
+    return snake, step
+
+
+def measure(length, make):
+    display = hub75.Hub75(xWIDTH, xHEIGHT)
+    panel = PanelMap(display)
+    renderer = SnakeRenderer(panel.set_pixel_mapped)
+    if make is incremental:
+        snake, step = make(panel.set_pixel_mapped, length, renderer)
+    else:
+        snake, step = make(panel.set_pixel_mapped, length)
+    display.reset_counters()
+    start = time.perf_counter()
+    for n in range(length, length + STEPS):
+        step(n)
+    elapsed = time.perf_counter() - start
+    return display, panel, renderer, snake, elapsed * 1e6 / STEPS, display.set_pixel_calls / STEPS
+
+
+def main():
+    print("{:>8} {:>14} {:>12} {:>14} {:>12} {:>9}".format(
+        "length", "full us/step", "full calls", "incr us/step", "incr calls", "speedup"))
+    for length in LENGTHS:
+        _, _, _, _, full_us, full_calls = measure(length, full_repaint)
+        display, _, renderer, snake, incr_us, incr_calls = measure(length, incremental)
+        expected = hub75.Hub75(xWIDTH, xHEIGHT)
+        check = SnakeRenderer(PanelMap(expected).set_pixel_mapped)
+        check.head = renderer.head
+        check.redraw(snake)
+        assert display.pixels == expected.pixels, "gradient broken at length {}".format(length)
+        print("{:>8} {:>14.1f} {:>12.0f} {:>14.2f} {:>12.0f} {:>8.0f}x".format(
+            length, full_us, full_calls, incr_us, incr_calls, full_us / incr_us))
+
+
+if __name__ == "__main__":
+    main()
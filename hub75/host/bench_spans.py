@@ -0,0 +1,151 @@
+# Host-side benchmark: rect() and draw_text() of the 128x128 snake demo,
+# per-pixel set_pixel_mapped() vs. the span primitives of PanelMap.
+#
+#   python hub75/host/bench_spans.py
+#
+# First checks that fill_hspan(), fill_vspan(), fill_rect() and blit() set
+# exactly the same physical pixels as per-pixel writes, on the 128x128
+# square and two serpentine layouts, including clipping at the canvas
+# border. Then times the rectangles and text of display_score_and_time()
+# and a full-screen clear. Both variants make the same number of driver
+# calls; the spans save the table lookup, bounds check and method call per
+# pixel.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+import hub75
+from panel_map import PANEL_128X128, PanelMap, serpentine
+
+REPEAT = 200
+SEED = 3
+
+char_dict = {
+    '0': ["01110", "10001", "10001", "10001", "01110"],
+    '1': ["00100", "01100", "00100", "00100", "01110"],
+    '2': ["11110", "00001", "01110", "10000", "11111"],
+    '3': ["11110", "00001", "00110", "00001", "11110"],
+    '4': ["10000", "10010", "10010", "11111", "00010"],
+    '5': ["11111", "10000", "11110", "00001", "11110"],
+    '6': ["01110", "10000", "11110", "10001", "01110"],
+    '7': ["11111", "00010", "00100", "01000", "10000"],
+    '8': ["01110", "10001", "01110", "10001", "01110"],
+    '9': ["01110", "10001", "01111", "00001", "01110"],
+    ' ': ["00000", "00000", "00000", "00000", "00000"],
+    '.': ["00000", "00000", "00000", "00000", "00001"],
+    ':': ["00000", "00100", "00000", "00100", "00000"]
+}
+glyphs = {char: tuple(int(row, 2) for row in rows) for char, rows in char_dict.items()}
+
+
+# The functions as they are in the snake demo
+def rect(set_pixel_mapped, x1, y1, x2, y2, r, g, b):
+    for x in range(min(x1, x2), max(x1, x2) + 1):
+        for y in range(min(y1, y2), max(y1, y2) + 1):
+            set_pixel_mapped(x, y, r, g, b)
+
+
+def draw_text(set_pixel_mapped, x, y, text, r, g, b):
+    for char in text:
+        if char in char_dict:
+            matrix = char_dict[char]
+            for row in range(5):
+                for col in range(5):
+                    if matrix[row][col] == '1':
+                        set_pixel_mapped(x + col, y + row, r, g, b)
+        x += 6
+
+
+def blit_text(panel, x, y, text, r, g, b):
+    for char in text:
+        panel.blit(x, y, glyphs[char], 5, r, g, b)
+        x += 6
+
+
+def new_panel(topology):
+    display = hub75.Hub75(topology.phys_width, topology.phys_height)
+    return display, PanelMap(display, topology)
+
+
+def check(topology):
+    random.seed(SEED)
+    width = topology.width
+    height = topology.height
+    for _ in range(300):
+        x = random.randint(-8, width)
+        y = random.randint(-8, height)
+        w = random.randint(0, 70)
+        h = random.randint(0, 70)
+        color = (random.randint(1, 255), random.randint(1, 255), random.randint(1, 255))
+        bits = [random.getrandbits(w) for _ in range(h)] if w else []
+        cases = (
+            ("fill_hspan", lambda p: p.fill_hspan(x, y, w, *color),
+             lambda s: [s(x + i, y, *color) for i in range(w)]),
+            ("fill_vspan", lambda p: p.fill_vspan(x, y, h, *color),
+             lambda s: [s(x, y + j, *color) for j in range(h)]),
+            ("fill_rect", lambda p: p.fill_rect(x, y, w, h, *color),
+             lambda s: [s(x + i, y + j, *color) for j in range(h) for i in range(w)]),
+            ("blit", lambda p: p.blit(x, y, bits, w, *color),
+             lambda s: [s(x + i, y + j, *color) for j in range(h) for i in range(w)
+                        if bits[j] >> (w - 1 - i) & 1]),
+        )
+        for name, spans, pixels in cases:
+            display, panel = new_panel(topology)
+            spans(panel)
+            expected, reference = new_panel(topology)
+            pixels(reference.set_pixel_mapped)
+            assert display.pixels == expected.pixels, "{} differs at ({}, {})".format(name, x, y)
+            assert display.set_pixel_calls == expected.set_pixel_calls, name
+
+
+def timed(function):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - start) * 1e6 / REPEAT
+
+
+def main():
+    for topology in (PANEL_128X128, serpentine(4, 2), serpentine(6, 3, rotation=90)):
+        check(topology)
+    print("spans match per-pixel writes on 128x128, 256x64 and 192x192")
+    print()
+
+    display, panel = new_panel(PANEL_128X128)
+    set_pixel_mapped = panel.set_pixel_mapped
+    workloads = (
+        ("score background 25x6",
+         lambda: rect(set_pixel_mapped, 1, 1, 25, 6, 0, 0, 0),
+         lambda: panel.fill_rect(1, 1, 25, 6, 0, 0, 0)),
+        ("time background 31x6",
+         lambda: rect(set_pixel_mapped, 96, 1, 126, 6, 0, 0, 0),
+         lambda: panel.fill_rect(96, 1, 31, 6, 0, 0, 0)),
+        ("clear 128x128",
+         lambda: rect(set_pixel_mapped, 0, 0, 127, 127, 0, 0, 0),
+         lambda: panel.fill_rect(0, 0, 128, 128, 0, 0, 0)),
+        ('text "1234"',
+         lambda: draw_text(set_pixel_mapped, 1, 1, "1234", 255, 255, 255),
+         lambda: blit_text(panel, 1, 1, "1234", 255, 255, 255)),
+        ('text "12:34"',
+         lambda: draw_text(set_pixel_mapped, 96, 1, "12:34", 255, 255, 255),
+         lambda: blit_text(panel, 96, 1, "12:34", 255, 255, 255)),
+    )
+    print("{:24} {:>8} {:>14} {:>14} {:>8}".format(
+        "", "pixels", "per-pixel us", "spans us", "speedup"))
+    for name, per_pixel, spans in workloads:
+        display.reset_counters()
+        per_pixel()
+        pixels = display.set_pixel_calls
+        old = timed(per_pixel)
+        new = timed(spans)
+        print("{:24} {:>8} {:>14.1f} {:>14.1f} {:>7.1f}x".format(name, pixels, old, new, old / new))
+
+
+if __name__ == "__main__":
+    main()
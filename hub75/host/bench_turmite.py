@@ -0,0 +1,158 @@
+# Host-side benchmark: Turmites, the compiled-rule ants.
+#
+#   python hub75/host/bench_turmite.py
+#
+# First compile_rule() and the nibble-packed grid are checked: every rule
+# below runs next to a plain reference turmite (one byte per cell, the rule
+# looked up as tuples) and grid, positions and states must match after
+# 2000 steps; the dirty list must leave the screen equal to the palette
+# colours of the grid.
+#
+# Then ant steps per second for simulation plus drawing into a counting
+# stub, 8 and 256 ants on the 128x128 grid, for Langton's ant, some
+# many-colour rules and the two-state Fibonacci spiral table, next to
+# AntColony without random turns. The table turmite costs the same as a
+# plain rule: a step does not branch on the rule.
+
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from ant_colony import AntColony
+from turmite import TURNS, Turmites, compile_rule
+
+SIZE = 128
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+FIBONACCI = (((1, "L", 1), (1, "L", 1)),
+             ((1, "R", 1), (0, "N", 0)))
+RULES = ("RL", "RLR", "LLRR", "RRLLLRLLLRRR", FIBONACCI)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def set_pixel(self, x, y, r, g, b):
+        self.calls += 1
+
+
+def reference_rule(rule):
+    if isinstance(rule, str):
+        colors = len(rule)
+        return [[((c + 1) % colors, TURNS[rule[c]], 0) for c in range(colors)]]
+    return [[(w, TURNS[t] if isinstance(t, str) else t, s) for w, t, s in row] for row in rule]
+
+
+def rule_name(rule):
+    return rule if isinstance(rule, str) else "fibonacci"
+
+
+def check_compile():
+    table, colors, states = compile_rule("LLRR")
+    assert (colors, states) == (4, 1)
+    assert [table[c] for c in range(4)] == [1 | 3 << 4, 2 | 3 << 4, 3 | 1 << 4, 0 | 1 << 4]
+    table, colors, states = compile_rule(FIBONACCI)
+    assert (colors, states) == (2, 2)
+    assert table[16 + 1] == 0 | 0 << 4 | 0 << 6
+    assert table[16] == 1 | 1 << 4 | 1 << 6
+    for bad in ("R", "R" * 17, ((0, "L", 0), (2, "R", 0))):
+        try:
+            compile_rule(bad if isinstance(bad, str) else (bad,))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(bad)
+
+
+def check_grid():
+    turmites = Turmites(SIZE, SIZE, 1, "RRLLLRLLLRRR")
+    rng = random.Random(4)
+    cells = {}
+    for _ in range(3000):
+        x = rng.randint(0, SIZE - 1)
+        y = rng.randint(0, SIZE - 1)
+        color = rng.randint(0, 15)
+        turmites.set_cell(x, y, color)
+        cells[(x, y)] = color
+    for (x, y), color in cells.items():
+        assert turmites.get_cell(x, y) == color
+
+
+def check_rule(rule):
+    random.seed(6)
+    turmites = Turmites(SIZE, SIZE, 16, rule)
+    table = reference_rule(rule)
+    grid = bytearray(SIZE * SIZE)
+    ants = [[turmites.xs[i], turmites.ys[i], turmites.dirs[i], 0] for i in range(16)]
+    screen = {}
+    for _ in range(2000):
+        turmites.step()
+        for k in range(turmites.dirty):
+            screen[turmites.dirty_cells[k]] = turmites.dirty_colors[k]
+        for ant in ants:
+            x, y, d, state = ant
+            write, turn, state = table[state][grid[y * SIZE + x]]
+            grid[y * SIZE + x] = write
+            d = (d + turn) % 4
+            dx, dy = DIRECTIONS[d]
+            ant[:] = [(x + dx) % SIZE, (y + dy) % SIZE, d, state]
+    for y in range(SIZE):
+        for x in range(SIZE):
+            assert turmites.get_cell(x, y) == grid[y * SIZE + x]
+    assert [[turmites.xs[i], turmites.ys[i], turmites.dirs[i], turmites.ant_states[i]]
+            for i in range(16)] == ants
+    heads = set(y * SIZE + x for x, y, d, state in ants)
+    for cell, color in screen.items():
+        if cell not in heads:
+            assert color == turmites.palette[grid[cell]]
+
+
+def rate(frame, count, frames):
+    counter = Counter()
+    frame(counter.set_pixel)
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame(counter.set_pixel)
+    return count * frames / (time.perf_counter() - start)
+
+
+def main():
+    check_compile()
+    check_grid()
+    for rule in RULES:
+        check_rule(rule)
+    print("compile_rule, nibble grid, {} rules == reference turmite: ok".format(len(RULES)))
+    print()
+    grid = bytearray(SIZE * SIZE)
+    print("grid memory: AntColony {} bytes, Turmites {} bytes".format(
+        len(grid), len(Turmites(SIZE, SIZE, 1, "RL").grid)))
+    print()
+    print("{:>6} {:<14} {:>7} {:>14}".format("ants", "engine", "colors", "ant steps/s"))
+    for count, frames in ((8, 2000), (256, 200)):
+        random.seed(1)
+        colony = AntColony(bytearray(SIZE * SIZE), SIZE, SIZE, count, random_turns=False)
+
+        def frame(set_pixel):
+            colony.step()
+            colony.draw(set_pixel)
+
+        print("{:>6} {:<14} {:>7} {:>14.0f}".format(count, "AntColony", 2, rate(frame, count, frames)))
+        for rule in RULES:
+            random.seed(1)
+            turmites = Turmites(SIZE, SIZE, count, rule)
+
+            def frame(set_pixel):
+                turmites.step()
+                turmites.draw(set_pixel)
+
+            print("{:>6} {:<14} {:>7} {:>14.0f}".format(
+                count, rule_name(rule), turmites.colors, rate(frame, count, frames)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Host-side checks for the panel topology compiler.
+#
+#   python hub75/host/check_panel_map.py
+#
+# Exits with an AssertionError on the first mismatch.
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.dirname(HERE))
+
+from panel_map import PANEL_128X128, Topology, build_table, serpentine
+
+
+def unpack(topology, table):
+    return [(p >> topology.y_bits, p & topology.y_mask) for p in table]
+
+
+# Every logical pixel lands on its own physical pixel inside the chain
+def check_bijective(topology):
+    table = topology.compile()
+    assert len(table) == topology.width * topology.height
+    physical = unpack(topology, table)
+    assert len(set(physical)) == len(physical)
+    for x1, y1 in physical:
+        assert 0 <= x1 < topology.phys_width
+        assert 0 <= y1 < topology.phys_height
+
+
+def check_128x128_matches_newXY():
+    assert list(PANEL_128X128.compile()) == list(build_table())
+    check_bijective(PANEL_128X128)
+
+
+def check_256x64():
+    topology = serpentine(4, 2)
+    assert (topology.width, topology.height) == (256, 64)
+    assert (topology.phys_width, topology.phys_height) == (512, 32)
+    check_bijective(topology)
+    physical = unpack(topology, topology.compile())
+    # First module upright, second row upside down and running backwards
+    assert physical[0] == (0, 0)
+    assert physical[255] == (255, 0)
+    assert physical[32 * 256] == (511, 31)
+    assert physical[63 * 256 + 255] == (256, 0)
+
+
+def check_192x192():
+    topology = serpentine(6, 3, rotation=90)
+    assert (topology.width, topology.height) == (192, 192)
+    assert (topology.phys_width, topology.phys_height) == (1152, 32)
+    check_bijective(topology)
+
+
+def check_flip():
+    plain = Topology(64, 32, [(0, 0, 0, False)]).compile()
+    mirrored = Topology(64, 32, [(0, 0, 0, True)]).compile()
+    for y in range(32):
+        row = y * 64
+        assert list(mirrored[row:row + 64]) == list(plain[row:row + 64])[::-1]
+
+
+def check_rejects_bad_layouts():
+    for modules in ([(0, 0, 45, False)], [(32, 0, 0, False)], []):
+        try:
+            Topology(64, 32, modules).compile()
+        except ValueError:
+            continue
+        raise AssertionError("accepted {}".format(modules))
+
+
+def main():
+    for check in (check_128x128_matches_newXY, check_256x64, check_192x192,
+                  check_flip, check_rejects_bad_layouts):
+        check()
+        print("ok", check.__name__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Host-side checks for the exit status of run_demo.py.
+#
+#   python hub75/host/check_run_demo.py
+#
+# Runs one demo for a few frames to learn its hash, then checks that the
+# right hash passes and a wrong one fails, with --expect and with
+# --expect-file (also for a demo missing from the file), and that --expect
+# is refused for several demos instead of being ignored. Exits with an
+# AssertionError on the first mismatch.
+
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUN_DEMO = os.path.join(HERE, "run_demo.py")
+DEMO = os.path.join(os.path.dirname(HERE), "cube_128.py")
+OTHER = os.path.join(os.path.dirname(HERE), "tictactoe_on_hub75_128x128.py")
+WRONG = "0" * 16
+
+
+def run_demo(*args):
+    process = subprocess.run([sys.executable, RUN_DEMO, "--frames", "3"] + list(args),
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    return process.returncode, process.stdout
+
+
+def expect_file(lines):
+    f = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+    f.write("# demo=hash\n\n" + "".join(line + "\n" for line in lines))
+    f.close()
+    return f.name
+
+
+def main():
+    status, output = run_demo(DEMO)
+    assert status == 0, output
+    digest = output.splitlines()[-1].split()[-1]
+    name = os.path.basename(DEMO)
+
+    assert run_demo(DEMO, "--expect", digest)[0] == 0
+    assert run_demo(DEMO, "--expect", WRONG)[0] == 1
+    # Several demos: --expect is an error, not silently ignored
+    assert run_demo(DEMO, OTHER, "--expect", digest)[0] == 2
+    assert run_demo("--all", "--expect", WRONG)[0] == 2
+
+    paths = []
+    try:
+        paths.append(expect_file([name + "=" + digest]))
+        assert run_demo(DEMO, "--expect-file", paths[-1])[0] == 0
+        paths.append(expect_file([name + "=" + WRONG]))
+        status, output = run_demo(DEMO, "--expect-file", paths[-1])
+        assert status == 1 and "differs" in output
+        # A demo without a line fails too
+        paths.append(expect_file([name + "=" + digest]))
+        status, output = run_demo(DEMO, OTHER, "--expect-file", paths[-1])
+        assert status == 1 and "no expected hash" in output
+    finally:
+        for path in paths:
+            os.remove(path)
+    print("run_demo.py exit status with --expect / --expect-file: ok")
+
+
+if __name__ == "__main__":
+    main()
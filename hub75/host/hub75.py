@@ -0,0 +1,43 @@
+# Host-side stand-in for the Pimoroni "hub75" driver module.
+#
+# Hub75 keeps the physical pixels in a bytearray and counts driver calls, so
+# host benchmarks can measure how many set_pixel() calls a frame costs.
+
+
+class Hub75:
+    def __init__(self, width, height, *args, **kwargs):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+        self.set_pixel_calls = 0
+        self.clear_calls = 0
+        self.running = False
+
+    def set_pixel(self, x, y, r, g, b):
+        self.set_pixel_calls += 1
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = (y * self.width + x) * 3
+            self.pixels[i] = r
+            self.pixels[i + 1] = g
+            self.pixels[i + 2] = b
+
+    def get_pixel(self, x, y):
+        i = (y * self.width + x) * 3
+        return self.pixels[i], self.pixels[i + 1], self.pixels[i + 2]
+
+    def clear(self):
+        self.clear_calls += 1
+        self.pixels[:] = bytes(len(self.pixels))
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def flip(self):
+        pass
+
+    def reset_counters(self):
+        self.set_pixel_calls = 0
+        self.clear_calls = 0
@@ -0,0 +1,73 @@
+# Host-side stand-in for Pimoroni's "interstate75" module (PicoGraphics on
+# an Interstate 75 board), enough for balls_on_hub75.py.
+#
+# The graphics object draws into a bytearray like host/hub75.py and counts
+# pixel writes in set_pixel_calls, so host/run_demo.py can treat both the
+# same way.
+
+DISPLAY_INTERSTATE75_32X32 = (32, 32)
+DISPLAY_INTERSTATE75_64X32 = (64, 32)
+DISPLAY_INTERSTATE75_64X64 = (64, 64)
+DISPLAY_INTERSTATE75_128X32 = (128, 32)
+DISPLAY_INTERSTATE75_128X64 = (128, 64)
+
+
+class PicoGraphics:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+        self.pen = 0
+        self.set_pixel_calls = 0
+        self.clear_calls = 0
+
+    def create_pen(self, r, g, b):
+        return (r << 16) | (g << 8) | b
+
+    def set_pen(self, pen):
+        self.pen = pen
+
+    def get_bounds(self):
+        return self.width, self.height
+
+    def pixel(self, x, y):
+        self.set_pixel_calls += 1
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = (y * self.width + x) * 3
+            pen = self.pen
+            self.pixels[i] = pen >> 16
+            self.pixels[i + 1] = (pen >> 8) & 0xFF
+            self.pixels[i + 2] = pen & 0xFF
+
+    def pixel_span(self, x, y, length):
+        for i in range(length):
+            self.pixel(x + i, y)
+
+    def rectangle(self, x, y, width, height):
+        for row in range(y, y + height):
+            self.pixel_span(x, row, width)
+
+    def circle(self, x, y, r):
+        for dy in range(-r, r + 1):
+            for dx in range(-r, r + 1):
+                if dx * dx + dy * dy <= r * r:
+                    self.pixel(x + dx, y + dy)
+
+    def clear(self):
+        self.clear_calls += 1
+        pen = self.pen
+        self.pixels[:] = bytes((pen >> 16, (pen >> 8) & 0xFF, pen & 0xFF)) * (self.width * self.height)
+
+    def reset_counters(self):
+        self.set_pixel_calls = 0
+        self.clear_calls = 0
+
+
+class Interstate75:
+    def __init__(self, display=DISPLAY_INTERSTATE75_64X64, *args, **kwargs):
+        self.width, self.height = display
+        self.display = PicoGraphics(self.width, self.height)
+        self.updates = 0
+
+    def update(self, graphics=None):
+        self.updates += 1
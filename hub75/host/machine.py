@@ -0,0 +1,80 @@
+# Host-side stand-in for the MicroPython "machine" module.
+#
+# Covers what the hub75 demos use: Pin, RTC and freq(). RTC.datetime() is
+# derived from time.time(), so under host/run_demo.py (which swaps in a
+# virtual clock) the clock shown by the snake demos is deterministic.
+
+import time
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 0 if value is None else value
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def toggle(self):
+        self._value ^= 1
+
+    def irq(self, handler=None, trigger=0):
+        return None
+
+
+class RTC:
+    def __init__(self):
+        self.offset = 0
+
+    # (year, month, day, weekday, hours, minutes, seconds, subseconds);
+    # weekday 0 is Monday, as on the device
+    def datetime(self, value=None):
+        now = time.time()
+        if value is not None:
+            year, month, day, _, hours, minutes, seconds, _ = value
+            wanted = (year, month, day, hours, minutes, seconds, 0, 0, 0)
+            self.offset = int(time.mktime(wanted) - time.mktime(time.gmtime(now)))
+            return None
+        t = time.gmtime(now + self.offset)
+        return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_wday,
+                t.tm_hour, t.tm_min, t.tm_sec, 0)
+
+
+_frequency = 125000000
+
+
+def freq(hz=None):
+    global _frequency
+    if hz is None:
+        return _frequency
+    _frequency = hz
+
+
+def unique_id():
+    return b"host"
+
+
+def idle():
+    pass
+
+
+def reset():
+    raise SystemExit("machine.reset()")
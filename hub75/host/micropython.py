@@ -0,0 +1,15 @@
+# Host-side stand-in for the MicroPython "micropython" module.
+# Lets the shared hub75 modules be imported by CPython for benchmarks:
+# the code emitter decorators become no-ops and const() returns its value.
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def const(value):
+    return value
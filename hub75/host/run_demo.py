@@ -0,0 +1,492 @@
+# Headless, deterministic runner for the hub75 demos.
+#
+#   python hub75/host/run_demo.py hub75/snake_on_hub75_zeroplayer_128x128.py --frames 300
+#   python hub75/host/run_demo.py --all --frames 50
+#   python hub75/host/run_demo.py hub75/cube_128.py --frames 20 --dump /tmp/cube --format png
+#
+# The demos import hub75, machine and micropython at the top and never
+# return from their main loop. This runner executes a demo unchanged with
+# the stand-ins from this directory (hub75.py, machine.py, micropython.py,
+# interstate75.py) and two more swapped in while it runs:
+#
+# - time: a virtual clock. sleep()/sleep_ms() advance it instead of
+#   waiting, every ticks_*() read advances it by 1 us so busy-wait loops
+#   end, and time()/RTC start at 2024-01-01 00:00 UTC. With --wall-ticks
+#   ticks_*() follow the real time instead (plus the time slept), so
+#   profiler.py and other ticks-based code measure real durations - at
+#   the price of determinism where the demo acts on them.
+# - gc: mem_free()/mem_alloc() from tracemalloc (with --alloc) against a
+#   192 KB heap, like the RP2040 port.
+#
+# A frame is one pass of the demo's main loop: the outermost while loops of
+# the function called under `if __name__ == "__main__":`, or else of the
+# module itself. The source is parsed and a call to the runner is inserted
+# at the top of those loops (--loop LINE picks other loops, e.g. an inner
+# one or the fade-out for-loop of the fire demo). The runner stops the demo
+# after --frames frames; demos that end earlier just report fewer frames.
+#
+# With the RNG seeded (--seed) two runs give identical frames. Per frame the
+# runner records wall time, virtual time slept, set_pixel() calls and, with
+# --alloc, tracemalloc's peak of bytes allocated. Frames are hashed (SHA-1
+# over the picture of every frame) and can be written as PPM or PNG; a
+# PanelMap in the demo's globals is used to show the logical picture
+# instead of the physical module chain. --expect HASH makes the exit status
+# fail when the frames of a single demo differ. For several demos or --all,
+# --expect-file FILE takes one `demo.py=HASH` line per demo (blank lines and
+# # comments are skipped) and fails on every demo whose hash differs or
+# that has no line, e.g. as a regression check in CI:
+#
+#   python hub75/host/run_demo.py --all --frames 50 > /dev/null
+#   python hub75/host/run_demo.py --all --frames 50 --expect-file hashes.txt
+
+import argparse
+import ast
+import builtins
+import contextlib
+import gc as real_gc
+import glob
+import hashlib
+import io
+import os
+import random
+import struct
+import sys
+import time as real_time
+import tracemalloc
+import types
+import zlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HUB75_DIR = os.path.dirname(HERE)
+REPO_DIR = os.path.dirname(HUB75_DIR)
+sys.path.insert(0, HERE)
+sys.path.insert(1, HUB75_DIR)
+sys.path.insert(2, REPO_DIR)
+
+EPOCH = 1704067200          # 2024-01-01 00:00:00 UTC
+HEAP = 192 * 1024
+TICKS_PERIOD = 1 << 30      # ticks_*() wrap like on MicroPython
+TICKS_HALF = TICKS_PERIOD // 2
+FRAME_HOOK = "_run_demo_frame"
+
+
+class StopDemo(BaseException):
+    # BaseException, so `except Exception` in a demo does not swallow it
+    pass
+
+
+class VirtualClock:
+    def __init__(self, wall=False):
+        self.us = 0
+        self.slept_us = 0
+        self.wall = wall
+        self.origin = real_time.perf_counter()
+
+    def sleep_us(self, us):
+        if us > 0:
+            self.us += us
+            self.slept_us += us
+
+    def read_us(self):
+        if self.wall:
+            self.us = int((real_time.perf_counter() - self.origin) * 1000000) + self.slept_us
+        else:
+            self.us += 1
+        return self.us
+
+
+def make_time_module(clock):
+    module = types.ModuleType("time")
+    for name in dir(real_time):
+        if not name.startswith("_"):
+            setattr(module, name, getattr(real_time, name))
+
+    def ticks_add(ticks, delta):
+        return (ticks + delta) % TICKS_PERIOD
+
+    def ticks_diff(end, start):
+        return ((end - start + TICKS_HALF) % TICKS_PERIOD) - TICKS_HALF
+
+    def now():
+        return EPOCH + clock.us / 1000000
+
+    module.sleep = lambda seconds: clock.sleep_us(int(seconds * 1000000))
+    module.sleep_ms = lambda ms: clock.sleep_us(int(ms) * 1000)
+    module.sleep_us = lambda us: clock.sleep_us(int(us))
+    module.ticks_us = lambda: clock.read_us() % TICKS_PERIOD
+    module.ticks_ms = lambda: clock.read_us() // 1000 % TICKS_PERIOD
+    module.ticks_cpu = module.ticks_us
+    module.ticks_add = ticks_add
+    module.ticks_diff = ticks_diff
+    module.time = now
+    module.time_ns = lambda: int(now() * 1000000000)
+    module.monotonic = lambda: clock.us / 1000000
+    module.localtime = lambda secs=None: real_time.gmtime(now() if secs is None else secs)
+    module.gmtime = module.localtime
+    return module
+
+
+def make_gc_module():
+    module = types.ModuleType("gc")
+
+    def mem_alloc():
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    module.collect = real_gc.collect
+    module.enable = lambda: None
+    module.disable = lambda: None
+    module.isenabled = lambda: True
+    module.threshold = lambda amount=None: -1
+    module.mem_alloc = mem_alloc
+    module.mem_free = lambda: max(0, HEAP - mem_alloc())
+    return module
+
+
+# Outermost loops of a statement list; nested functions/classes are skipped
+def outer_loops(statements, kinds=(ast.While,)):
+    found = []
+    for node in statements:
+        if isinstance(node, kinds):
+            found.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        else:
+            for field in ("body", "orelse", "finalbody", "handlers"):
+                children = getattr(node, field, None)
+                if children:
+                    found.extend(outer_loops(children, kinds))
+    return found
+
+
+def is_main_guard(node):
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == "__name__")
+
+
+def called_names(statements):
+    names = []
+    for node in statements:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Call) and isinstance(child.func, ast.Name):
+                names.append(child.func.id)
+    return names
+
+
+def find_frame_loops(tree, lines=None):
+    if lines:
+        return [node for node in ast.walk(tree)
+                if isinstance(node, (ast.While, ast.For)) and node.lineno in lines]
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    for node in tree.body:
+        if is_main_guard(node):
+            loops = []
+            for name in called_names(node.body):
+                if name in functions:
+                    loops.extend(outer_loops(functions[name].body))
+            if loops:
+                return loops
+    return outer_loops([node for node in tree.body if not is_main_guard(node)])
+
+
+def instrument(source, path, lines=None):
+    tree = ast.parse(source, path)
+    loops = find_frame_loops(tree, lines)
+    if not loops:
+        raise ValueError("{}: no main loop found, pick one with --loop LINE".format(path))
+    for loop in loops:
+        call = ast.Expr(ast.Call(ast.Name(FRAME_HOOK, ast.Load()), [], []))
+        ast.copy_location(call, loop.body[0])
+        ast.copy_location(call.value, loop.body[0])
+        ast.copy_location(call.value.func, loop.body[0])
+        loop.body.insert(0, call)
+    return compile(tree, path, "exec"), [loop.lineno for loop in loops]
+
+
+# Picture shown by the demo: logical through a PanelMap if there is one
+# (also one held by a framebuffer or bound to a set_pixel_mapped), otherwise
+# the physical buffer of the first display found in its globals
+def is_panel(value):
+    return hasattr(value, "table") and hasattr(value, "y_bits") and is_display(getattr(value, "display", None))
+
+
+def is_display(value):
+    return hasattr(value, "pixels") and hasattr(value, "set_pixel_calls")
+
+
+def find_picture(namespace):
+    display = None
+    for value in list(namespace.values()):
+        for candidate in (value, getattr(value, "panel", None), getattr(value, "__self__", None)):
+            if is_panel(candidate):
+                return candidate.display, candidate
+        if display is None:
+            if is_display(value):
+                display = value
+            elif is_display(getattr(value, "display", None)):
+                display = value.display
+    return display, None
+
+
+def picture(display, panel):
+    if panel is None:
+        return display.width, display.height, bytes(display.pixels)
+    width = panel.width
+    height = panel.height
+    y_bits = panel.y_bits
+    y_mask = panel.y_mask
+    pixels = display.pixels
+    physical_width = display.width
+    out = bytearray(width * height * 3)
+    for i, entry in enumerate(panel.table):
+        src = (((entry & y_mask) * physical_width) + (entry >> y_bits)) * 3
+        out[i * 3:i * 3 + 3] = pixels[src:src + 3]
+    return width, height, bytes(out)
+
+
+def write_ppm(path, width, height, rgb):
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (width, height))
+        f.write(rgb)
+
+
+def write_png(path, width, height, rgb):
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    stride = width * 3
+    raw = b"".join(b"\x00" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 9)))
+        f.write(chunk(b"IEND", b""))
+
+
+class Result:
+    def __init__(self, path):
+        self.path = path
+        self.loops = []
+        self.frames = 0
+        self.setup_s = 0.0
+        self.setup_calls = 0
+        self.frame_s = []
+        self.slept_us = []
+        self.calls = []
+        self.allocated = []
+        self.digest = hashlib.sha1()
+        self.output_lines = 0
+        self.error = None
+
+    @property
+    def hash(self):
+        return self.digest.hexdigest()[:16]
+
+    def summary(self):
+        frames = max(self.frames, 1)
+        return {
+            "frames": self.frames,
+            "ms_mean": sum(self.frame_s) * 1000 / frames,
+            "ms_max": max(self.frame_s) * 1000 if self.frame_s else 0.0,
+            "slept_ms": sum(self.slept_us) / 1000 / frames,
+            "calls": sum(self.calls) / frames,
+            "alloc_mean": sum(self.allocated) / frames if self.allocated else None,
+            "alloc_max": max(self.allocated) if self.allocated else None,
+        }
+
+
+class Runner:
+    def __init__(self, result, namespace, clock, frames, alloc, dump, fmt, every):
+        self.result = result
+        self.namespace = namespace
+        self.clock = clock
+        self.limit = frames
+        self.alloc = alloc
+        self.dump = dump
+        self.fmt = fmt
+        self.every = every
+        self.display = None
+        self.panel = None
+        self.started = None
+        self.calls = 0
+        self.slept = 0
+        self.alloc_base = 0
+
+    def _calls(self):
+        return self.display.set_pixel_calls if self.display is not None else 0
+
+    def _begin(self):
+        if self.alloc:
+            tracemalloc.reset_peak()
+            self.alloc_base = tracemalloc.get_traced_memory()[0]
+        self.calls = self._calls()
+        self.slept = self.clock.slept_us
+        self.started = real_time.perf_counter()
+
+    def _end(self):
+        elapsed = real_time.perf_counter() - self.started
+        result = self.result
+        if self.alloc:
+            result.allocated.append(tracemalloc.get_traced_memory()[1] - self.alloc_base)
+        result.frame_s.append(elapsed)
+        result.slept_us.append(self.clock.slept_us - self.slept)
+        result.calls.append(self._calls() - self.calls)
+        result.frames += 1
+        if self.display is not None:
+            width, height, rgb = picture(self.display, self.panel)
+            result.digest.update(rgb)
+            if self.dump and (result.frames - 1) % self.every == 0:
+                name = os.path.join(self.dump, "frame_{:05}.{}".format(result.frames, self.fmt))
+                (write_png if self.fmt == "png" else write_ppm)(name, width, height, rgb)
+
+    # Called by the demo at the top of every pass through its main loop
+    def frame(self):
+        if self.started is None:
+            self.result.setup_s = real_time.perf_counter() - self.setup_started
+            self.display, self.panel = find_picture(self.namespace)
+            self.result.setup_calls = self._calls()
+        else:
+            self._end()
+            if self.result.frames >= self.limit:
+                raise StopDemo()
+        self._begin()
+
+    def finish(self):
+        if self.started is not None and self.result.frames < self.limit:
+            self._end()
+
+
+def run(path, frames=100, seed=1, loops=None, alloc=False, dump=None, fmt="ppm", every=1,
+        verbose=False, wall_ticks=False):
+    path = os.path.abspath(path)
+    result = Result(path)
+    with open(path) as f:
+        code, result.loops = instrument(f.read(), path, loops)
+    if dump:
+        os.makedirs(dump, exist_ok=True)
+
+    # Fresh copies of the shared modules and stand-ins, importing the
+    # virtual time and gc
+    saved = dict(sys.modules)
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None) or ""
+        if name != "__main__" and os.path.abspath(filename).startswith(REPO_DIR + os.sep):
+            del sys.modules[name]
+    clock = VirtualClock(wall_ticks)
+    sys.modules["time"] = make_time_module(clock)
+    sys.modules["gc"] = make_gc_module()
+    random.seed(seed)
+
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    runner = Runner(result, namespace, clock, frames, alloc, dump, fmt, every)
+    namespace[FRAME_HOOK] = runner.frame
+    output = io.StringIO()
+    if alloc:
+        tracemalloc.start()
+    runner.setup_started = real_time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stdout if verbose else output):
+            exec(code, namespace)
+        runner.finish()
+    except StopDemo:
+        pass
+    except Exception as error:
+        result.error = "{}: {}".format(type(error).__name__, error)
+    finally:
+        if alloc:
+            tracemalloc.stop()
+        sys.modules.clear()
+        sys.modules.update(saved)
+    result.output_lines = output.getvalue().count("\n")
+    return result
+
+
+def all_demos():
+    demos = []
+    for path in sorted(glob.glob(os.path.join(HUB75_DIR, "*.py"))):
+        with open(path) as f:
+            source = f.read()
+        if "import hub75" in source or "from interstate75" in source:
+            demos.append(path)
+    return demos
+
+
+# demo.py=HASH per line, returns {demo.py: HASH}
+def read_expect_file(path):
+    expected = {}
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, sep, digest = line.partition("=")
+            if not sep:
+                raise SystemExit("{}:{}: expected demo.py=HASH".format(path, number))
+            expected[os.path.basename(name.strip())] = digest.strip()
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run hub75 demos headless and deterministic.")
+    parser.add_argument("demos", nargs="*", help="demo scripts")
+    parser.add_argument("--all", action="store_true", help="run every demo in hub75/")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--loop", type=int, action="append", metavar="LINE",
+                        help="line of a loop to count as the frame loop (repeatable)")
+    parser.add_argument("--alloc", action="store_true", help="measure bytes allocated per frame")
+    parser.add_argument("--dump", metavar="DIR", help="write frames to DIR")
+    parser.add_argument("--format", choices=("ppm", "png"), default="ppm")
+    parser.add_argument("--every", type=int, default=1, help="dump every Nth frame")
+    parser.add_argument("--expect", metavar="HASH", help="fail unless the frames hash to HASH")
+    parser.add_argument("--expect-file", metavar="FILE",
+                        help="fail unless every demo hashes as in FILE (demo.py=HASH lines)")
+    parser.add_argument("--verbose", action="store_true", help="show what the demo prints")
+    parser.add_argument("--wall-ticks", action="store_true", help="ticks_*() follow the real time")
+    args = parser.parse_args()
+
+    demos = all_demos() if args.all else args.demos
+    if not demos:
+        parser.error("no demo given")
+    if args.expect and len(demos) > 1:
+        parser.error("--expect takes a single demo, use --expect-file for several")
+    if args.expect and args.expect_file:
+        parser.error("--expect and --expect-file exclude each other")
+    expected = {}
+    if args.expect_file:
+        expected = read_expect_file(args.expect_file)
+    elif args.expect:
+        expected[os.path.basename(demos[0])] = args.expect
+
+    print("{:<40} {:>6} {:>9} {:>9} {:>9} {:>10} {:>10}  {}".format(
+        "demo", "frames", "ms/frame", "ms max", "slept ms", "calls", "B alloc", "hash"))
+    failed = False
+    for path in demos:
+        dump = args.dump
+        if dump and len(demos) > 1:
+            dump = os.path.join(dump, os.path.splitext(os.path.basename(path))[0])
+        result = run(path, args.frames, args.seed, args.loop, args.alloc, dump,
+                     args.format, args.every, args.verbose, args.wall_ticks)
+        s = result.summary()
+        alloc = "-" if s["alloc_mean"] is None else "{:.0f}".format(s["alloc_mean"])
+        print("{:<40} {:>6} {:>9.2f} {:>9.2f} {:>9.1f} {:>10.0f} {:>10}  {}".format(
+            os.path.basename(path), s["frames"], s["ms_mean"], s["ms_max"],
+            s["slept_ms"], s["calls"], alloc, result.hash))
+        if result.error:
+            print("    error: " + result.error)
+            failed = True
+        if expected:
+            name = os.path.basename(path)
+            if name not in expected:
+                print("    no expected hash for " + name)
+                failed = True
+            elif result.hash != expected[name]:
+                print("    hash {} differs from expected {}".format(result.hash, expected[name]))
+                failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Bit-packed Game of Life on a toroidal board.
+#
+# Every row is stored as one integer (bit x = column x, 128 bits for the
+# 128x128 panel). The next generation is computed row by row with bitwise
+# adder logic: the horizontal sum of three neighbours is formed once per
+# row, then the sums of the rows above, at and below are added to a 4-bit
+# count per column. A cell lives if the count including itself is 3, or 4
+# while it is alive. No per-cell Python work is done at all.
+#
+# Usage:
+#
+#   board = LifeBoard.from_cells(live_cells)
+#   board.step()
+#   for x, y, alive in board.changes():
+#       ...
+#
+# update_live_cells() keeps the list-of-tuples interface of the Conway
+# scripts for callers that have not switched to LifeBoard yet.
+
+from micropython import const
+
+WIDTH = const(128)
+HEIGHT = const(128)
+
+
+class LifeBoard:
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        self.width = width
+        self.height = height
+        self.mask = (1 << width) - 1
+        self.rows = [0] * height
+        self.previous = [0] * height
+
+    @classmethod
+    def from_cells(cls, cells, width=WIDTH, height=HEIGHT):
+        board = cls(width, height)
+        rows = board.rows
+        for x, y in cells:
+            rows[y] |= 1 << x
+        return board
+
+    def get(self, x, y):
+        return (self.rows[y] >> x) & 1
+
+    def set(self, x, y, alive):
+        if alive:
+            self.rows[y] |= 1 << x
+        else:
+            self.rows[y] &= ~(1 << x)
+
+    def population(self):
+        count = 0
+        for row in self.rows:
+            while row:
+                row &= row - 1
+                count += 1
+        return count
+
+    def step(self):
+        width = self.width
+        height = self.height
+        mask = self.mask
+        top = width - 1
+        rows = self.rows
+
+        # Horizontal sum of left, centre and right neighbour as 2-bit number
+        sum0 = [0] * height
+        sum1 = [0] * height
+        for y in range(height):
+            c = rows[y]
+            l = ((c << 1) | (c >> top)) & mask
+            r = (c >> 1) | ((c & 1) << top)
+            lc = l ^ c
+            sum0[y] = lc ^ r
+            sum1[y] = (l & c) | (lc & r)
+
+        new_rows = self.previous
+        for y in range(height):
+            above = y - 1 if y else height - 1
+            below = y + 1 if y < height - 1 else 0
+            a0 = sum0[above]
+            a1 = sum1[above]
+            b0 = sum0[y]
+            b1 = sum1[y]
+            # a + b (0..6)
+            x0 = a0 ^ b0
+            k = a0 & b0
+            x1 = a1 ^ b1 ^ k
+            x2 = (a1 & b1) | (k & (a1 ^ b1))
+            # + c (0..9)
+            c0 = sum0[below]
+            c1 = sum1[below]
+            y0 = x0 ^ c0
+            k = x0 & c0
+            y1 = x1 ^ c1 ^ k
+            k = (x1 & c1) | (k & (x1 ^ c1))
+            y2 = x2 ^ k
+            y3 = x2 & k
+            # Count includes the cell itself: 3 -> alive, 4 -> unchanged
+            three = y0 & y1 & ~(y2 | y3)
+            four = y2 & ~(y0 | y1 | y3)
+            new_rows[y] = three | (rows[y] & four)
+
+        self.previous = rows
+        self.rows = new_rows
+
+    # Cells that differ between the last two generations as (x, y, alive)
+    def changes(self):
+        rows = self.rows
+        previous = self.previous
+        for y in range(self.height):
+            diff = rows[y] ^ previous[y]
+            if diff:
+                row = rows[y]
+                x = 0
+                while diff:
+                    if diff & 1:
+                        yield x, y, (row >> x) & 1
+                    diff >>= 1
+                    x += 1
+
+    # All live cells as (x, y)
+    def cells(self):
+        for y in range(self.height):
+            row = self.rows[y]
+            x = 0
+            while row:
+                if row & 1:
+                    yield x, y
+                row >>= 1
+                x += 1
+
+
+def update_live_cells(live_cells, width=WIDTH, height=HEIGHT):
+    board = LifeBoard.from_cells(live_cells, width, height)
+    board.step()
+    return list(board.cells())
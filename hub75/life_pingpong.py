@@ -0,0 +1,77 @@
+# Double-buffered Game of Life on a toroidal byte grid.
+#
+# Two bytearrays (one byte per cell) are used alternately as source and
+# destination, so a generation allocates nothing. Neighbour counts come from
+# a rolling window of three horizontal row sums (left + centre + right): when
+# moving one row down only the sums of the new bottom row are computed, the
+# other two buffers are reused. The rule itself is a 32-entry lookup table
+# indexed by (cell << 4) | sum, where the sum includes the cell.
+#
+# step() records the index of every cell that changed in a preallocated
+# array, so the caller can repaint exactly those pixels:
+#
+#   life = PingPongLife(WIDTH, HEIGHT)
+#   count = life.step()
+#   for k in range(count):
+#       i = life.changed[k]
+#       ...  life.cells[i] is the new state of cell (i % WIDTH, i // WIDTH)
+
+import micropython
+from array import array
+
+# Next state for (cell << 4) | sum of the 3x3 block: 3 -> alive,
+# 4 -> unchanged, everything else -> dead
+RULE = bytes([0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+              0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+
+
+class PingPongLife:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.spare = bytearray(width * height)
+        self.sums = [bytearray(width), bytearray(width), bytearray(width)]
+        # Placeholder contents, only the first step() result is valid
+        self.changed = array('H', range(width * height))
+
+    @micropython.native
+    def _row_sums(self, cells, y, out):
+        width = self.width
+        base = y * width
+        last = width - 1
+        out[0] = cells[base + last] + cells[base] + cells[base + 1]
+        for x in range(1, last):
+            i = base + x
+            out[x] = cells[i - 1] + cells[i] + cells[i + 1]
+        out[last] = cells[base + last - 1] + cells[base + last] + cells[base]
+
+    # Compute the next generation, returns the number of changed cells
+    @micropython.native
+    def step(self):
+        width = self.width
+        height = self.height
+        src = self.cells
+        dst = self.spare
+        changed = self.changed
+        rule = RULE
+        above, here, below = self.sums
+        self._row_sums(src, height - 1, above)
+        self._row_sums(src, 0, here)
+        count = 0
+        i = 0
+        for y in range(height):
+            self._row_sums(src, y + 1 if y < height - 1 else 0, below)
+            for x in range(width):
+                cell = src[i]
+                new = rule[(cell << 4) | (above[x] + here[x] + below[x])]
+                dst[i] = new
+                if new != cell:
+                    changed[count] = i
+                    count += 1
+                i += 1
+            # Slide the window one row down
+            above, here, below = here, below, above
+        self.cells = dst
+        self.spare = src
+        return count
@@ -0,0 +1,269 @@
+# Tiled Game of Life for large, sparse toroidal boards.
+#
+# The board is split into 16x16 tiles. Every tile row is a 16-bit integer
+# (bit x = column x), so all bit arithmetic stays within MicroPython small
+# ints and does not allocate. Only tiles on the active list are computed:
+# a tile that did not change in the last generation, and whose neighbours'
+# edges did not change either, cannot change in the next one and is skipped.
+# A tile that changes stays active and wakes the neighbour tiles behind
+# every edge (and corner) that changed.
+#
+# Memory: two buffers of width * height / 8 bytes each, i.e. 4 KB for
+# 128x128, 64 KB for 512x512 and 256 KB for 1024x1024.
+#
+# The panel shows a window of the virtual board:
+#
+#   life = TiledLife(512, 512)
+#   life.set(x, y, 1) ...
+#   life.draw_viewport(set_pixel_mapped, vx, vy)      # after scrolling
+#   life.step()
+#   life.draw_changes(set_pixel_mapped, vx, vy)       # every generation
+
+import micropython
+from array import array
+from micropython import const
+
+TILE = const(16)
+TILE_MASK = const(0xFFFF)
+
+
+def _zeros(count):
+    block = array('H', [0] * TILE)
+    table = array('H')
+    for _ in range(count):
+        table.extend(block)
+    return table
+
+
+class TiledLife:
+    def __init__(self, width, height):
+        if width % TILE or height % TILE:
+            raise ValueError("board size must be a multiple of 16")
+        self.width = width
+        self.height = height
+        self.tiles_x = width // TILE
+        self.tiles_y = height // TILE
+        count = self.tiles_x * self.tiles_y
+        self.cells = _zeros(count)
+        self.spare = _zeros(count)
+        # Active tiles of the current and the next generation, plus a flag
+        # per tile so a tile is queued only once
+        self.active = array('H', range(count))
+        self.active_count = 0
+        self.queue = array('H', range(count))
+        self.queue_count = 0
+        self.queued = bytearray(count)
+        # Tiles changed by the last step(), for draw_changes()
+        self.changed = array('H', range(count))
+        self.changed_count = 0
+        # Horizontal sums of the 18 extended rows of one tile
+        self._sum0 = array('I', range(TILE + 2))
+        self._sum1 = array('I', range(TILE + 2))
+        self.generation = 0
+
+    def _wake(self, tile):
+        if not self.queued[tile]:
+            self.queued[tile] = 1
+            self.queue[self.queue_count] = tile
+            self.queue_count += 1
+
+    # Wake a tile and its eight neighbours
+    def _wake_around(self, tile):
+        tiles_x = self.tiles_x
+        tiles_y = self.tiles_y
+        tx = tile % tiles_x
+        ty = tile // tiles_x
+        for dy in (-1, 0, 1):
+            row = ((ty + dy) % tiles_y) * tiles_x
+            for dx in (-1, 0, 1):
+                self._wake(row + (tx + dx) % tiles_x)
+
+    def get(self, x, y):
+        tile = (y // TILE) * self.tiles_x + x // TILE
+        return (self.cells[tile * TILE + y % TILE] >> (x % TILE)) & 1
+
+    def set(self, x, y, alive):
+        x %= self.width
+        y %= self.height
+        tile = (y // TILE) * self.tiles_x + x // TILE
+        i = tile * TILE + y % TILE
+        if alive:
+            self.cells[i] |= 1 << (x % TILE)
+        else:
+            self.cells[i] &= ~(1 << (x % TILE)) & TILE_MASK
+        self._wake_around(tile)
+
+    def population(self):
+        count = 0
+        for row in self.cells:
+            while row:
+                row &= row - 1
+                count += 1
+        return count
+
+    # Row r (-1..16) of a tile, extended by one neighbour column on each
+    # side: bit 0 = left neighbour's column 15, bits 1..16 = the tile,
+    # bit 17 = right neighbour's column 0
+    @micropython.native
+    def _ext_row(self, src, left, centre, right, r):
+        return (((src[left + r] >> 15) & 1) | (src[centre + r] << 1)
+                | ((src[right + r] & 1) << 17))
+
+    # Compute one tile from src into dst, returns the OR of all changed rows
+    # (0 if the tile is stable; bit 0 / bit 15 set if the left / right
+    # column changed)
+    @micropython.native
+    def _step_tile(self, tile, src, dst):
+        tiles_x = self.tiles_x
+        tiles_y = self.tiles_y
+        tx = tile % tiles_x
+        ty = tile // tiles_x
+        up = ((ty - 1) % tiles_y) * tiles_x
+        mid = ty * tiles_x
+        down = ((ty + 1) % tiles_y) * tiles_x
+        lx = (tx - 1) % tiles_x
+        rx = (tx + 1) % tiles_x
+        sum0 = self._sum0
+        sum1 = self._sum1
+
+        # Horizontal 3-sums (2-bit) of rows -1..16 in extended coordinates
+        for r in range(TILE + 2):
+            if r == 0:
+                e = self._ext_row(src, (up + lx) * TILE, (up + tx) * TILE, (up + rx) * TILE, TILE - 1)
+            elif r == TILE + 1:
+                e = self._ext_row(src, (down + lx) * TILE, (down + tx) * TILE, (down + rx) * TILE, 0)
+            else:
+                e = self._ext_row(src, (mid + lx) * TILE, (mid + tx) * TILE, (mid + rx) * TILE, r - 1)
+            a = e >> 1
+            c = e << 1
+            ae = a ^ e
+            sum0[r] = ae ^ c
+            sum1[r] = (a & e) | (ae & c)
+
+        base = tile * TILE
+        sides = 0
+        for r in range(TILE):
+            a0 = sum0[r]
+            a1 = sum1[r]
+            b0 = sum0[r + 1]
+            b1 = sum1[r + 1]
+            x0 = a0 ^ b0
+            k = a0 & b0
+            x1 = a1 ^ b1 ^ k
+            x2 = (a1 & b1) | (k & (a1 ^ b1))
+            c0 = sum0[r + 2]
+            c1 = sum1[r + 2]
+            y0 = x0 ^ c0
+            k = x0 & c0
+            y1 = x1 ^ c1 ^ k
+            k = (x1 & c1) | (k & (x1 ^ c1))
+            y2 = x2 ^ k
+            y3 = x2 & k
+            old = src[base + r]
+            three = y0 & y1 & ~(y2 | y3)
+            four = y2 & ~(y0 | y1 | y3)
+            new = ((three | ((old << 1) & four)) >> 1) & TILE_MASK
+            dst[base + r] = new
+            sides |= old ^ new
+        return sides
+
+    def step(self):
+        src = self.cells
+        dst = self.spare
+        tiles_x = self.tiles_x
+        tiles_y = self.tiles_y
+
+        # The queue collected last time becomes the active list
+        self.active, self.queue = self.queue, self.active
+        active = self.active
+        count = self.queue_count
+        self.active_count = count
+        self.queue_count = 0
+        for k in range(count):
+            self.queued[active[k]] = 0
+
+        changed = self.changed
+        changed_count = 0
+        for k in range(count):
+            tile = active[k]
+            sides = self._step_tile(tile, src, dst)
+            if not sides:
+                continue
+            changed[changed_count] = tile
+            changed_count += 1
+            tx = tile % tiles_x
+            ty = tile // tiles_x
+            up = ((ty - 1) % tiles_y) * tiles_x
+            down = ((ty + 1) % tiles_y) * tiles_x
+            row = ty * tiles_x
+            lx = (tx - 1) % tiles_x
+            rx = (tx + 1) % tiles_x
+            base = tile * TILE
+            top = src[base] ^ dst[base]
+            bottom = src[base + TILE - 1] ^ dst[base + TILE - 1]
+            self._wake(tile)
+            if top:
+                self._wake(up + tx)
+                if top & 1:
+                    self._wake(up + lx)
+                if top & 0x8000:
+                    self._wake(up + rx)
+            if bottom:
+                self._wake(down + tx)
+                if bottom & 1:
+                    self._wake(down + lx)
+                if bottom & 0x8000:
+                    self._wake(down + rx)
+            if sides & 1:
+                self._wake(row + lx)
+            if sides & 0x8000:
+                self._wake(row + rx)
+
+        self.changed_count = changed_count
+        # Tiles that were not computed hold the same state in both buffers
+        self.cells = dst
+        self.spare = src
+        self.generation += 1
+
+    # Paint one tile row clipped to the viewport at (vx, vy)
+    def _draw_bits(self, set_pixel, bits, state, x, y, vx, vy, vw, vh, r, g, b):
+        py = (y - vy) % self.height
+        if py >= vh:
+            return
+        while bits:
+            if bits & 1:
+                px = (x - vx) % self.width
+                if px < vw:
+                    if state & 1:
+                        set_pixel(px, py, r, g, b)
+                    else:
+                        set_pixel(px, py, 0, 0, 0)
+            bits >>= 1
+            state >>= 1
+            x += 1
+
+    # Redraw the whole viewport, e.g. after scrolling
+    def draw_viewport(self, set_pixel, vx, vy, vw=128, vh=128, r=255, g=255, b=255):
+        for py in range(vh):
+            y = (vy + py) % self.height
+            for px in range(vw):
+                if self.get((vx + px) % self.width, y):
+                    set_pixel(px, py, r, g, b)
+                else:
+                    set_pixel(px, py, 0, 0, 0)
+
+    # Repaint only the cells that changed in the last step() and are visible
+    def draw_changes(self, set_pixel, vx, vy, vw=128, vh=128, r=255, g=255, b=255):
+        cells = self.cells
+        previous = self.spare
+        tiles_x = self.tiles_x
+        for k in range(self.changed_count):
+            tile = self.changed[k]
+            x0 = (tile % tiles_x) * TILE
+            y0 = (tile // tiles_x) * TILE
+            base = tile * TILE
+            for row in range(TILE):
+                diff = cells[base + row] ^ previous[base + row]
+                if diff:
+                    self._draw_bits(set_pixel, diff, cells[base + row], x0, y0 + row,
+                                    vx, vy, vw, vh, r, g, b)
@@ -0,0 +1,216 @@
+# Erase-by-redraw line renderer for wireframes.
+#
+# Clearing the whole panel every frame to move a few hundred line pixels
+# costs far more than the lines themselves. LineRenderer rasterises the
+# lines of a frame into a pixel list (packed cell numbers y * width + x and
+# packed 0xRRGGBB colours) and present() compares it with the list of the
+# previous frame:
+#
+# - pixels that are lit in both frames with the same colour are left alone,
+# - pixels of the old frame that are not part of the new one are set black,
+# - everything else is drawn.
+#
+# To find a cell of the new frame in the old list, a board-sized
+# array('H') holds for every lit cell its position + 1 in the old list
+# (0 = dark). A frame costs O(pixels drawn), independent of the panel size,
+# and allocates nothing.
+#
+# antialias=True rasterises with Xiaolin Wu's algorithm instead of
+# Bresenham: two pixels per step, their brightness split by the distance
+# to the ideal line. Coverage (0..255) becomes brightness through a table
+# built once for the given gamma (1.0 = linear).
+#
+# Memory for 128x128: 32 KB board, 12 bytes per capacity entry (two lists
+# of cells and colours, plus a flag byte). Pixels beyond capacity are not
+# drawn and counted in dropped; size it for the longest frame (Wu lines
+# need about twice as many pixels).
+#
+#   renderer = LineRenderer(panel, capacity=2048)
+#   while True:
+#       renderer.line(x0, y0, x1, y1, r, g, b)    # any number of lines
+#       renderer.present()                        # instead of display.clear()
+#
+# Statistics of the last present(): pixels (rasterised), drawn, erased,
+# unchanged; touched = drawn + erased is what went to the panel.
+
+import micropython
+from array import array
+
+
+class LineRenderer:
+    def __init__(self, panel, capacity=2048, antialias=False, gamma=1.0):
+        self.panel = panel
+        self.set_pixel = panel.set_pixel_mapped
+        self.width = panel.width
+        self.height = panel.height
+        self.capacity = capacity
+        self.antialias = antialias
+        size = self.width * self.height
+        # Position + 1 in the list on screen; range() avoids a temporary
+        # list of size entries
+        self.slot = array('H', range(size))
+        for i in range(size):
+            self.slot[i] = 0
+        self.cells = array('H', [0] * capacity)
+        self.colors = array('I', [0] * capacity)
+        self.shown_cells = array('H', [0] * capacity)
+        self.shown_colors = array('I', [0] * capacity)
+        self.kept = bytearray(capacity)
+        self.count = 0
+        self.shown = 0
+        # Coverage 0..255 -> brightness 0..255
+        self.intensity = bytearray(256)
+        for i in range(256):
+            self.intensity[i] = int(255 * (i / 255) ** (1 / gamma) + 0.5)
+        # Statistics
+        self.pixels = 0
+        self.drawn = 0
+        self.erased = 0
+        self.unchanged = 0
+        self.dropped = 0
+
+    def line(self, x0, y0, x1, y1, r, g, b):
+        if self.antialias:
+            self._wu(x0, y0, x1, y1, r, g, b)
+        else:
+            self._bresenham(x0, y0, x1, y1, (r << 16) | (g << 8) | b)
+
+    @micropython.native
+    def _bresenham(self, x0, y0, x1, y1, color):
+        width = self.width
+        height = self.height
+        cells = self.cells
+        colors = self.colors
+        count = self.count
+        capacity = self.capacity
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            if 0 <= x0 < width and 0 <= y0 < height:
+                if count < capacity:
+                    cells[count] = y0 * width + x0
+                    colors[count] = color
+                    count += 1
+                else:
+                    self.dropped += 1
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+        self.count = count
+
+    # Wu's line between integer endpoints; the major axis is stepped one
+    # pixel at a time, the minor position kept in 16.16 fixed point
+    @micropython.native
+    def _wu(self, x0, y0, x1, y1, r, g, b):
+        width = self.width
+        height = self.height
+        cells = self.cells
+        colors = self.colors
+        intensity = self.intensity
+        count = self.count
+        capacity = self.capacity
+        steep = abs(y1 - y0) > abs(x1 - x0)
+        if steep:
+            x0, y0 = y0, x0
+            x1, y1 = y1, x1
+        if x0 > x1:
+            x0, x1 = x1, x0
+            y0, y1 = y1, y0
+        dx = x1 - x0
+        gradient = ((y1 - y0) << 16) // dx if dx else 0
+        y = y0 << 16
+        for x in range(x0, x1 + 1):
+            base = y >> 16
+            coverage = (y >> 8) & 0xFF
+            # Upper pixel gets 255 - coverage, the one below coverage
+            for k in range(2):
+                level = intensity[255 - coverage if k == 0 else coverage]
+                if level:
+                    if steep:
+                        px = base + k
+                        py = x
+                    else:
+                        px = x
+                        py = base + k
+                    if 0 <= px < width and 0 <= py < height:
+                        if count < capacity:
+                            level += 1
+                            cells[count] = py * width + px
+                            colors[count] = (((r * level) >> 8) << 16) | (((g * level) >> 8) << 8) | ((b * level) >> 8)
+                            count += 1
+                        else:
+                            self.dropped += 1
+            y += gradient
+        self.count = count
+
+    # Show the lines since the last present() and forget them
+    @micropython.native
+    def present(self):
+        set_pixel = self.set_pixel
+        width = self.width
+        slot = self.slot
+        kept = self.kept
+        cells = self.cells
+        colors = self.colors
+        count = self.count
+        shown_cells = self.shown_cells
+        shown_colors = self.shown_colors
+        shown = self.shown
+        drawn = 0
+        erased = 0
+        unchanged = 0
+        # Old pixels that are lit again stay, the rest is switched off
+        for j in range(count):
+            i = slot[cells[j]]
+            if i:
+                kept[i - 1] = 1
+        for i in range(shown):
+            cell = shown_cells[i]
+            k = slot[cell]
+            if k:
+                if not kept[k - 1]:
+                    set_pixel(cell % width, cell // width, 0, 0, 0)
+                    slot[cell] = 0
+                    erased += 1
+        for j in range(count):
+            cell = cells[j]
+            color = colors[j]
+            i = slot[cell]
+            if i and shown_colors[i - 1] == color:
+                unchanged += 1
+            else:
+                set_pixel(cell % width, cell // width, color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+                drawn += 1
+                if i:
+                    # Lines crossing a cell: compare the next one with
+                    # what is on screen now
+                    shown_colors[i - 1] = color
+        for i in range(shown):
+            kept[i] = 0
+        for j in range(count):
+            slot[cells[j]] = j + 1
+        # The new list is on screen now
+        self.cells = shown_cells
+        self.colors = shown_colors
+        self.shown_cells = cells
+        self.shown_colors = colors
+        self.shown = count
+        self.count = 0
+        self.pixels = count
+        self.drawn = drawn
+        self.erased = erased
+        self.unchanged = unchanged
+
+    # Switch off everything on screen (e.g. before leaving the demo)
+    def clear(self):
+        self.count = 0
+        self.present()
@@ -0,0 +1,238 @@
+# Maze generators on a cell lattice.
+#
+# A maze lives on a lattice of columns x rows cells (the maze demo puts a
+# cell every MazeWaySize pixels). Cells are numbered row * columns +
+# column; the generators report every corridor they open as
+# passage(cell, other) and leave the drawing to the caller, which can carve
+# it as one horizontal or vertical span.
+#
+# MazeGenerator keeps its state in preallocated buffers instead of a set of
+# tuples and a list stack: visited is a bitset, the DFS stack an
+# array('H'). The order in which the four directions are tried comes from
+# a table of all 24 permutations, one random draw per step instead of a
+# copied and shuffled list.
+#
+# - dfs():    recursive backtracker (long winding corridors), iterative
+# - wilson(): loop-erased random walks, every spanning tree equally likely
+#             (no bias towards long corridors); slow start on big lattices
+# - eller():  row by row with EllerRows, which only keeps one row of set
+#             labels: O(columns) memory for any number of rows, so a maze
+#             of unlimited height can be streamed onto the panel
+#
+#   generator = MazeGenerator(16, 16)         # largest lattice
+#   generator.dfs(columns, rows, start, passage)
+#
+#   rows = EllerRows(columns)                 # streaming
+#   while True:
+#       right, down = rows.next_row()         # bytearrays of the new row
+#       ...                                   # right[c]: c <-> c + 1,
+#                                             # down[c]: c <-> next row
+
+import micropython
+import random
+from array import array
+
+# Direction 0..3: down, up, right, left (the order of the old directions
+# list)
+DOWN = 0
+UP = 1
+RIGHT = 2
+LEFT = 3
+
+
+def _permutations():
+    table = bytearray(24 * 4)
+    n = 0
+    for a in range(4):
+        for b in range(4):
+            for c in range(4):
+                for d in range(4):
+                    if len({a, b, c, d}) == 4:
+                        table[n:n + 4] = bytes((a, b, c, d))
+                        n += 4
+    return table
+
+
+# All orderings of the four directions, 4 bytes each
+PERMUTATIONS = _permutations()
+
+
+class MazeGenerator:
+    def __init__(self, columns, rows):
+        self.capacity = columns * rows
+        self.visited = bytearray((self.capacity + 7) >> 3)
+        self.stack = array('H', [0] * self.capacity)
+        self.exits = bytearray(self.capacity)
+        self.eller_rows = EllerRows(columns)
+        self.columns = columns
+        self.rows = rows
+
+    def _reset(self, columns, rows):
+        if columns * rows > self.capacity:
+            raise ValueError("lattice larger than the generator")
+        self.columns = columns
+        self.rows = rows
+        visited = self.visited
+        for i in range(len(visited)):
+            visited[i] = 0
+
+    # Neighbour of cell in direction, -1 outside the lattice
+    @micropython.native
+    def _neighbour(self, cell, direction):
+        columns = self.columns
+        if direction == DOWN:
+            cell += columns
+            return cell if cell < columns * self.rows else -1
+        if direction == UP:
+            return cell - columns if cell >= columns else -1
+        x = cell % columns
+        if direction == RIGHT:
+            return cell + 1 if x < columns - 1 else -1
+        return cell - 1 if x > 0 else -1
+
+    @micropython.native
+    def dfs(self, columns, rows, start, passage):
+        self._reset(columns, rows)
+        visited = self.visited
+        stack = self.stack
+        permutations = PERMUTATIONS
+        randint = random.randint
+        visited[start >> 3] |= 1 << (start & 7)
+        stack[0] = start
+        depth = 1
+        while depth:
+            cell = stack[depth - 1]
+            order = randint(0, 23) << 2
+            for k in range(4):
+                other = self._neighbour(cell, permutations[order + k])
+                if other >= 0 and not visited[other >> 3] & (1 << (other & 7)):
+                    visited[other >> 3] |= 1 << (other & 7)
+                    passage(cell, other)
+                    stack[depth] = other
+                    depth += 1
+                    break
+            else:
+                depth -= 1
+
+    @micropython.native
+    def wilson(self, columns, rows, start, passage):
+        self._reset(columns, rows)
+        visited = self.visited
+        exits = self.exits
+        randint = random.randint
+        visited[start >> 3] |= 1 << (start & 7)
+        for first in range(columns * rows):
+            if visited[first >> 3] & (1 << (first & 7)):
+                continue
+            # Random walk until the maze is hit; only the last exit of
+            # every cell is kept, which erases the loops
+            cell = first
+            while not visited[cell >> 3] & (1 << (cell & 7)):
+                other = -1
+                while other < 0:
+                    direction = randint(0, 3)
+                    other = self._neighbour(cell, direction)
+                exits[cell] = direction
+                cell = other
+            # Walk the loop-free path again and add it to the maze
+            cell = first
+            while not visited[cell >> 3] & (1 << (cell & 7)):
+                visited[cell >> 3] |= 1 << (cell & 7)
+                other = self._neighbour(cell, exits[cell])
+                passage(cell, other)
+                cell = other
+
+    def eller(self, columns, rows, passage):
+        self._reset(columns, rows)
+        eller_rows = self.eller_rows
+        eller_rows.reset(columns)
+        cell = 0
+        for y in range(rows):
+            right, down = eller_rows.next_row(y == rows - 1)
+            for x in range(columns - 1):
+                if right[x]:
+                    passage(cell + x, cell + x + 1)
+            if y < rows - 1:
+                for x in range(columns):
+                    if down[x]:
+                        passage(cell + x, cell + x + columns)
+            cell += columns
+
+
+# Eller's algorithm: every cell of the current row carries the label of
+# the set (connected part of the maze so far) it belongs to. Neighbours of
+# different sets are joined at random, then every set continues into the
+# next row at least once. Labels are renumbered every row, so they never
+# exceed columns.
+class EllerRows:
+    def __init__(self, columns):
+        self.capacity = columns
+        self.sets = array('H', [0] * columns)
+        self.labels = array('H', [0] * (columns + 1))
+        self.continues = bytearray(columns + 1)
+        self.right = bytearray(columns)
+        self.down = bytearray(columns)
+        self.reset(columns)
+
+    def reset(self, columns):
+        if columns > self.capacity:
+            raise ValueError("row wider than the generator")
+        self.columns = columns
+        for x in range(self.capacity):
+            self.sets[x] = 0
+        self.row = 0
+
+    # Open the corridors of the next row; with last=True all sets are
+    # joined and nothing continues downwards
+    @micropython.native
+    def next_row(self, last=False):
+        columns = self.columns
+        sets = self.sets
+        labels = self.labels
+        continues = self.continues
+        right = self.right
+        down = self.down
+        randint = random.randint
+        # Compact labels 1..n, new sets for cells nobody continued into
+        for label in range(columns + 1):
+            labels[label] = 0
+            continues[label] = 0
+        count = 0
+        for x in range(columns):
+            label = sets[x]
+            if label:
+                if not labels[label]:
+                    count += 1
+                    labels[label] = count
+                sets[x] = labels[label]
+        for x in range(columns):
+            if not sets[x]:
+                count += 1
+                sets[x] = count
+        # Join neighbours of different sets
+        for x in range(columns - 1):
+            right[x] = 0
+            a = sets[x]
+            b = sets[x + 1]
+            if a != b and (last or randint(0, 1)):
+                right[x] = 1
+                for i in range(columns):
+                    if sets[i] == b:
+                        sets[i] = a
+        right[columns - 1] = 0
+        # Every set goes down at least once
+        for x in range(columns):
+            down[x] = 0
+            if not last and randint(0, 1):
+                down[x] = 1
+                continues[sets[x]] = 1
+        if not last:
+            for x in range(columns - 1, -1, -1):
+                if not continues[sets[x]]:
+                    down[x] = 1
+                    continues[sets[x]] = 1
+        for x in range(columns):
+            if not down[x]:
+                sets[x] = 0
+        self.row += 1
+        return right, down
@@ -0,0 +1,358 @@
+# Pixel remapping for chained HUB75 panels.
+#
+# The 128x128 array consists of eight 64x32 modules that are driven as one
+# 512x32 chain. Instead of evaluating the newXY() branch cascade for every
+# pixel write, the logical (x, y) -> physical (x1, y1) mapping is computed
+# once at startup into a flat array. Every entry holds the physical
+# coordinates packed as (x1 << y_bits) | y1, so a pixel write is a single
+# indexed read plus a shift and a mask - no tuple is allocated.
+#
+# Other chain shapes are described with a Topology: the size of one module
+# plus, in chain order, where every module sits on the logical canvas and
+# how it is rotated/flipped. Topology.compile() turns that description into
+# the same lookup table.
+#
+# Usage in a script:
+#
+#   from panel_map import PanelMap
+#   display = hub75.Hub75(xWIDTH, xHEIGHT)
+#   set_pixel_mapped = PanelMap(display).set_pixel_mapped
+#
+# or for a different installation:
+#
+#   topology = serpentine(4, 2)              # 256x64 out of 64x32 modules
+#   display = hub75.Hub75(topology.phys_width, topology.phys_height)
+#   set_pixel_mapped = PanelMap(display, topology).set_pixel_mapped
+#
+# Spans: inside one module a logical row or column maps to a straight run of
+# physical pixels (on the 128x128 square a logical column is a piece of a
+# physical row). fill_hspan(), fill_vspan(), fill_rect() and blit() split a
+# span at the module edges and step through each run by adding a constant
+# to the packed coordinates, so only the first pixel of a run is looked up.
+
+import micropython
+from array import array
+from micropython import const
+
+# Logical resolution
+WIDTH = const(128)
+HEIGHT = const(128)
+
+# Physical resolution of the module chain
+xWIDTH = const(512)
+xHEIGHT = const(32)
+
+# Packing of the physical coordinates in a table entry
+Y_BITS = const(5)
+Y_MASK = const(31)
+
+
+# Reference implementation of the hand-written mapping (kept to verify the
+# lookup table, not meant to be called per pixel)
+def newXY(x, y):
+    yh = y % 64
+    if y < 64:
+        if x < 32:
+            return 192 + yh, 31 - x
+        elif x < 64:
+            return 191 - yh, x - 32
+        elif x < 96:
+            return 64 + yh, 31 - (x - 64)
+        elif x < 128:
+            return 63 - yh, x - 96
+    elif y < 128:
+        if x < 32:
+            return 256 + yh, 31 - x
+        elif x < 64:
+            return 383 - yh, x - 32
+        elif x < 96:
+            return 384 + yh, 31 - (x - 64)
+        elif x < 128:
+            return 511 - yh, x - 96
+    else:
+        return x, y  # Identity transformation for values >= 128
+
+
+def build_table(width=WIDTH, height=HEIGHT, mapper=newXY):
+    # One entry per logical pixel, row-major (index = y * width + x)
+    table = array('H')
+    for y in range(height):
+        for x in range(width):
+            x1, y1 = mapper(x, y)
+            table.append((x1 << Y_BITS) | y1)
+    return table
+
+
+# Module coordinates as an affine function of the (flipped) tile coordinates:
+# mx = cx + a * lx + b * ly, my = cy + c * lx + d * ly
+def _rotation(rotation, module_width, module_height):
+    mw = module_width - 1
+    mh = module_height - 1
+    if rotation == 0:
+        return 1, 0, 0, 0, 1, 0
+    elif rotation == 90:
+        return 0, 1, 0, -1, 0, mh
+    elif rotation == 180:
+        return -1, 0, mw, 0, -1, mh
+    elif rotation == 270:
+        return 0, -1, mw, 1, 0, 0
+    raise ValueError("rotation must be 0, 90, 180 or 270")
+
+
+class Topology:
+    # modules: one (x, y, rotation, flip) tuple per module in chain order.
+    # (x, y) is the top-left logical pixel covered by the module, rotation is
+    # 0/90/180/270 degrees and flip mirrors the module horizontally (applied
+    # before the rotation). The modules must tile the canvas without overlap.
+    def __init__(self, width, height, modules, module_width=64, module_height=32):
+        self.width = width
+        self.height = height
+        self.modules = modules
+        self.module_width = module_width
+        self.module_height = module_height
+        # The chain is one long row of modules
+        self.phys_width = len(modules) * module_width
+        self.phys_height = module_height
+        # Smallest field that holds a physical row number
+        y_bits = 0
+        while (1 << y_bits) < module_height:
+            y_bits += 1
+        self.y_bits = y_bits
+        self.y_mask = (1 << y_bits) - 1
+
+    def tile_size(self, rotation):
+        if rotation in (0, 180):
+            return self.module_width, self.module_height
+        return self.module_height, self.module_width
+
+    def compile(self):
+        width = self.width
+        y_bits = self.y_bits
+        largest = ((self.phys_width - 1) << y_bits) | self.y_mask
+        typecode = 'H' if largest < 0x10000 else 'I'
+
+        area = 0
+        for x, y, rotation, flip in self.modules:
+            tile_w, tile_h = self.tile_size(rotation)
+            if x < 0 or y < 0 or x + tile_w > width or y + tile_h > self.height:
+                raise ValueError("module at ({}, {}) exceeds the canvas".format(x, y))
+            area += tile_w * tile_h
+        if area != width * self.height:
+            raise ValueError("modules do not cover the canvas")
+
+        # Placeholder contents, every entry is overwritten below
+        table = array(typecode, range(width * self.height))
+
+        for index, (x0, y0, rotation, flip) in enumerate(self.modules):
+            tile_w, tile_h = self.tile_size(rotation)
+            a, b, cx, c, d, cy = _rotation(rotation, self.module_width, self.module_height)
+            if flip:
+                # lx -> tile_w - 1 - lx
+                cx += a * (tile_w - 1)
+                cy += c * (tile_w - 1)
+                a = -a
+                c = -c
+            cx += index * self.module_width
+
+            for ly in range(tile_h):
+                row = (y0 + ly) * width + x0
+                mx = cx + b * ly
+                my = cy + d * ly
+                for lx in range(tile_w):
+                    table[row + lx] = ((mx + a * lx) << y_bits) | (my + c * lx)
+        return table
+
+    # Module edges for splitting spans: for every logical row the x where
+    # each module ends, for every column the y where each module ends
+    # (sorted, the last entry is the canvas size). Equal tuples are shared.
+    def edges(self):
+        rows = [set() for _ in range(self.height)]
+        columns = [set() for _ in range(self.width)]
+        for x, y, rotation, flip in self.modules:
+            tile_w, tile_h = self.tile_size(rotation)
+            for ly in range(y, y + tile_h):
+                rows[ly].add(x + tile_w)
+            for lx in range(x, x + tile_w):
+                columns[lx].add(y + tile_h)
+        shared = {}
+        row_edges = []
+        for ends in rows:
+            ends = tuple(sorted(ends))
+            row_edges.append(shared.setdefault(ends, ends))
+        column_edges = []
+        for ends in columns:
+            ends = tuple(sorted(ends))
+            column_edges.append(shared.setdefault(ends, ends))
+        return row_edges, column_edges
+
+
+# Chain runs left to right through the first row of tiles, right to left
+# through the second one and so on. Modules on the way back are mounted
+# upside down.
+def serpentine(columns, rows, rotation=0, module_width=64, module_height=32):
+    if rotation in (0, 180):
+        tile_w, tile_h = module_width, module_height
+    else:
+        tile_w, tile_h = module_height, module_width
+    modules = []
+    for row in range(rows):
+        if row % 2 == 0:
+            order = range(columns)
+            turn = rotation
+        else:
+            order = range(columns - 1, -1, -1)
+            turn = (rotation + 180) % 360
+        for column in order:
+            modules.append((column * tile_w, row * tile_h, turn, False))
+    return Topology(columns * tile_w, rows * tile_h, modules, module_width, module_height)
+
+
+# The 128x128 square: two rows of four upright modules, chain starts at the
+# top right corner and snakes back along the bottom row
+PANEL_128X128 = Topology(WIDTH, HEIGHT, [
+    (96, 0, 270, False),
+    (64, 0, 90, False),
+    (32, 0, 270, False),
+    (0, 0, 90, False),
+    (0, 64, 90, False),
+    (32, 64, 270, False),
+    (64, 64, 90, False),
+    (96, 64, 270, False),
+])
+
+
+class PanelMap:
+    def __init__(self, display, topology=PANEL_128X128, table=None):
+        self.display = display
+        self.width = topology.width
+        self.height = topology.height
+        self.y_bits = topology.y_bits
+        self.y_mask = topology.y_mask
+        self.table = topology.compile() if table is None else table
+        self.row_edges, self.column_edges = topology.edges()
+
+    @micropython.native
+    def set_pixel_mapped(self, x, y, r, g, b):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            p = self.table[y * self.width + x]
+            self.display.set_pixel(p >> self.y_bits, p & self.y_mask, r, g, b)
+
+    # Send count pixels starting at logical index i, step logical pixels
+    # apart, that all lie in one module
+    @micropython.native
+    def _run(self, i, step, count, r, g, b):
+        set_pixel = self.display.set_pixel
+        y_bits = self.y_bits
+        y_mask = self.y_mask
+        p = self.table[i]
+        delta = self.table[i + step] - p if count > 1 else 0
+        for _ in range(count):
+            set_pixel(p >> y_bits, p & y_mask, r, g, b)
+            p += delta
+
+    # length pixels from (x, y) to the right
+    @micropython.native
+    def fill_hspan(self, x, y, length, r, g, b):
+        if not 0 <= y < self.height:
+            return
+        end = x + length
+        if x < 0:
+            x = 0
+        if end > self.width:
+            end = self.width
+        edges = self.row_edges[y]
+        row = y * self.width
+        k = 0
+        while x < end:
+            while edges[k] <= x:
+                k += 1
+            stop = edges[k] if edges[k] < end else end
+            self._run(row + x, 1, stop - x, r, g, b)
+            x = stop
+
+    # length pixels from (x, y) downwards
+    @micropython.native
+    def fill_vspan(self, x, y, length, r, g, b):
+        if not 0 <= x < self.width:
+            return
+        end = y + length
+        if y < 0:
+            y = 0
+        if end > self.height:
+            end = self.height
+        edges = self.column_edges[x]
+        width = self.width
+        k = 0
+        while y < end:
+            while edges[k] <= y:
+                k += 1
+            stop = edges[k] if edges[k] < end else end
+            self._run(y * width + x, width, stop - y, r, g, b)
+            y = stop
+
+    # Filled rectangle with the top-left corner at (x, y), drawn as rows or
+    # columns, whichever needs fewer runs: a span is one run per module it
+    # touches, so the module edges inside the rectangle are counted for both
+    # orientations (ties go to the longer spans)
+    def fill_rect(self, x, y, width, height, r, g, b):
+        x0 = x if x > 0 else 0
+        x1 = x + width if x + width < self.width else self.width
+        y0 = y if y > 0 else 0
+        y1 = y + height if y + height < self.height else self.height
+        if x0 >= x1 or y0 >= y1:
+            return
+        rows = 0
+        for row in range(y0, y1):
+            rows += 1
+            for edge in self.row_edges[row]:
+                if x0 < edge < x1:
+                    rows += 1
+        columns = 0
+        for column in range(x0, x1):
+            columns += 1
+            for edge in self.column_edges[column]:
+                if y0 < edge < y1:
+                    columns += 1
+        if columns < rows or (columns == rows and y1 - y0 >= x1 - x0):
+            for column in range(x0, x1):
+                self.fill_vspan(column, y0, y1 - y0, r, g, b)
+        else:
+            for row in range(y0, y1):
+                self.fill_hspan(x0, row, x1 - x0, r, g, b)
+
+    # 1-bit bitmap, one integer per row, the most significant of width bits
+    # is the leftmost pixel. Set bits are drawn in (r, g, b), clear bits are
+    # left untouched.
+    @micropython.native
+    def blit(self, x, y, rows, width, r, g, b):
+        set_pixel = self.display.set_pixel
+        table = self.table
+        y_bits = self.y_bits
+        y_mask = self.y_mask
+        canvas = self.width
+        for bits in rows:
+            if bits and 0 <= y < self.height:
+                edges = self.row_edges[y]
+                row = y * canvas
+                k = 0
+                px = x
+                mask = 1 << (width - 1)
+                # Walk the row module by module, stepping the packed
+                # coordinates like _run()
+                while mask and px < canvas:
+                    if px < 0:
+                        px += 1
+                        mask >>= 1
+                        continue
+                    while edges[k] <= px:
+                        k += 1
+                    stop = edges[k]
+                    p = table[row + px]
+                    delta = table[row + px + 1] - p if px + 1 < stop else 0
+                    while mask and px < stop:
+                        if bits & mask:
+                            set_pixel(p >> y_bits, p & y_mask, r, g, b)
+                        p += delta
+                        px += 1
+                        mask >>= 1
+            y += 1
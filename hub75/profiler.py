@@ -0,0 +1,159 @@
+# Per-frame profiling for the hub75 main loops.
+#
+# Named sections are timed with ticks_us() and summed per frame, frame
+# times go into a histogram with fixed bins, and every report_every frames
+# a summary is printed (over USB serial on the Pico) and the counters
+# start over. Sections are small integers indexing preallocated arrays, so
+# timing a frame allocates nothing; only the summary builds strings.
+#
+# Switched off, the instrumentation should cost nothing. The scripts guard
+# every call with a const flag, which the MicroPython compiler folds away:
+#
+#   from micropython import const
+#   from profiler import Profiler
+#   PROFILE = const(0)                  # 1 = print a summary every 300 frames
+#   SIM = const(0)
+#   DRAW = const(1)
+#   profiler = Profiler(("sim", "draw"))
+#
+#   while True:
+#       if PROFILE:
+#           profiler.frame_start()
+#           profiler.start(SIM)
+#       ...
+#       if PROFILE:
+#           profiler.stop(SIM)
+#           profiler.frame_end()        # prints the summary when it is due
+#
+# With PROFILE = const(0) the `if PROFILE:` blocks are not even compiled.
+# NullProfiler has the same methods doing nothing, for code that wants to
+# pass a profiler around instead.
+#
+# Summary (times in microseconds, percentiles are histogram bin bounds):
+#
+#   frames 300  avg 12410 us  80.6 fps  max 30210  p50<13000 p90<14000 p99<29000
+#     sim       avg   8123  max   9001   65.4%
+#     draw      avg   3988  max  20107   32.1%
+
+import micropython
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # CPython, for the host benchmarks
+    from time import perf_counter
+
+    # Wrapping at 2**30 like MicroPython, so the values fit the arrays
+    def ticks_us():
+        return int(perf_counter() * 1000000) & 0x3FFFFFFF
+
+    def ticks_diff(a, b):
+        return ((a - b + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+
+
+class Profiler:
+    def __init__(self, names, report_every=300, bin_us=1000, bins=64, output=print):
+        self.names = names
+        self.report_every = report_every
+        self.bin_us = bin_us
+        self.output = output
+        sections = len(names)
+        self.started = array('i', [0] * sections)
+        self.total = array('I', [0] * sections)
+        self.peak = array('I', [0] * sections)
+        # Frame times; the last bin collects everything slower
+        self.histogram = array('I', [0] * bins)
+        self.frame_started = 0
+        self.frames = 0
+        self.frame_total = 0
+        self.frame_peak = 0
+        self.reports = 0
+
+    def reset(self):
+        for i in range(len(self.names)):
+            self.total[i] = 0
+            self.peak[i] = 0
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        self.frames = 0
+        self.frame_total = 0
+        self.frame_peak = 0
+
+    @micropython.native
+    def start(self, section):
+        self.started[section] = ticks_us()
+
+    @micropython.native
+    def stop(self, section):
+        elapsed = ticks_diff(ticks_us(), self.started[section])
+        self.total[section] += elapsed
+        if elapsed > self.peak[section]:
+            self.peak[section] = elapsed
+
+    def frame_start(self):
+        self.frame_started = ticks_us()
+
+    @micropython.native
+    def frame_end(self):
+        elapsed = ticks_diff(ticks_us(), self.frame_started)
+        index = elapsed // self.bin_us
+        last = len(self.histogram) - 1
+        self.histogram[index if index < last else last] += 1
+        self.frame_total += elapsed
+        if elapsed > self.frame_peak:
+            self.frame_peak = elapsed
+        self.frames += 1
+        if self.frames >= self.report_every:
+            self.report()
+            self.reset()
+
+    # Upper bound (us) of the bin that holds the given share of the frames
+    def percentile(self, percent):
+        wanted = (self.frames * percent + 99) // 100
+        seen = 0
+        for i in range(len(self.histogram)):
+            seen += self.histogram[i]
+            if seen >= wanted:
+                return (i + 1) * self.bin_us
+        return len(self.histogram) * self.bin_us
+
+    def report(self):
+        if not self.frames:
+            return
+        self.reports += 1
+        frames = self.frames
+        average = self.frame_total // frames
+        fps = 1000000 * frames / self.frame_total if self.frame_total else 0
+        last = len(self.histogram) - 1
+        self.output("frames {}  avg {} us  {:.1f} fps  max {}  p50<{} p90<{} p99<{}{}".format(
+            frames, average, fps, self.frame_peak, self.percentile(50), self.percentile(90),
+            self.percentile(99), "  ({} over {} us)".format(self.histogram[last], last * self.bin_us)
+            if self.histogram[last] else ""))
+        for i in range(len(self.names)):
+            share = 100 * self.total[i] / self.frame_total if self.frame_total else 0
+            self.output("  {:<9} avg {:>6}  max {:>6}  {:5.1f}%".format(
+                self.names[i], self.total[i] // frames, self.peak[i], share))
+
+
+class NullProfiler:
+    def __init__(self, names=(), *args, **kwargs):
+        self.names = names
+
+    def reset(self):
+        pass
+
+    def start(self, section):
+        pass
+
+    def stop(self, section):
+        pass
+
+    def frame_start(self):
+        pass
+
+    def frame_end(self):
+        pass
+
+    def report(self):
+        pass
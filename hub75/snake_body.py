@@ -0,0 +1,95 @@
+# Snake body as a fixed-capacity ring buffer plus an occupancy grid.
+#
+# The scripts kept the body as a list of (x, y) tuples: snake.insert(0, ...)
+# moves every element, and the self-collision test `head in snake[1:]`
+# copies the list and searches it. Here the segments are cell numbers
+# (y * width + x) in a preallocated array used as a ring, head first, and a
+# bytearray holds how many segments sit on every cell of the board. Moving,
+# growing, shrinking and the collision test are O(1) and allocate nothing.
+#
+# A cell count only goes above 1 when the head runs into the body, and the
+# scripts end the game right there, so it never gets near the 255 a byte
+# holds. Should a caller keep going anyway, push() raises ValueError at the
+# 256th segment on one cell instead of letting the counts drift.
+#
+# Memory for 128x128: 32 KB ring + 16 KB grid.
+#
+#   body = SnakeBody(128, 128)
+#   body.push(x, y)                    # new head
+#   if body.length > snake_length:
+#       cell = body.pop_tail()         # cell % 128, cell // 128
+#   if body.hits_self(): ...           # head lies on another segment
+#   body.is_occupied(x, y)             # for look-ahead / path planning
+
+import micropython
+from array import array
+
+
+class SnakeBody:
+    def __init__(self, width=128, height=128, capacity=None):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.capacity = size if capacity is None else capacity
+        # Placeholder contents, entries are written by push()
+        self.cells = array('H' if size <= 0x10000 else 'I', range(self.capacity))
+        self.occupied = bytearray(size)
+        self.head = 0       # Ring index of the head segment
+        self.length = 0
+        self.head_x = 0
+        self.head_y = 0
+
+    @micropython.native
+    def push(self, x, y):
+        if self.length == self.capacity:
+            raise IndexError("snake body is full")
+        cell = y * self.width + x
+        self.occupied[cell] += 1
+        head = self.head - 1
+        if head < 0:
+            head = self.capacity - 1
+        self.head = head
+        self.cells[head] = cell
+        self.length += 1
+        self.head_x = x
+        self.head_y = y
+
+    # Remove the last segment, returns its cell number
+    @micropython.native
+    def pop_tail(self):
+        if self.length == 0:
+            raise IndexError("snake body is empty")
+        self.length -= 1
+        i = self.head + self.length
+        if i >= self.capacity:
+            i -= self.capacity
+        cell = self.cells[i]
+        self.occupied[cell] -= 1
+        return cell
+
+    # Cell number of segment i, counted from the head
+    @micropython.native
+    def segment(self, i):
+        i += self.head
+        if i >= self.capacity:
+            i -= self.capacity
+        return self.cells[i]
+
+    def is_occupied(self, x, y):
+        return self.occupied[y * self.width + x] != 0
+
+    # True if the head shares its cell with another segment
+    def hits_self(self):
+        return self.length > 1 and self.occupied[self.head_y * self.width + self.head_x] > 1
+
+    # (x, y) of all segments from the head, e.g. for a full redraw
+    def positions(self):
+        width = self.width
+        for i in range(self.length):
+            cell = self.segment(i)
+            yield cell % width, cell // width
+
+    def clear(self):
+        while self.length:
+            self.pop_tail()
+        self.head = 0
@@ -2,6 +2,10 @@ import hub75
 import random
 import time
 import machine
+from color import hue_to_rgb
+from font import ADVANCE, PixelTarget, TextRun
+from green_targets import GreenTargets
+from snake_body import SnakeBody
 
 rtc = machine.RTC()
 
@@ -12,76 +16,42 @@ WIDTH = 64
 # Initialize the display
 display = hub75.Hub75(WIDTH, HEIGHT)
 
-char_dict = {
-    '0': ["01110", "10001", "10001", "10001", "01110"],
-    '1': ["00100", "01100", "00100", "00100", "01110"],
-    '2': ["11110", "00001", "01110", "10000", "11111"],
-    '3': ["11110", "00001", "00110", "00001", "11110"],
-    '4': ["10000", "10010", "10010", "11111", "00010"],
-    '5': ["11111", "10000", "11110", "00001", "11110"],
-    '6': ["01110", "10000", "11110", "10001", "01110"],
-    '7': ["11111", "00010", "00100", "01000", "10000"],
-    '8': ["01110", "10001", "01110", "10001", "01110"],
-    '9': ["01110", "10001", "01111", "00001", "01110"],
-    ' ': ["00000", "00000", "00000", "00000", "00000"],
-    '.': ["00000", "00000", "00000", "00000", "00001"],
-    ':': ["00000", "00100", "00000", "00100", "00000"]
-}
-
-def rect(x1, y1, x2, y2, r, g, b):
-    for x in range(min(x1, x2), max(x1, x2) + 1):
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            display.set_pixel(x, y, r, g, b)
-
-def draw_char(x, y, char, r, g, b):
-    if char in char_dict:
-        matrix = char_dict[char]
-        for row in range(5):
-            for col in range(5):
-                if matrix[row][col] == '1':
-                    display.set_pixel(x + col, y + row, r, g, b)
-
-def draw_text(x, y, text, r, g, b):
-    offset_x = x
-    for char in text:
-        draw_char(offset_x, y, char, r, g, b)
-        offset_x += 6
-
-def hsb_to_rgb(hue, saturation, brightness):
-    hue_normalized = (hue % 360) / 60
-    hue_index = int(hue_normalized)
-    hue_fraction = hue_normalized - hue_index
-
-    value1 = brightness * (1 - saturation)
-    value2 = brightness * (1 - saturation * hue_fraction)
-    value3 = brightness * (1 - saturation * (1 - hue_fraction))
-
-    red, green, blue = [
-        (brightness, value3, value1),
-        (value2, brightness, value1),
-        (value1, brightness, value3),
-        (value1, value2, brightness),
-        (value3, value1, brightness),
-        (brightness, value1, value2)
-    ][hue_index]
-
-    return int(red * 255), int(green * 255), int(blue * 255)
+# Score bottom left, clock bottom right; unchanged text costs nothing to
+# redraw (see font.py)
+HUD_TOP = HEIGHT - 6
+hud = PixelTarget(display.set_pixel)
+score_run = TextRun(hud, 1, HUD_TOP)
+time_run = TextRun(hud, WIDTH - 5 * ADVANCE, HUD_TOP)
+
+# Drawing on the playing field; pixels inside the score/clock boxes destroy
+# the cached text, which is then drawn again in full
+def set_pixel_field(x, y, r, g, b):
+    if y >= HUD_TOP:
+        if score_run.covers(x, y):
+            score_run.invalidate()
+        elif time_run.covers(x, y):
+            time_run.invalidate()
+    display.set_pixel(x, y, r, g, b)
 
 score = 0
-snake = [(32, 32)]
+# Body as a ring buffer with an occupancy grid (see snake_body.py)
+snake = SnakeBody(WIDTH, HEIGHT)
+snake.push(32, 32)
 snake_length = 3
 snake_direction = 'UP'
-text = ""
 
 def restart_game():
-    global snake, snake_length, snake_direction, score, green_targets
+    global snake_length, snake_direction, score
     score = 0
-    snake = [(32, 32)]
+    snake.clear()
+    snake.push(32, 32)
     snake_length = 3
     snake_direction = 'UP'
     target = random_target()
-    green_targets = []
+    green_targets.clear()
     display.clear()
+    score_run.invalidate()
+    time_run.invalidate()
     place_target()
     print("Game restarted")
 
@@ -89,53 +59,42 @@ def random_target():
     return (random.randint(1, WIDTH-2), random.randint(1, HEIGHT-8))
 
 target = random_target()
-green_targets = []
+# Green targets with an expiry ring, a board lookup and a bucket grid for
+# the nearest-target search; a step allocates nothing (see green_targets.py)
+green_targets = GreenTargets(WIDTH, HEIGHT, lifespan=256)
 
 def place_target():
     global target
     target = random_target()
-    display.set_pixel(target[0], target[1], 255, 0, 0)  # Red target
+    set_pixel_field(target[0], target[1], 255, 0, 0)  # Red target
 
 def place_green_target():
     x, y = random.randint(1, WIDTH-2), random.randint(1, HEIGHT-8)
-    green_targets.append((x, y, 256))
-    display.set_pixel(x, y, 0, 255, 0)  # Green target
+    if green_targets.add(x, y):  # Lives for 256 steps
+        set_pixel_field(x, y, 0, 255, 0)  # Green target
+
+def clear_pixel(x, y):
+    set_pixel_field(x, y, 0, 0, 0)
 
 def update_green_targets():
-    global green_targets
-    new_green_targets = []
-    for x, y, lifespan in green_targets:
-        if lifespan > 1:
-            new_green_targets.append((x, y, lifespan - 1))
-        else:
-            display.set_pixel(x, y, 0, 0, 0)  # Clear green target from display
-    green_targets = new_green_targets
+    green_targets.tick(clear_pixel)  # Clears expired targets from display
 
+# Returns the cell number y * WIDTH + x of the target
 def find_nearest_target(head_x, head_y, green_targets, red_target):
-    def manhattan_distance(x1, y1, x2, y2):
-        return abs(x1 - x2) + abs(y1 - y2)
-
-    min_distance_green = float('inf')
-    nearest_green_target = None
-
-    for x, y, _ in green_targets:
-        distance = manhattan_distance(head_x, head_y, x, y)
-        if distance < min_distance_green:
-            min_distance_green = distance
-            nearest_green_target = (x, y)
+    distance_red = abs(head_x - red_target[0]) + abs(head_y - red_target[1])
+    cell = green_targets.nearest(head_x, head_y)
+    # Integer form of min_distance_green <= distance_red * 1.5
+    if cell >= 0 and 2 * green_targets.distance <= 3 * distance_red:
+        return cell
+    return red_target[1] * WIDTH + red_target[0]
 
-    distance_red = manhattan_distance(head_x, head_y, red_target[0], red_target[1])
-
-    if nearest_green_target and min_distance_green <= distance_red * 1.5:
-        return nearest_green_target
-    else:
-        return red_target
+# Opposite directions, built once instead of on every call
+OPPOSITE_DIRECTIONS = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
 
 def update_direction(snake, snake_direction, green_targets, target):
-    head_x, head_y = snake[0]
-    target_x, target_y = find_nearest_target(head_x, head_y, green_targets, target)
-    
-    opposite_directions = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+    head_x, head_y = snake.head_x, snake.head_y
+    cell = find_nearest_target(head_x, head_y, green_targets, target)
+    target_x, target_y = cell % WIDTH, cell // WIDTH
 
     new_direction = snake_direction  # Default to current direction
 
@@ -161,22 +120,22 @@ def update_direction(snake, snake_direction, green_targets, target):
             elif head_y > target_y and snake_direction != 'DOWN':
                 new_direction = 'UP'
 
-    if new_direction == opposite_directions[snake_direction]:
+    if new_direction == OPPOSITE_DIRECTIONS[snake_direction]:
         new_direction = snake_direction
     
     return new_direction
 
 def check_self_collision():
-    global snake, snake_direction
-    head_x, head_y = snake[0]
-    body = snake[1:]
+    global snake_direction
+    head_x, head_y = snake.head_x, snake.head_y
     potential_moves = {
-        'UP': (head_x, head_y - 1),
-        'DOWN': (head_x, head_y + 1),
-        'LEFT': (head_x - 1, head_y),
-        'RIGHT': (head_x + 1, head_y)
+        'UP': (head_x, (head_y - 1) % HEIGHT),
+        'DOWN': (head_x, (head_y + 1) % HEIGHT),
+        'LEFT': ((head_x - 1) % WIDTH, head_y),
+        'RIGHT': ((head_x + 1) % WIDTH, head_y)
     }
-    safe_moves = {dir: pos for dir, pos in potential_moves.items() if pos not in body}
+    # Occupancy grid lookup instead of searching a copy of the body
+    safe_moves = {dir: pos for dir, pos in potential_moves.items() if not snake.is_occupied(*pos)}
     if potential_moves[snake_direction] not in safe_moves.values():
         if safe_moves:
             snake_direction = random.choice(list(safe_moves.keys()))
@@ -184,8 +143,7 @@ def check_self_collision():
             restart_game()
 
 def update_snake_position():
-    global snake, snake_length, snake_direction
-    head_x, head_y = snake[0]
+    head_x, head_y = snake.head_x, snake.head_y
     if snake_direction == 'UP':
         head_y -= 1
     elif snake_direction == 'DOWN':
@@ -198,52 +156,44 @@ def update_snake_position():
     head_x %= WIDTH
     head_y %= HEIGHT
 
-    snake.insert(0, (head_x, head_y))
-    if len(snake) > snake_length:
-        tail = snake.pop()
-        display.set_pixel(tail[0], tail[1], 0, 0, 0)
+    snake.push(head_x, head_y)
+    if snake.length > snake_length:
+        cell = snake.pop_tail()
+        set_pixel_field(cell % WIDTH, cell // WIDTH, 0, 0, 0)
 
 def check_target_collision():
-    global snake, snake_length, target, score
-    head_x, head_y = snake[0]
-    if (head_x, head_y) == target:
+    global snake_length, score
+    if snake.head_x == target[0] and snake.head_y == target[1]:
         snake_length += 2
         place_target()
         score += 1
 
 def check_green_target_collision():
-    global snake, snake_length, green_targets
-    head_x, head_y = snake[0]
-    for x, y, lifespan in green_targets:
-        if (head_x, head_y) == (x, y):
-            snake_length = max(snake_length // 2, 2)
-            green_targets.remove((x, y, lifespan))
-            display.set_pixel(x, y, 0, 0, 0)
+    global snake_length
+    head_x, head_y = snake.head_x, snake.head_y
+    # Board lookup instead of searching the list
+    if green_targets.take(head_x, head_y):
+        snake_length = max(snake_length // 2, 2)
+        set_pixel_field(head_x, head_y, 0, 0, 0)
+        # Drop the surplus segments right away, each is erased once
+        while snake.length > snake_length:
+            cell = snake.pop_tail()
+            set_pixel_field(cell % WIDTH, cell // WIDTH, 0, 0, 0)
 
 def draw_snake():
     hue = 0
-    for idx, (x, y) in enumerate(snake[:snake_length]):
+    for idx in range(snake.length):
         hue = (hue + 5) % 360
-        r, g, b = hsb_to_rgb(hue, 1, 1)
-        display.set_pixel(x, y, r, g, b)
-    for idx in range(snake_length, len(snake)):
-        x, y = snake[idx]
-        display.set_pixel(x, y, 0, 0, 0)
+        r, g, b = hue_to_rgb(hue)
+        cell = snake.segment(idx)
+        set_pixel_field(cell % WIDTH, cell // WIDTH, r, g, b)
 
 def display_score_and_time(score):
-    global text
     year, month, day, wd, hour, minute, second, _ = rtc.datetime()
     time_str = "{:02}:{:02}".format(hour, minute)
     score_str = str(score)
-    time_x = WIDTH - (len(time_str) * 6)
-    time_y = HEIGHT - 6
-    score_x = 1
-    score_y = HEIGHT - 6
-    if text != score_str + " " + time_str:
-        text = score_str + " " + time_str
-        rect(score_x, score_y, WIDTH, score_y+5, 0, 0, 0)
-    draw_text(score_x, score_y, score_str, 255, 255, 255)
-    draw_text(time_x, time_y, time_str, 255, 255, 255)
+    score_run.draw(score_str)
+    time_run.draw(time_str)
 
 step_counter = 0
 step_counter2 = 0
@@ -261,10 +211,10 @@ while True:
 
     if step_counter % 8 == 0:
         snake_direction = update_direction(snake, snake_direction, green_targets, target)
-    elif len(green_targets) > 0:
-        if snake[0][0] == green_targets[0][0] or snake[0][1] == green_targets[0][1]:
+    elif green_targets.count > 0:
+        if green_targets.aligned(snake.head_x, snake.head_y):
             snake_direction = update_direction(snake, snake_direction, green_targets, target)
-    elif snake[0][0] == target[0] or snake[0][1] == target[1] or snake[0][0] < 4 or snake[0][0] > WIDTH-4 or snake[0][1] < 4 or snake[0][1] > HEIGHT-4:
+    elif snake.head_x == target[0] or snake.head_y == target[1] or snake.head_x < 4 or snake.head_x > WIDTH-4 or snake.head_y < 4 or snake.head_y > HEIGHT-4:
         snake_direction = update_direction(snake, snake_direction, green_targets, target)
 
     check_self_collision()
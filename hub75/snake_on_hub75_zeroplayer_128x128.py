@@ -3,6 +3,16 @@ import random
 import time
 import machine
 from machine import Pin
+from micropython import const
+from color import hue_to_rgb
+from font import ADVANCE, GLYPH_HEIGHT, TextRun
+from frame_pacer import FramePacer
+from green_targets import GreenTargets
+from panel_map import PanelMap
+from profiler import Profiler
+from snake_body import SnakeBody
+from snake_planner import SnakePlanner
+from snake_render import SnakeRenderer
 
 # Constants for the physical display
 HEIGHT = 128
@@ -14,120 +24,80 @@ xWIDTH = 512    # 8 Module in Reihe à 64 Spalten = 512 Spalten
 # Initialize the display with real hardware resolution
 display = hub75.Hub75(xWIDTH, xHEIGHT)
 
-# Zeichen-Dictionary für die Anzeige von Text
-char_dict = {
-    '0': ["01110", "10001", "10001", "10001", "01110"],
-    '1': ["00100", "01100", "00100", "00100", "01110"],
-    '2': ["11110", "00001", "01110", "10000", "11111"],
-    '3': ["11110", "00001", "00110", "00001", "11110"],
-    '4': ["10000", "10010", "10010", "11111", "00010"],
-    '5': ["11111", "10000", "11110", "00001", "11110"],
-    '6': ["01110", "10000", "11110", "10001", "01110"],
-    '7': ["11111", "00010", "00100", "01000", "10000"],
-    '8': ["01110", "10001", "01110", "10001", "01110"],
-    '9': ["01110", "10001", "01111", "00001", "01110"],
-    ' ': ["00000", "00000", "00000", "00000", "00000"],
-    '.': ["00000", "00000", "00000", "00000", "00001"],
-    ':': ["00000", "00100", "00000", "00100", "00000"]
-}
-
-# Pixel Remapping
-@micropython.native
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y  # Identity transformation for values >= 128
-
-# Wrapper für set_pixel mit Remapping
-def set_pixel_mapped(x, y, r, g, b):
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
-
-# Funktion zum Zeichnen eines Rechtecks
-def rect(x1, y1, x2, y2, r, g, b):
-    for x in range(min(x1, x2), max(x1, x2) + 1):
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            set_pixel_mapped(x, y, r, g, b)
-
-# Funktion zum Zeichnen eines einzelnen Zeichens
-def draw_char(x, y, char, r, g, b):
-    if char in char_dict:
-        matrix = char_dict[char]
-        for row in range(5):
-            for col in range(5):
-                if matrix[row][col] == '1':
-                    set_pixel_mapped(x + col, y + row, r, g, b)
-
-# Funktion zum Zeichnen von Text
-def draw_text(x, y, text, r, g, b):
-    offset_x = x
-    for char in text:
-        draw_char(offset_x, y, char, r, g, b)
-        offset_x += 6  # Abstand zwischen den Zeichen
-
-# Funktion zur Umwandlung von HSB (Farbton, Sättigung, Helligkeit) zu RGB
-def hsb_to_rgb(hue, saturation, brightness):
-    hue_normalized = (hue % 360) / 60
-    hue_index = int(hue_normalized)
-    hue_fraction = hue_normalized - hue_index
-
-    value1 = brightness * (1 - saturation)
-    value2 = brightness * (1 - saturation * hue_fraction)
-    value3 = brightness * (1 - saturation * (1 - hue_fraction))
-
-    colors = [
-        (brightness, value3, value1),
-        (value2, brightness, value1),
-        (value1, brightness, value3),
-        (value1, value2, brightness),
-        (value3, value1, brightness),
-        (brightness, value1, value2)
-    ]
-
-    if hue_index >= len(colors):
-        hue_index = len(colors) - 1
-
-    red, green, blue = colors[hue_index]
-    return int(red * 255), int(green * 255), int(blue * 255)
+# Pixel-Remapping über vorberechnete Tabelle (siehe panel_map.py)
+panel = PanelMap(display)
+set_pixel_mapped = panel.set_pixel_mapped
+
+# Punktzahl links oben, Uhrzeit rechts oben; unveränderter Text kostet
+# beim Neuzeichnen nichts (siehe font.py)
+score_run = TextRun(panel, 1, 1)
+time_run = TextRun(panel, WIDTH - 5 * ADVANCE - 1, 1)
+HUD_BOTTOM = 1 + GLYPH_HEIGHT
+
+# Zeichnen auf dem Spielfeld; Pixel im Bereich der Anzeige zerstören den
+# gecachten Text, der dann beim nächsten Mal komplett neu gezeichnet wird
+def set_pixel_field(x, y, r, g, b):
+    if y < HUD_BOTTOM:
+        if score_run.covers(x, y):
+            score_run.invalidate()
+        elif time_run.covers(x, y):
+            time_run.invalidate()
+    set_pixel_mapped(x, y, r, g, b)
+
+# Schlange inkrementell zeichnen: pro Schritt nur neuer Kopf und gelöschtes
+# Schwanzende, jedes Segment behält seine Farbe (siehe snake_render.py).
+# False = alte Darstellung, bei der der Farbverlauf über den Körper wandert
+# und jedes Segment in jedem Schritt neu gezeichnet wird.
+INCREMENTAL_RENDERING = True
+renderer = SnakeRenderer(set_pixel_field)
 
 # Spielvariablen
 score = 0
-snake = [(WIDTH // 2, HEIGHT // 2)]  # Startposition in der Mitte des Displays
+# Körper als Ringpuffer mit Belegungsraster (siehe snake_body.py)
+snake = SnakeBody(WIDTH, HEIGHT)
+snake.push(WIDTH // 2, HEIGHT // 2)  # Startposition in der Mitte des Displays
 snake_length = 3
 snake_direction = 'UP'
-text = ""
+
+# Autopilot: True = Abstandsfeld per Breitensuche um den Körper herum (siehe
+# snake_planner.py), False = nur die alte gierige Heuristik.
+BFS_AUTOPILOT = True
+planner = SnakePlanner(snake, budget_us=3000)
+
+# Tempo: 30 Schritte pro Sekunde, unabhängig von Schlangenlänge und
+# Rechenlast; Punktzahl und Uhr werden 30-mal pro Sekunde gezeichnet
+# (siehe frame_pacer.py). PACER_REPORT > 0 gibt alle so viele Frames
+# Jitter und verworfene Frames aus.
+STEPS_PER_SECOND = 30
+FRAMES_PER_SECOND = 30
+PACER_REPORT = 0
+pacer = FramePacer(STEPS_PER_SECOND, FRAMES_PER_SECOND, report_every=PACER_REPORT)
+
+# Profiling: 1 = alle 300 Frames ausgeben, wo die Zeit bleibt (siehe
+# profiler.py); mit 0 wird die Messung gar nicht erst kompiliert
+PROFILE = const(0)
+PLAN = const(0)
+MOVE = const(1)
+DRAW = const(2)
+HUD = const(3)
+profiler = Profiler(("plan", "move", "draw", "hud"))
 
 # Echtzeituhr initialisieren
 rtc = machine.RTC()
 
 # Restart-Funktion für das Spiel
 def restart_game():
-    global snake, snake_length, snake_direction, score, green_targets, target
+    global snake_length, snake_direction, score, target
     score = 0
-    snake = [(WIDTH // 2, HEIGHT // 2)]
+    snake.clear()
+    snake.push(WIDTH // 2, HEIGHT // 2)
     snake_length = 3
     snake_direction = 'UP'
-    green_targets = []
+    green_targets.clear()
     display.clear()
+    renderer.reset()
+    score_run.invalidate()
+    time_run.invalidate()
     place_target()
     print("Spiel neu gestartet")
 
@@ -137,61 +107,51 @@ def random_target():
 
 # Initialisierung des Ziels und der grünen Ziele
 target = random_target()
-green_targets = []
+# Grüne Ziele mit Ablaufring, Belegungsraster und Bucket-Gitter für die
+# Suche nach dem nächsten Ziel; ein Schritt erzeugt keine Objekte (siehe
+# green_targets.py)
+green_targets = GreenTargets(WIDTH, HEIGHT, lifespan=256)
 
 # Funktion zum Platzieren des roten Ziels mit Löschen des alten
 def place_target():
     global target
     # Löschen des alten Ziels
-    set_pixel_mapped(target[0], target[1], 0, 0, 0)
+    set_pixel_field(target[0], target[1], 0, 0, 0)
     # Generieren eines neuen Ziels
     target = random_target()
-    set_pixel_mapped(target[0], target[1], 255, 0, 0)  # Rotes Ziel
+    set_pixel_field(target[0], target[1], 255, 0, 0)  # Rotes Ziel
 
 # Funktion zum Platzieren eines grünen Ziels
 def place_green_target():
     x, y = random_target()
-    green_targets.append((x, y, 256))  # 256 als Lebensdauer
-    set_pixel_mapped(x, y, 0, 255, 0)  # Grünes Ziel
+    if green_targets.add(x, y):  # Lebt 256 Schritte
+        set_pixel_field(x, y, 0, 255, 0)  # Grünes Ziel
+
+def clear_pixel(x, y):
+    set_pixel_field(x, y, 0, 0, 0)
 
-# Aktualisieren der grünen Ziele (Lebensdauer reduzieren und entfernen)
+# Aktualisieren der grünen Ziele (abgelaufene werden gelöscht)
 def update_green_targets():
-    global green_targets
-    new_green_targets = []
-    for x, y, lifespan in green_targets:
-        if lifespan > 1:
-            new_green_targets.append((x, y, lifespan - 1))
-        else:
-            set_pixel_mapped(x, y, 0, 0, 0)  # Grünes Ziel löschen
-    green_targets = new_green_targets
+    green_targets.tick(clear_pixel)
 
-# Funktion zur Suche des nächsten Ziels basierend auf Manhattan-Distanz
+# Funktion zur Suche des nächsten Ziels basierend auf Manhattan-Distanz,
+# liefert die Zellnummer y * WIDTH + x
 def find_nearest_target(head_x, head_y, green_targets, red_target):
-    def manhattan_distance(x1, y1, x2, y2):
-        return abs(x1 - x2) + abs(y1 - y2)
-
-    min_distance_green = float('inf')
-    nearest_green_target = None
+    distance_red = abs(head_x - red_target[0]) + abs(head_y - red_target[1])
+    cell = green_targets.nearest(head_x, head_y)
+    # Ganzzahlig statt min_distance_green <= distance_red * 1.5
+    if cell >= 0 and 2 * green_targets.distance <= 3 * distance_red:
+        return cell
+    return red_target[1] * WIDTH + red_target[0]
 
-    for x, y, _ in green_targets:
-        distance = manhattan_distance(head_x, head_y, x, y)
-        if distance < min_distance_green:
-            min_distance_green = distance
-            nearest_green_target = (x, y)
-
-    distance_red = manhattan_distance(head_x, head_y, red_target[0], red_target[1])
-
-    if nearest_green_target and min_distance_green <= distance_red * 1.5:
-        return nearest_green_target
-    else:
-        return red_target
+# Gegenrichtungen, einmal angelegt statt bei jedem Aufruf
+OPPOSITE_DIRECTIONS = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
 
 # **Automatische Richtungsaktualisierung**
 def update_direction(snake, snake_direction, green_targets, target):
-    head_x, head_y = snake[0]
-    target_x, target_y = find_nearest_target(head_x, head_y, green_targets, target)
-    
-    opposite_directions = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+    head_x, head_y = snake.head_x, snake.head_y
+    cell = find_nearest_target(head_x, head_y, green_targets, target)
+    target_x, target_y = cell % WIDTH, cell // WIDTH
 
     new_direction = snake_direction  # Default to current direction
 
@@ -217,23 +177,30 @@ def update_direction(snake, snake_direction, green_targets, target):
             elif head_y > target_y and snake_direction != 'DOWN':
                 new_direction = 'UP'
 
-    if new_direction == opposite_directions[snake_direction]:
+    if new_direction == OPPOSITE_DIRECTIONS[snake_direction]:
         new_direction = snake_direction
     
     return new_direction
 
+# Richtung über das BFS-Abstandsfeld; die Heuristik gibt die bevorzugte
+# Richtung vor, solange das Feld den Kopf noch nicht erreicht hat
+def plan_direction():
+    goal = find_nearest_target(snake.head_x, snake.head_y, green_targets, target)
+    preferred = update_direction(snake, snake_direction, green_targets, target)
+    direction = planner.direction(goal % WIDTH, goal // WIDTH, preferred)
+    if direction is None:
+        return preferred  # Eingeschlossen, es gibt keinen freien Nachbarn
+    return direction
+
 # Überprüfen auf Kollision der Schlange mit sich selbst
 def check_self_collision():
-    global snake, snake_direction
-    head_x, head_y = snake[0]
-    body = snake[1:]
-    if (head_x, head_y) in body:
+    # Belegungsraster: liegt der Kopf auf einem anderen Segment?
+    if snake.hits_self():
         restart_game()
 
 # Aktualisieren der Schlange-Position
 def update_snake_position():
-    global snake, snake_length, snake_direction
-    head_x, head_y = snake[0]
+    head_x, head_y = snake.head_x, snake.head_y
     if snake_direction == 'UP':
         head_y -= 1
     elif snake_direction == 'DOWN':
@@ -247,69 +214,59 @@ def update_snake_position():
     head_x %= WIDTH
     head_y %= HEIGHT
 
-    snake.insert(0, (head_x, head_y))
-    if len(snake) > snake_length:
-        tail = snake.pop()
-        set_pixel_mapped(tail[0], tail[1], 0, 0, 0)  # Letztes Segment löschen
+    snake.push(head_x, head_y)
+    if snake.length > snake_length:
+        cell = snake.pop_tail()
+        set_pixel_field(cell % WIDTH, cell // WIDTH, 0, 0, 0)  # Letztes Segment löschen
 
 # Überprüfen auf Kollision mit dem roten Ziel
 def check_target_collision():
-    global snake, snake_length, target, score
-    head_x, head_y = snake[0]
-    if (head_x, head_y) == target:
+    global snake_length, score
+    if snake.head_x == target[0] and snake.head_y == target[1]:
         snake_length += 2
         place_target()
         score += 1
 
 # Überprüfen auf Kollision mit grünen Zielen
 def check_green_target_collision():
-    global snake, snake_length, green_targets
-    head_x, head_y = snake[0]
-    for target in green_targets:
-        x, y, lifespan = target
-        if (head_x, head_y) == (x, y):
-            snake_length = max(snake_length // 2, 2)
-            green_targets.remove(target)
-            set_pixel_mapped(x, y, 0, 0, 0)
-            break  # Nur eine Kollision pro Schritt berücksichtigen
+    global snake_length
+    head_x, head_y = snake.head_x, snake.head_y
+    # Ein Blick ins Raster statt Suche in der Liste
+    if green_targets.take(head_x, head_y):
+        snake_length = max(snake_length // 2, 2)
+        set_pixel_field(head_x, head_y, 0, 0, 0)
+        # Überschüssige Segmente sofort entfernen, jedes wird nur einmal gelöscht
+        while snake.length > snake_length:
+            cell = snake.pop_tail()
+            set_pixel_field(cell % WIDTH, cell // WIDTH, 0, 0, 0)
 
 # Zeichnen der Schlange auf der Matrix
 def draw_snake():
+    if INCREMENTAL_RENDERING:
+        # Das Schwanzende wurde schon in update_snake_position() gelöscht
+        renderer.add_head(snake.head_x, snake.head_y)
+        return
     hue = 0
-    for idx, (x, y) in enumerate(snake[:snake_length]):
+    for idx in range(snake.length):
         hue = (hue + 5) % 360
-        r, g, b = hsb_to_rgb(hue, 1, 1)
-        set_pixel_mapped(x, y, r, g, b)
-    # Entfernen von überschüssigen Segmenten
-    for idx in range(snake_length, len(snake)):
-        x, y = snake[idx]
-        set_pixel_mapped(x, y, 0, 0, 0)
+        r, g, b = hue_to_rgb(hue)
+        cell = snake.segment(idx)
+        set_pixel_field(cell % WIDTH, cell // WIDTH, r, g, b)
 
 # Anzeigen von Punktzahl und Zeit
 def display_score_and_time(score):
-    global text
     year, month, day, wd, hour, minute, second, _ = rtc.datetime()
     time_str = "{:02}:{:02}".format(hour, minute)
     score_str = str(score)
-    # Positionierung der Zeit und Punktzahl
-    time_x = WIDTH - (len(time_str) * 6) - 1  # Rechtsbündig
-    time_y = 1  # Oben
-    score_x = 1  # Links
-    score_y = 1  # Oben
-
-    # Hintergrund für die Anzeige löschen (kleines Rechteck)
-    rect(score_x, score_y, score_x + len(score_str) * 6, score_y + 5, 0, 0, 0)
-    rect(time_x, time_y, time_x + len(time_str) * 6, time_y + 5, 0, 0, 0)
-
-    # Zeichnen der Punktzahl und der Zeit
-    draw_text(score_x, score_y, score_str, 255, 255, 255)
-    draw_text(time_x, time_y, time_str, 255, 255, 255)
+    score_run.draw(score_str)
+    time_run.draw(time_str)
 
 # **Automatische Richtungsaktualisierung entfernen und durch automatische Logik ersetzen**
 # Entfernen der Funktion zur manuellen Richtungsaktualisierung
 
 # Hauptschleife
 def main():
+    global snake_direction
     step_counter = 0
     step_counter2 = 0
 
@@ -317,44 +274,71 @@ def main():
     place_target()
 
     while True:
-        step_counter += 1
-        step_counter2 += 1
-
-        # Alle 1024 Schritte ein grünes Ziel platzieren
-        if step_counter2 % 1024 == 0:
-            place_green_target()
-
-        # Lebensdauer der grünen Ziele aktualisieren
-        update_green_targets()
-            
-        global snake_direction
-            
-        if step_counter % 6 == 0:
-            snake_direction = update_direction(snake, snake_direction, green_targets, target)
-        elif len(green_targets) > 0:
-            if snake[0][0] == green_targets[0][0] or snake[0][1] == green_targets[0][1]:
+        if PROFILE:
+            profiler.frame_start()
+
+        # Feste Anzahl Schritte pro Sekunde, verpasste werden nachgeholt
+        for _ in range(pacer.begin()):
+            if PROFILE:
+                profiler.start(PLAN)
+            step_counter += 1
+            step_counter2 += 1
+
+            # Alle 1024 Schritte ein grünes Ziel platzieren
+            if step_counter2 % 1024 == 0:
+                place_green_target()
+
+            # Lebensdauer der grünen Ziele aktualisieren
+            update_green_targets()
+
+            if BFS_AUTOPILOT:
+                snake_direction = plan_direction()
+            elif step_counter % 6 == 0:
                 snake_direction = update_direction(snake, snake_direction, green_targets, target)
-        elif snake[0][0] == target[0] or snake[0][1] == target[1] or snake[0][0] < 4 or snake[0][0] > WIDTH-4 or snake[0][1] < 4 or snake[0][1] > HEIGHT-4:
-            snake_direction = update_direction(snake, snake_direction, green_targets, target)
+            elif green_targets.count > 0:
+                if green_targets.aligned(snake.head_x, snake.head_y):
+                    snake_direction = update_direction(snake, snake_direction, green_targets, target)
+            elif snake.head_x == target[0] or snake.head_y == target[1] or snake.head_x < 4 or snake.head_x > WIDTH-4 or snake.head_y < 4 or snake.head_y > HEIGHT-4:
+                snake_direction = update_direction(snake, snake_direction, green_targets, target)
+
+            if PROFILE:
+                profiler.stop(PLAN)
+                profiler.start(MOVE)
 
+            # Schlange-Position aktualisieren
+            update_snake_position()
 
-        # Schlange-Position aktualisieren
-        update_snake_position()
+            # Kollision mit sich selbst prüfen (O(1) über das Belegungsraster)
+            check_self_collision()
 
-        # Kollision mit roten Ziel prüfen
-        check_target_collision()
+            # Kollision mit roten Ziel prüfen
+            check_target_collision()
 
-        # Kollision mit grünen Zielen prüfen
-        check_green_target_collision()
+            # Kollision mit grünen Zielen prüfen
+            check_green_target_collision()
 
-        # Schlange zeichnen
-        draw_snake()
+            if PROFILE:
+                profiler.stop(MOVE)
+                profiler.start(DRAW)
+
+            # Schlange zeichnen (jeder Schritt malt seinen neuen Kopf)
+            draw_snake()
+
+            if PROFILE:
+                profiler.stop(DRAW)
+
+        if PROFILE:
+            profiler.start(HUD)
 
         # Punktzahl und Zeit anzeigen
         display_score_and_time(score)
 
-        # Kurze Pause basierend auf der Schlangenlänge
-        #time.sleep(max(0.03, (0.09 - max(0.01, snake_length / 300))))
+        if PROFILE:
+            profiler.stop(HUD)
+            profiler.frame_end()
+
+        # Rest des Frame-Budgets schlafen
+        pacer.end()
 
 if __name__ == "__main__":
     main()
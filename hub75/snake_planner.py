@@ -0,0 +1,210 @@
+# BFS autopilot for the zero-player snake.
+#
+# The planner keeps a breadth-first distance field from the current target
+# over the free cells of the (toroidal) board: dist[cell] = number of steps
+# from cell to the target around the body. The snake then simply moves to
+# the free neighbour with the smallest distance. The field is only rebuilt
+# when
+#
+# - the target moves (eaten, or the autopilot switches targets),
+# - the cached path is blocked: the best neighbour is no closer than the
+#   last step promised, or no neighbour is reachable at all (the tail may
+#   have opened a way in the meantime).
+#
+# Cells that become occupied later are only ever the head's own cells, which
+# lie behind it on the path, so a field stays usable while the snake follows
+# it. A rebuild is spread over several steps: every call expands the BFS
+# until budget_us is used up, or by budget_cells cells if that is given
+# (same work every step, so seeded host runs repeat exactly). As long as
+# the field has not reached the head the snake takes the direction
+# preferred by the caller (e.g. the old greedy heuristic) if that cell is
+# free, otherwise any free neighbour.
+#
+# Memory for 128x128: dist, stamp and queue, 3 x 32 KB. Cells of an old
+# field are told apart by a generation stamp, so nothing is cleared on a
+# rebuild.
+#
+#   planner = SnakePlanner(body)               # body: SnakeBody
+#   direction = planner.direction(tx, ty, greedy_direction)
+#   if direction is None: ...                  # boxed in, no free neighbour
+
+import micropython
+from array import array
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    # CPython, for the host benchmarks
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+CHUNK = 128     # Cells expanded between two looks at the clock
+
+
+class SnakePlanner:
+    def __init__(self, body, budget_us=3000, budget_cells=0):
+        self.body = body
+        self.width = body.width
+        self.height = body.height
+        size = body.width * body.height
+        # Placeholder contents; dist and queue are only read where stamp
+        # marks them as written by the current generation
+        self.dist = array('H', range(size))
+        self.queue = array('H', range(size))
+        self.stamp = array('H', range(size))
+        for i in range(size):
+            self.stamp[i] = 0
+        self.generation = 0
+        self.target = -1
+        self.q_head = 0
+        self.q_tail = 0
+        self.complete = True
+        self.expected = -1      # Distance the next best neighbour should have
+        self.budget_us = budget_us
+        self.budget_cells = budget_cells
+        self.cells_left = 0
+        # Statistics
+        self.rebuilds = 0
+        self.plan_us = 0
+        self.calls = 0
+
+    def _start(self, target):
+        self.generation += 1
+        if self.generation == 0x10000:
+            for i in range(len(self.stamp)):
+                self.stamp[i] = 0
+            self.generation = 1
+        self.target = target
+        self.stamp[target] = self.generation
+        self.dist[target] = 0
+        self.queue[0] = target
+        self.q_head = 0
+        self.q_tail = 1
+        self.complete = False
+        self.expected = -1
+        self.rebuilds += 1
+
+    # Expand up to limit cells of the BFS queue, returns True when done
+    @micropython.native
+    def _expand(self, limit):
+        width = self.width
+        height = self.height
+        dist = self.dist
+        stamp = self.stamp
+        queue = self.queue
+        occupied = self.body.occupied
+        generation = self.generation
+        head = self.q_head
+        tail = self.q_tail
+        while head < tail and limit > 0:
+            cell = queue[head]
+            head += 1
+            limit -= 1
+            d = dist[cell] + 1
+            x = cell % width
+            row = cell - x
+            # Left, right, up, down with wrap-around
+            n = row + (x - 1 if x > 0 else width - 1)
+            if stamp[n] != generation and not occupied[n]:
+                stamp[n] = generation
+                dist[n] = d
+                queue[tail] = n
+                tail += 1
+            n = row + (x + 1 if x < width - 1 else 0)
+            if stamp[n] != generation and not occupied[n]:
+                stamp[n] = generation
+                dist[n] = d
+                queue[tail] = n
+                tail += 1
+            n = cell - width if row > 0 else cell + (height - 1) * width
+            if stamp[n] != generation and not occupied[n]:
+                stamp[n] = generation
+                dist[n] = d
+                queue[tail] = n
+                tail += 1
+            n = cell + width if row < (height - 1) * width else x
+            if stamp[n] != generation and not occupied[n]:
+                stamp[n] = generation
+                dist[n] = d
+                queue[tail] = n
+                tail += 1
+        self.q_head = head
+        self.q_tail = tail
+        self.complete = head >= tail
+        return self.complete
+
+    def _run(self, start):
+        if self.budget_cells:
+            while self.cells_left > 0:
+                limit = min(CHUNK, self.cells_left)
+                self.cells_left -= limit
+                if self._expand(limit):
+                    break
+            return
+        budget = self.budget_us
+        while not self._expand(CHUNK):
+            if ticks_diff(ticks_us(), start) >= budget:
+                break
+
+    # Best free neighbour of the head as (direction, distance); distance is
+    # -1 if no free neighbour has been reached by the field, the direction is
+    # then the first free one, trying preferred first
+    def _best(self, preferred):
+        body = self.body
+        width = self.width
+        height = self.height
+        occupied = body.occupied
+        x = body.head_x
+        y = body.head_y
+        best = None
+        best_dist = -1
+        fallback = None
+        for direction in (preferred, 'UP', 'DOWN', 'LEFT', 'RIGHT'):
+            if direction == 'UP':
+                n = ((y - 1) % height) * width + x
+            elif direction == 'DOWN':
+                n = ((y + 1) % height) * width + x
+            elif direction == 'LEFT':
+                n = y * width + (x - 1) % width
+            else:
+                n = y * width + (x + 1) % width
+            if occupied[n]:
+                continue
+            if fallback is None:
+                fallback = direction
+            if self.stamp[n] == self.generation:
+                d = self.dist[n]
+                if best_dist < 0 or d < best_dist:
+                    best = direction
+                    best_dist = d
+        if best is None:
+            return fallback, -1
+        return best, best_dist
+
+    # Direction towards (target_x, target_y); preferred is taken while the
+    # field is still being built and wins ties. None if the snake is boxed in.
+    def direction(self, target_x, target_y, preferred):
+        start = ticks_us()
+        self.cells_left = self.budget_cells
+        target = target_y * self.width + target_x
+        if target != self.target:
+            self._start(target)
+        self._run(start)
+
+        best, d = self._best(preferred)
+        blocked = d < 0 or (self.expected >= 0 and d > self.expected)
+        if self.complete and blocked:
+            # Cached path blocked or target cut off: rebuild
+            self._start(target)
+            self._run(start)
+            best, d = self._best(preferred)
+
+        self.expected = d - 1 if d >= 0 else -1
+        self.calls += 1
+        self.plan_us += ticks_diff(ticks_us(), start)
+        return best
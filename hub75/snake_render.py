@@ -0,0 +1,57 @@
+# Incremental rainbow snake renderer.
+#
+# The old draw_snake() gives segment i (counted from the head) the hue
+# 5 * (i + 1) and repaints the whole body every step, because every
+# segment's index - and therefore its colour - changes when the snake moves.
+#
+# Here the colours run the other way round: each new head takes the next
+# entry of a precomputed hue ring (one step back on the colour wheel), and a
+# segment keeps its colour until it becomes the tail. Neighbouring segments
+# still differ by hue_step degrees, so the rainbow gradient along the body
+# is the same, it just no longer crawls along the body. A step paints the
+# new head and blacks out the old tail: O(1) regardless of the length.
+#
+# The colour of segment i is ring[(head + i) % len(ring)], so redraw() can
+# restore the whole gradient (e.g. after display.clear()) from the segment
+# positions alone.
+#
+#   renderer = SnakeRenderer(set_pixel_mapped)
+#   renderer.add_head(x, y)        # after the head moved
+#   renderer.erase(x, y)           # tail segment that was removed
+
+from color import hue_to_rgb
+
+
+class SnakeRenderer:
+    def __init__(self, set_pixel, hue_step=5):
+        if 360 % hue_step:
+            raise ValueError("hue_step must divide 360")
+        self.set_pixel = set_pixel
+        # Hue ring as (r, g, b) tuples, built once so a step allocates nothing
+        self.ring = [hue_to_rgb(hue) for hue in range(0, 360, hue_step)]
+        self.head = 0
+
+    def reset(self):
+        self.head = 0
+
+    def add_head(self, x, y):
+        head = self.head - 1
+        if head < 0:
+            head = len(self.ring) - 1
+        self.head = head
+        r, g, b = self.ring[head]
+        self.set_pixel(x, y, r, g, b)
+
+    def erase(self, x, y):
+        self.set_pixel(x, y, 0, 0, 0)
+
+    # Repaint all segments (head first) in their current colours
+    def redraw(self, segments):
+        ring = self.ring
+        index = self.head
+        for x, y in segments:
+            r, g, b = ring[index]
+            self.set_pixel(x, y, r, g, b)
+            index += 1
+            if index == len(ring):
+                index = 0
@@ -2,6 +2,8 @@ import hub75
 import random
 import time
 from machine import Pin
+from frame_pacer import FramePacer
+from panel_map import PanelMap
 
 # Display dimensions
 xHEIGHT = 32
@@ -30,33 +32,8 @@ class Point:
         self.x = x
         self.y = y
 
-def newXY(x, y):
-    yh = y % 64
-    if y < 64:
-        if x < 32:
-            return 192 + yh, 31 - x
-        elif x < 64:
-            return 191 - yh, x - 32
-        elif x < 96:
-            return 64 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 63 - yh, x - 96
-    elif y < 128:
-        if x < 32:
-            return 256 + yh, 31 - x
-        elif x < 64:
-            return 383 - yh, x - 32
-        elif x < 96:
-            return 384 + yh, 31 - (x - 64)
-        elif x < 128:
-            return 511 - yh, x - 96
-    else:
-        return x, y  # Identity transformation for values >= 128
-
-def set_pixel_mapped(x, y, r, g, b):
-    x1, y1 = newXY(x, y)
-    if 0 <= x1 < xWIDTH and 0 <= y1 < xHEIGHT:
-        display.set_pixel(x1, y1, r, g, b)
+# Pixel remapping via precomputed lookup table (see panel_map.py)
+set_pixel_mapped = PanelMap(display).set_pixel_mapped
 
 class TicTacToe:
     def __init__(self):
@@ -221,14 +198,23 @@ def render_tic_tac_toe(tic_tac_toe):
         set_pixel_mapped(x, y, r, g, b)
     tic_tac_toe.changes = []
 
+# 20 moves per second, drawn 20 times per second (see frame_pacer.py);
+# PACER_REPORT > 0 prints jitter and dropped frames every that many frames
+MOVES_PER_SECOND = 20
+FRAMES_PER_SECOND = 20
+PACER_REPORT = 0
+
 def main():
     tic_tac_toe = TicTacToe()
+    pacer = FramePacer(MOVES_PER_SECOND, FRAMES_PER_SECOND, report_every=PACER_REPORT)
     display.start()
     
     while tic_tac_toe.rounds_to_play > 0:
-        tic_tac_toe.simulate()
+        for _ in range(pacer.begin()):
+            if tic_tac_toe.rounds_to_play > 0:
+                tic_tac_toe.simulate()
         render_tic_tac_toe(tic_tac_toe)
-        time.sleep(0.05)
+        pacer.end()
     
     display.stop()
 
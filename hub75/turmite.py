@@ -0,0 +1,179 @@
+# Turmites: Langton's ant generalised to many colours and internal states.
+#
+# A rule is either a string with one turn per colour, e.g. "RL" (Langton's
+# ant), "RLR" or "LLRR": on a cell of colour c turn as rule[c] says and
+# paint it c + 1 (the last colour wraps to 0). Turns: L left, R right,
+# N none, U u-turn. Or a full table, one row per state and one entry per
+# colour:
+#
+#   rule[state][color] = (write_color, turn, next_state)
+#
+# with turn as a letter or 0..3 quarter turns clockwise, e.g. the
+# two-state turmite that draws a Fibonacci spiral:
+#
+#   (((1, "L", 1), (1, "L", 1)),
+#    ((1, "R", 1), (0, "N", 0)))
+#
+# compile_rule() flattens either form into one array('H') indexed by
+# state * 16 + color, each entry packing write_color | turn << 4 |
+# next_state << 6. A step of an ant is then a table read, a few shifts and
+# masks and a modulo for the wrap-around, with no branches on the rule.
+#
+# The grid keeps two cells per byte (up to 16 colours), 8 KB for 128x128.
+# Ants are stored as a structure of arrays like in ant_colony.py, and a
+# step fills the same kind of dirty list: every cell an ant left, with the
+# RGB of its new colour, then the ant heads.
+#
+#   turmites = Turmites(128, 128, 8, "RLR")
+#   turmites.set_palette(1, 255, 0, 0)        # colour 0 is black
+#   turmites.draw_all(set_pixel_mapped)
+#   while True:
+#       turmites.step()
+#       turmites.draw(set_pixel_mapped)
+
+import micropython
+import random
+from array import array
+
+TURNS = {"N": 0, "R": 1, "U": 2, "L": 3}
+
+
+def _turn(turn):
+    return TURNS[turn.upper()] if isinstance(turn, str) else turn & 3
+
+
+# Returns (table, colors, states)
+def compile_rule(rule):
+    if isinstance(rule, str):
+        colors = len(rule)
+        table = [[((c + 1) % colors, _turn(rule[c]), 0) for c in range(colors)]]
+    else:
+        table = rule
+        colors = len(table[0])
+    states = len(table)
+    if not 2 <= colors <= 16:
+        raise ValueError("a rule needs 2 to 16 colours")
+    if states > 1023:
+        raise ValueError("too many states")
+    compiled = array('H', [0] * (16 * states))
+    for state in range(states):
+        if len(table[state]) != colors:
+            raise ValueError("every state needs an entry per colour")
+        for color in range(colors):
+            write, turn, next_state = table[state][color]
+            if not (0 <= write < colors and 0 <= next_state < states):
+                raise ValueError("transition out of range")
+            compiled[state * 16 + color] = write | (_turn(turn) << 4) | (next_state << 6)
+    return compiled, colors, states
+
+
+class Turmites:
+    def __init__(self, width, height, count, rule):
+        if width > 256 or height > 256:
+            raise ValueError("at most 256x256")
+        self.width = width
+        self.height = height
+        self.count = count
+        self.table, self.colors, self.states = compile_rule(rule)
+        self.grid = bytearray((width * height + 1) >> 1)
+        # RGB per grid colour, default shades of grey
+        self.palette = array('I', [0] * 16)
+        for c in range(1, self.colors):
+            level = 255 * c // (self.colors - 1)
+            self.set_palette(c, level, level, level)
+        # Step per direction (north, east, south, west), modulo the size
+        self.step_x = bytearray((0, 1, 0, width - 1))
+        self.step_y = bytearray((height - 1, 0, 1, 0))
+        self.xs = bytearray(count)
+        self.ys = bytearray(count)
+        self.dirs = bytearray(count)
+        self.ant_states = array('H', [0] * count)
+        self.ant_colors = array('I', [0] * count)
+        for i in range(count):
+            self.xs[i] = random.randint(0, width - 1)
+            self.ys[i] = random.randint(0, height - 1)
+            self.dirs[i] = random.randint(0, 3)
+            self.ant_colors[i] = 0xFFFFFF
+        self.dirty_cells = array('H', [0] * (2 * count))
+        self.dirty_colors = array('I', [0] * (2 * count))
+        self.dirty = 0
+
+    def set_palette(self, color, r, g, b):
+        self.palette[color] = (r << 16) | (g << 8) | b
+
+    def set_color(self, ant, r, g, b):
+        self.ant_colors[ant] = (r << 16) | (g << 8) | b
+
+    def get_cell(self, x, y):
+        cell = y * self.width + x
+        return (self.grid[cell >> 1] >> ((cell & 1) << 2)) & 15
+
+    def set_cell(self, x, y, color):
+        cell = y * self.width + x
+        shift = (cell & 1) << 2
+        self.grid[cell >> 1] = (self.grid[cell >> 1] & (0xF0 >> shift)) | (color << shift)
+
+    @micropython.native
+    def step(self):
+        grid = self.grid
+        table = self.table
+        palette = self.palette
+        xs = self.xs
+        ys = self.ys
+        dirs = self.dirs
+        ant_states = self.ant_states
+        step_x = self.step_x
+        step_y = self.step_y
+        dirty_cells = self.dirty_cells
+        dirty_colors = self.dirty_colors
+        width = self.width
+        height = self.height
+        count = self.count
+        n = 0
+        for i in range(count):
+            x = xs[i]
+            y = ys[i]
+            cell = y * width + x
+            index = cell >> 1
+            shift = (cell & 1) << 2
+            packed = grid[index]
+            entry = table[(ant_states[i] << 4) | ((packed >> shift) & 15)]
+            write = entry & 15
+            grid[index] = (packed & (0xF0 >> shift)) | (write << shift)
+            dirty_cells[n] = cell
+            dirty_colors[n] = palette[write]
+            n += 1
+            d = (dirs[i] + (entry >> 4)) & 3
+            dirs[i] = d
+            ant_states[i] = entry >> 6
+            xs[i] = (x + step_x[d]) % width
+            ys[i] = (y + step_y[d]) % height
+        ant_colors = self.ant_colors
+        for i in range(count):
+            dirty_cells[n] = ys[i] * width + xs[i]
+            dirty_colors[n] = ant_colors[i]
+            n += 1
+        self.dirty = n
+
+    # Draw the dirty list of the last step
+    @micropython.native
+    def draw(self, set_pixel):
+        dirty_cells = self.dirty_cells
+        dirty_colors = self.dirty_colors
+        width = self.width
+        for k in range(self.dirty):
+            cell = dirty_cells[k]
+            color = dirty_colors[k]
+            set_pixel(cell % width, cell // width, color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+
+    # The whole grid in palette colours and the ants
+    def draw_all(self, set_pixel):
+        width = self.width
+        grid = self.grid
+        palette = self.palette
+        for cell in range(width * self.height):
+            color = palette[(grid[cell >> 1] >> ((cell & 1) << 2)) & 15]
+            set_pixel(cell % width, cell // width, color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+        for i in range(self.count):
+            color = self.ant_colors[i]
+            set_pixel(self.xs[i], self.ys[i], color >> 16, (color >> 8) & 0xFF, color & 0xFF)
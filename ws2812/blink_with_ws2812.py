@@ -1,6 +1,7 @@
 import array, time
 from machine import Pin
 import rp2
+from color import hue_to_rgb
 
 brightness = 0.3
 
@@ -28,37 +29,6 @@ def ws2812():
     wrap()
 
 
-def hsb_to_rgb(h, s, b):
-    # Converts an HSB color value to an RGB color value.
-
-    if s == 0:
-        return int(b * 255), int(b * 255), int(b * 255)
-
-    h = h % 360
-
-    h = h / 60
-    i = int(h)
-    f = h - i
-    p = b * (1 - s)
-    q = b * (1 - s * f)
-    t = b * (1 - s * (1 - f))
-    
-    p, q, t = int(p * 255), int(q * 255), int(t * 255)
-    b = int(b * 255)
-    
-    if i == 0:
-        return b, t, p
-    elif i == 1:
-        return q, b, p
-    elif i == 2:
-        return p, b, t
-    elif i == 3:
-        return p, q, b
-    elif i == 4:
-        return t, p, b
-    elif i == 5:
-        return b, p, q
-
 def update_pix(brightness_input=brightness):
     # Scale the color values based on the desired brightness
     dimmer_array = array.array("I", (int(((c >> 16) & 0xFF) * brightness_input) << 16 |
@@ -89,16 +59,18 @@ if __name__ == "__main__":
     background = (15, 15, 15)  # Background
     cycles = 20000
     trail_length = 4  # Length of the trail
+    # Brightness of the trailing LEDs, 80% of the previous one each
+    trail_brightness = [int(204 * 0.8 ** (j + 1)) for j in range(trail_length)]
     
     
     for ii in range(int(cycles * led_count) + 1):
         # Main LED
-        set_led(ii % led_count, hsb_to_rgb(ii * 9, 1, 0.8))  # Sets each LED to a different color
+        set_led(ii % led_count, hue_to_rgb(ii * 9, 204))  # Sets each LED to a different color
         # Trailing LEDs
         for j in range(trail_length):
             if (ii - j - 1) >= 0:
                 # Decrease brightness for each following LED
-                set_led((ii - j - 1) % led_count, hsb_to_rgb(ii * 9, 1, 0.8 * (0.8 ** (j + 1))))
+                set_led((ii - j - 1) % led_count, hue_to_rgb(ii * 9, trail_brightness[j]))
         if ii > trail_length:
             # Set the older LED that no longer trails to the background
             set_led((ii - trail_length - 1) % led_count, background)